@@ -0,0 +1,130 @@
+"""
+Benchmark decoding and extracting a recorded MLB game
+
+Compares, for the standard library json decoder and orjson (if installed):
+  - full feed: decode /api/v1.1/game/{gamePk}/feed/live and extract players and highlights
+  - boxscore: decode /api/v1/game/{gamePk}/boxscore and extract players
+
+Then, from the decoded boxscore, times each step that turns it into box
+score tables: extracting the player lines, laying them out as a BoxScore,
+and the create_box_score and generate_team_stats builders on top of it.
+
+Usage:
+    python -m benchmarks.bench_feed_decode --record 745444
+    python -m benchmarks.bench_feed_decode --feed benchmarks/data/feed_745444.json
+    python -m benchmarks.bench_feed_decode --synthetic
+
+Without --boxscore, the boxscore payload is taken from the feed's
+liveData.boxscore, which is what the boxscore endpoint serves.
+"""
+import argparse
+import json
+import os
+import statistics
+import time
+import tracemalloc
+from utils.boxscore import build_box_score
+from utils.live_feed import extract_boxscore_players, extract_highlights, extract_players, parse_boxscore
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), 'data')
+
+def record(game_pk: int):
+    """Download a game's live feed and boxscore into DATA_DIR"""
+    from utils.mlb_client import mlb_client
+
+    os.makedirs(DATA_DIR, exist_ok=True)
+    paths = {}
+    for name, path in (('feed', f'/api/v1.1/game/{game_pk}/feed/live'),
+                       ('boxscore', f'/api/v1/game/{game_pk}/boxscore')):
+        response = mlb_client.get('feed', path)
+        paths[name] = os.path.join(DATA_DIR, f'{name}_{game_pk}.json')
+        with open(paths[name], 'wb') as f:
+            f.write(response.content)
+        print(f"Recorded {path} to {paths[name]} ({len(response.content) / 1024:.0f} KB)")
+    return paths
+
+def measure(fn, repeat: int):
+    """Get the median run time in ms and the peak traced allocation in KB of fn"""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - start) * 1000)
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return statistics.median(times), peak / 1024
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--feed', help='Recorded feed/live JSON')
+    parser.add_argument('--boxscore', help='Recorded boxscore JSON (defaults to the feed\'s boxscore)')
+    parser.add_argument('--record', type=int, metavar='GAME_PK', help='Record a game first')
+    parser.add_argument('--synthetic', action='store_true', help='Use a synthetic feed from benchmarks.fixtures')
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    if args.record:
+        paths = record(args.record)
+        args.feed, args.boxscore = paths['feed'], paths['boxscore']
+    if args.synthetic:
+        import random
+        from benchmarks.fixtures import TEAMS, live_feed
+
+        feed_bytes = json.dumps(live_feed(random.Random(0), 800000, TEAMS[0], TEAMS[1], '20250601_000000')).encode()
+    elif not args.feed:
+        parser.error('pass --feed, --record or --synthetic')
+    else:
+        with open(args.feed, 'rb') as f:
+            feed_bytes = f.read()
+    if args.boxscore:
+        with open(args.boxscore, 'rb') as f:
+            boxscore_bytes = f.read()
+    else:
+        boxscore_bytes = json.dumps(json.loads(feed_bytes)['liveData']['boxscore']).encode()
+
+    decoders = {'json': json.loads}
+    if orjson is not None:
+        decoders['orjson'] = orjson.loads
+
+    print(f"feed {len(feed_bytes) / 1024:.0f} KB, boxscore {len(boxscore_bytes) / 1024:.0f} KB, "
+          f"median of {args.repeat} runs\n")
+    print(f"{'payload':<10} {'decoder':<8} {'decode ms':>10} {'total ms':>10} {'peak KB':>10}")
+    for name, loads in decoders.items():
+        def full_feed():
+            feed = loads(feed_bytes)
+            return extract_players(feed), extract_highlights(feed)
+
+        def boxscore():
+            return extract_boxscore_players(loads(boxscore_bytes))
+
+        for payload, data, fn in (('feed', feed_bytes, full_feed), ('boxscore', boxscore_bytes, boxscore)):
+            decode_ms, _ = measure(lambda: loads(data), args.repeat)
+            total_ms, peak_kb = measure(fn, args.repeat)
+            print(f"{payload:<10} {name:<8} {decode_ms:>10.2f} {total_ms:>10.2f} {peak_kb:>10.0f}")
+
+    from utils.stats import create_box_score, generate_team_stats
+
+    boxscore = decoders['orjson' if orjson is not None else 'json'](boxscore_bytes)
+    player_stats = parse_boxscore(boxscore, 'Home', 'Away')
+    game = {'home_team': 'Home', 'away_team': 'Away',
+            'player_stats': {team: [line.to_dict() for line in lines] for team, lines in player_stats.items()}}
+    box = build_box_score(game)
+    print(f"\n{len(box.batting['Name'])} batting and {len(box.pitching['Name'])} pitching lines")
+    print(f"{'step':<22} {'ms':>10} {'peak KB':>10}")
+    # Clear the builders' memoized results each run, this measures building them
+    for step, fn in (('extract lines', lambda: extract_boxscore_players(boxscore)),
+                     ('build_box_score', lambda: build_box_score(game)),
+                     ('create_box_score', lambda: (create_box_score.cache_clear(), create_box_score(game))),
+                     ('generate_team_stats', lambda: (generate_team_stats.cache_clear(), generate_team_stats(game)))):
+        ms, peak_kb = measure(fn, args.repeat)
+        print(f"{step:<22} {ms:>10.3f} {peak_kb:>10.0f}")
+
+if __name__ == '__main__':
+    main()
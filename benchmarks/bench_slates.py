@@ -0,0 +1,169 @@
+"""
+Benchmark loading and rendering full slates offline
+
+Replays slates of 1, 15 and 100 games from fixtures (synthetic by default,
+see benchmarks.fixtures) and reports, for each:
+  - cold: get_mlb_games with empty caches, an empty archive and no stored
+    validators
+  - warm: get_mlb_games answered from the cache
+  - refresh: get_mlb_games(force_refresh=True), revalidating upstream
+  - upstream requests per load, peak traced allocation and retained memory
+    of a cold load
+  - create_box_score and calculate_team_stats over every game, as on a
+    rerun (box scores come from their cache after the first repeat), and
+    generate_game_summary with a canned model when google-generativeai is
+    installed
+
+Requests are answered in-process by the replay adapters, or over HTTP by the
+stub server with --stub. Upstream latency is simulated with --latency. The
+shared rate limiter is off unless --rate-limit is passed, so the numbers
+measure our code rather than the request budget.
+
+Usage:
+    python -m benchmarks.bench_slates
+    python -m benchmarks.bench_slates --sizes 15 --latency 0.05 --stub
+    python -m benchmarks.bench_slates --fixtures benchmarks/data/fixtures --date 2025-07-04
+
+To benchmark a recorded slate, record it with MLB_RECORD_DIR set while the
+app loads it, then pass that directory and date. Slates more than a day
+old are dropped from the cache after each load, so their warm numbers
+measure reads from the game archive.
+"""
+import argparse
+import gc
+import os
+import resource
+import statistics
+import tempfile
+import time
+import tracemalloc
+from datetime import date
+
+def measure(fn, repeat: int, setup=None):
+    """Get the median run time of fn in ms, calling setup untimed before each run"""
+    times = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1, 15, 100], help='Synthetic slate sizes')
+    parser.add_argument('--fixtures', help='Fixture directory to replay instead of synthetic slates')
+    parser.add_argument('--date', help='Slate date to load from --fixtures, YYYY-MM-DD')
+    parser.add_argument('--latency', type=float, default=0.0, help='Simulated upstream latency in seconds')
+    parser.add_argument('--stub', action='store_true', help='Go through the stub server over HTTP')
+    parser.add_argument('--rate-limit', action='store_true', help='Keep the shared rate limiter on')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+    if args.fixtures and not args.date:
+        parser.error('--fixtures needs --date')
+
+    directory = args.fixtures or tempfile.mkdtemp(prefix='mlb-fixtures-')
+
+    # The clients and team registry read their settings on import
+    server = None
+    if args.stub:
+        from benchmarks.stub_server import start_stub_server
+
+        server = start_stub_server(directory, latency=args.latency)
+        os.environ['MLB_API_BASE'] = server.url
+    else:
+        os.environ['MLB_REPLAY_DIR'] = directory
+        os.environ['MLB_REPLAY_LATENCY'] = str(args.latency)
+    state_dir = tempfile.mkdtemp(prefix='mlb-state-')
+    os.environ['MLB_TEAM_REGISTRY_PATH'] = os.path.join(state_dir, 'teams.json')
+    os.environ['MLB_ARCHIVE_PATH'] = os.path.join(state_dir, 'archive.sqlite3')
+
+    from benchmarks.fixtures import build_slate
+    from utils.archive import game_archive
+    from utils.cache import cache
+    from utils.live_feed import live_tracker
+    from utils.mlb_client import UPSTREAM_REQUESTS, async_mlb_client, mlb_client
+    from utils.sports_data import get_mlb_games
+    from utils.stats import calculate_team_stats, create_box_score
+
+    if not args.rate_limit:
+        mlb_client.rate_limiter = async_mlb_client.rate_limiter = None
+
+    try:
+        from unittest import mock
+        from utils import ai_summary
+
+        class CannedModel:
+            def __init__(self, *args, **kwargs):
+                pass
+
+            def generate_content(self, prompt):
+                return mock.Mock(text='A canned summary.')
+
+        summarize = ai_summary.generate_game_summary
+        patches = (mock.patch.object(ai_summary.genai, 'configure'),
+                   mock.patch.object(ai_summary.genai, 'GenerativeModel', CannedModel))
+    except ImportError:
+        summarize = None
+
+    def reset():
+        cache.clear()
+        game_archive.clear()
+        for game_pk in live_tracker.tracked():
+            live_tracker.discard(game_pk)
+        mlb_client.forget_all()
+
+    if args.fixtures:
+        slates = [(None, date.fromisoformat(args.date))]
+    else:
+        slates = [(size, date.today()) for size in args.sizes]
+
+    print(f"{'mode':<8} {'latency':>8} {'rate limit':>10}  median of {args.repeat} runs")
+    print(f"{'stub' if args.stub else 'replay':<8} {args.latency:>8} {'on' if args.rate_limit else 'off':>10}\n")
+    header = (f"{'games':>5} {'cold ms':>9} {'warm ms':>9} {'refresh ms':>10} {'calls':>6} "
+              f"{'peak MB':>8} {'kept MB':>8} {'box ms':>8} {'team ms':>8} {'summary ms':>10}")
+    print(header)
+    for i, (size, slate_date) in enumerate(slates):
+        if size is not None:
+            build_slate(directory, slate_date.isoformat(), size, first_game_pk=800000 + i * 1000)
+
+        def load(force_refresh=False):
+            return get_mlb_games(slate_date, force_refresh=force_refresh)
+
+        cold_ms = measure(load, args.repeat, setup=reset)
+
+        # Upstream requests and memory of a single cold load
+        reset()
+        gc.collect()
+        calls_before = UPSTREAM_REQUESTS.total()
+        tracemalloc.start()
+        games = load()
+        kept, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        calls = UPSTREAM_REQUESTS.total() - calls_before
+
+        warm_ms = measure(load, args.repeat)
+        refresh_ms = measure(lambda: load(force_refresh=True), args.repeat)
+
+        box_ms = measure(lambda: [create_box_score(game) for game in games], args.repeat)
+        team_ms = measure(lambda: [calculate_team_stats(game) for game in games], args.repeat)
+        summary = '-'
+        if summarize is not None:
+            with patches[0], patches[1]:
+                summary = f"{measure(lambda: [summarize(game) for game in games], args.repeat):.1f}"
+
+        print(f"{len(games):>5} {cold_ms:>9.1f} {warm_ms:>9.2f} {refresh_ms:>10.1f} {calls:>6.0f} "
+              f"{peak / 2 ** 20:>8.1f} {kept / 2 ** 20:>8.1f} {box_ms:>8.1f} {team_ms:>8.1f} "
+              f"{summary:>10}")
+
+    # ru_maxrss is in KB on Linux
+    print(f"\nmax RSS {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.0f} MB")
+    if summarize is None:
+        print("generate_game_summary skipped, google-generativeai is not installed")
+    if server is not None:
+        print(f"stub server requests by status: {server.counts}")
+        server.shutdown()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,234 @@
+"""
+Synthetic MLB Stats API fixtures for the replay harness
+
+Writes schedule, teams, team stats, boxscore and live feed responses for a
+slate of any size into a fixture directory, under the same names recorded
+responses get (see utils.replay), so benchmarks can replay slates that
+never happened. Payloads mirror the shapes the app reads, with roughly
+real-world sizes: full rosters in boxscores and a full game of plays in
+live feeds.
+
+Usage:
+    python -m benchmarks.fixtures DIR --date 2025-07-04 --games 15
+"""
+import argparse
+import json
+import random
+from typing import Dict, List, Optional
+from utils.mlb_client import mlb_client
+from utils.replay import record_response
+from utils.sports_data import HIGHLIGHTS_FIELDS, LEAGUE_TEAM_STATS_PARAMS, SCHEDULE_FIELDS, TEAM_STATS_PARAMS
+from utils.teams import TEAMS_PARAMS
+
+# Schedule states cycled through a slate, about what an evening slate looks like
+DEFAULT_STATES = ('Final', 'In Progress', 'Scheduled')
+
+TEAMS = [
+    {'id': 108 + i, 'name': f'{city} {club}', 'teamName': club, 'shortName': city,
+     'locationName': city, 'clubName': club, 'franchiseName': city, 'abbreviation': club[:3].upper()}
+    for i, (city, club) in enumerate([
+        ('Anaheim', 'Halos'), ('Arizona', 'Snakes'), ('Baltimore', 'Birds'), ('Boston', 'Socks'),
+        ('Chicago', 'Cubbies'), ('Cincinnati', 'Reds'), ('Cleveland', 'Guards'), ('Colorado', 'Peaks'),
+        ('Detroit', 'Tigers'), ('Houston', 'Astros'), ('Kansas City', 'Royals'), ('Los Angeles', 'Dodgers'),
+        ('Washington', 'Senators'), ('New York', 'Metros'), ('Oakland', 'Athletics'), ('Pittsburgh', 'Pirates'),
+        ('San Diego', 'Friars'), ('Seattle', 'Mariners'), ('San Francisco', 'Giants'), ('St. Louis', 'Cardinals'),
+        ('Tampa Bay', 'Rays'), ('Texas', 'Rangers'), ('Toronto', 'Jays'), ('Minnesota', 'Twins'),
+        ('Philadelphia', 'Phillies'), ('Atlanta', 'Braves'), ('Chicago', 'Pale Hose'), ('Miami', 'Marlins'),
+        ('New York', 'Bombers'), ('Milwaukee', 'Brewers'),
+    ])
+]
+
+def write_fixture(directory: str, path: str, params: Optional[Dict], payload):
+    """Write payload as the fixture for a GET of path with params"""
+    record_response(directory, mlb_client._url(path, params), json.dumps(payload).encode())
+
+def _team_stats_splits(rng: random.Random, group: str, team: Optional[Dict] = None) -> Dict:
+    if group == 'hitting':
+        stat = {
+            'gamesPlayed': 90, 'runs': rng.randint(350, 500), 'homeRuns': rng.randint(80, 160),
+            'rbi': rng.randint(330, 480), 'avg': f'.{rng.randint(225, 275)}', 'obp': f'.{rng.randint(290, 340)}',
+            'slg': f'.{rng.randint(370, 460)}', 'ops': f'.{rng.randint(660, 800)}', 'hits': rng.randint(700, 900),
+            'strikeOuts': rng.randint(700, 900), 'baseOnBalls': rng.randint(250, 350), 'stolenBases': rng.randint(30, 110),
+        }
+    else:
+        stat = {
+            'gamesPlayed': 90, 'era': f'{rng.uniform(3.2, 5.0):.2f}', 'whip': f'{rng.uniform(1.1, 1.45):.2f}',
+            'strikeOuts': rng.randint(700, 900), 'saves': rng.randint(15, 35), 'wins': rng.randint(35, 55),
+            'losses': rng.randint(35, 55), 'inningsPitched': f'{rng.randint(780, 820)}.1', 'hits': rng.randint(700, 850),
+        }
+    split = {'season': '2025', 'stat': stat}
+    if team is not None:
+        split['team'] = {'id': team['id'], 'name': team['name']}
+    return split
+
+def league_team_stats(rng: random.Random) -> Dict:
+    """/api/v1/teams/stats payload covering every team"""
+    return {'stats': [
+        {'type': {'displayName': 'season'}, 'group': {'displayName': group},
+         'splits': [_team_stats_splits(rng, group, team) for team in TEAMS]}
+        for group in ('hitting', 'pitching')
+    ]}
+
+def team_stats(rng: random.Random) -> Dict:
+    """/api/v1/teams/{teamId}/stats payload"""
+    return {'stats': [
+        {'type': {'displayName': 'regularSeason'}, 'group': {'displayName': group},
+         'splits': [_team_stats_splits(rng, group)]}
+        for group in ('hitting', 'pitching')
+    ]}
+
+def _player(rng: random.Random, person_id: int, pitcher: bool) -> Dict:
+    at_bats = 0 if pitcher else rng.randint(2, 5)
+    hits = rng.randint(0, min(at_bats, 3))
+    batting = {
+        'atBats': at_bats, 'hits': hits, 'runs': rng.randint(0, hits), 'rbi': rng.randint(0, hits + 1) if hits else 0,
+        'homeRuns': int(hits > 0 and rng.random() < 0.15), 'doubles': int(hits > 1), 'triples': 0,
+        'baseOnBalls': int(rng.random() < 0.1), 'strikeOuts': rng.randint(0, at_bats - hits), 'stolenBases': 0,
+        'leftOnBase': rng.randint(0, 3), 'summary': f'{hits}-{at_bats}',
+    }
+    pitching = {}
+    if pitcher:
+        outs = rng.randint(3, 18)
+        pitching = {
+            'inningsPitched': f'{outs // 3}.{outs % 3}', 'hits': rng.randint(0, 7), 'runs': rng.randint(0, 4),
+            'earnedRuns': rng.randint(0, 3), 'baseOnBalls': rng.randint(0, 3), 'strikeOuts': rng.randint(0, 9),
+            'homeRuns': rng.randint(0, 2), 'numberOfPitches': outs * 5 + rng.randint(0, 20),
+            'strikes': outs * 3 + rng.randint(0, 10), 'battersFaced': outs + rng.randint(1, 6),
+        }
+    return {
+        'person': {'id': person_id, 'fullName': f'Player {person_id}', 'link': f'/api/v1/people/{person_id}'},
+        'jerseyNumber': str(person_id % 99),
+        'position': {'code': '1' if pitcher else str(2 + person_id % 8), 'abbreviation': 'P' if pitcher else 'IF'},
+        'status': {'code': 'A', 'description': 'Active'},
+        'stats': {'batting': batting, 'pitching': pitching, 'fielding': {'assists': 0, 'putOuts': rng.randint(0, 5)}},
+        'seasonStats': {
+            'batting': {'avg': f'.{rng.randint(200, 320)}', 'ops': f'.{rng.randint(600, 950)}', 'homeRuns': rng.randint(0, 30)},
+            'pitching': {'era': f'{rng.uniform(2, 6):.2f}', 'whip': f'{rng.uniform(0.9, 1.6):.2f}'},
+        },
+        'gameStatus': {'isCurrentBatter': False, 'isOnBench': False, 'isSubstitute': False},
+    }
+
+def boxscore(rng: random.Random, game_pk: int, home: Dict, away: Dict) -> Dict:
+    """/api/v1/game/{gamePk}/boxscore payload with 13 hitters and 6 pitchers a side"""
+    teams = {}
+    for side, team in (('home', home), ('away', away)):
+        base = game_pk * 100 + (50 if side == 'away' else 0)
+        players = {}
+        for i in range(19):
+            person_id = base + i
+            players[f'ID{person_id}'] = _player(rng, person_id, pitcher=i >= 13)
+        teams[side] = {
+            'team': {'id': team['id'], 'name': team['name']},
+            'teamStats': {'batting': {'runs': rng.randint(0, 9)}, 'pitching': {}, 'fielding': {}},
+            'players': players,
+            'batters': [base + i for i in range(13)],
+            'pitchers': [base + i for i in range(13, 19)],
+            'battingOrder': [base + i for i in range(9)],
+        }
+    return {'teams': teams, 'officials': [], 'info': [], 'pitchingNotes': []}
+
+def highlights(game_pk: int, timestamp: str) -> Dict:
+    """liveData.highlights payload with three headlines"""
+    return {'highlights': [
+        {'headline': f'Highlight {i} of game {game_pk}', 'timestamp': timestamp} for i in range(3)
+    ]}
+
+def live_feed(rng: random.Random, game_pk: int, home: Dict, away: Dict, timestamp: str) -> Dict:
+    """/api/v1.1/game/{gamePk}/feed/live payload with a full game of plays"""
+    plays = []
+    for i in range(75):
+        events = [
+            {'index': j, 'isPitch': True, 'details': {'description': 'Ball', 'call': {'code': 'B'}},
+             'pitchData': {'startSpeed': round(rng.uniform(78, 99), 1), 'zone': rng.randint(1, 14),
+                           'coordinates': {'x': rng.uniform(0, 250), 'y': rng.uniform(0, 250)}}}
+            for j in range(5)
+        ]
+        plays.append({
+            'result': {'event': 'Groundout', 'description': f'Play {i} of game {game_pk}.', 'rbi': 0},
+            'about': {'atBatIndex': i, 'inning': i // 8 + 1, 'halfInning': 'top' if i % 2 else 'bottom'},
+            'matchup': {'batter': {'id': game_pk * 100 + i % 13}, 'pitcher': {'id': game_pk * 100 + 63}},
+            'playEvents': events,
+        })
+    return {
+        'gamePk': game_pk,
+        'metaData': {'wait': 10, 'timeStamp': timestamp, 'gameEvents': [], 'logicalEvents': []},
+        'gameData': {
+            'game': {'pk': game_pk, 'type': 'R', 'season': '2025'},
+            'teams': {'home': home, 'away': away},
+            'players': {},
+            'status': {'detailedState': 'In Progress'},
+        },
+        'liveData': {
+            'plays': {'allPlays': plays, 'currentPlay': plays[-1]},
+            'linescore': {'currentInning': 9},
+            'boxscore': boxscore(rng, game_pk, home, away),
+            'highlights': highlights(game_pk, timestamp),
+        },
+    }
+
+def build_slate(directory: str, date_str: str, n_games: int, first_game_pk: int = 800000,
+                states=DEFAULT_STATES, seed: int = 0) -> List[int]:
+    """
+    Write every response a cold load of a slate needs
+
+    Writes the teams list, league-wide and per-team season stats, the
+    schedule for date_str with n_games games cycling through states, a
+    boxscore and highlights for each finished game, and a live feed plus an
+    empty diffPatch for each in-progress game.
+
+    Returns the slate's gamePks.
+    """
+    rng = random.Random(seed)
+    write_fixture(directory, '/api/v1/teams', TEAMS_PARAMS, {'teams': TEAMS})
+    write_fixture(directory, '/api/v1/teams/stats', LEAGUE_TEAM_STATS_PARAMS, league_team_stats(rng))
+    for team in TEAMS:
+        write_fixture(directory, f"/api/v1/teams/{team['id']}/stats", TEAM_STATS_PARAMS, team_stats(rng))
+
+    games = []
+    timestamp = f"{date_str.replace('-', '')}_230000"
+    for i in range(n_games):
+        game_pk = first_game_pk + i
+        home, away = TEAMS[(2 * i) % len(TEAMS)], TEAMS[(2 * i + 1) % len(TEAMS)]
+        state = states[i % len(states)]
+        game = {
+            'gamePk': game_pk,
+            'gameDate': f'{date_str}T{17 + i % 6:02d}:05:00Z',
+            'status': {'detailedState': state},
+            'teams': {
+                'home': {'team': {'id': home['id'], 'name': home['name']}, 'score': rng.randint(0, 9)},
+                'away': {'team': {'id': away['id'], 'name': away['name']}, 'score': rng.randint(0, 9)},
+            },
+        }
+        if state != 'Scheduled':
+            game['linescore'] = {'currentInning': 9 if state == 'Final' else 5}
+        if state == 'Final':
+            game['decisions'] = {'winner': {'id': 1, 'fullName': 'Winning Pitcher'},
+                                 'loser': {'id': 2, 'fullName': 'Losing Pitcher'}}
+            write_fixture(directory, f'/api/v1/game/{game_pk}/boxscore', None, boxscore(rng, game_pk, home, away))
+            write_fixture(directory, f'/api/v1.1/game/{game_pk}/feed/live', {'fields': HIGHLIGHTS_FIELDS},
+                          {'liveData': {'highlights': highlights(game_pk, timestamp)}})
+        elif state == 'In Progress':
+            write_fixture(directory, f'/api/v1.1/game/{game_pk}/feed/live', None,
+                          live_feed(rng, game_pk, home, away, timestamp))
+            write_fixture(directory, f'/api/v1.1/game/{game_pk}/feed/live/diffPatch',
+                          {'startTimecode': timestamp}, [])
+        games.append(game)
+
+    schedule_params = {'sportId': 1, 'date': date_str, 'fields': SCHEDULE_FIELDS}
+    write_fixture(directory, '/api/v1/schedule', schedule_params,
+                  {'dates': [{'date': date_str, 'totalGames': n_games, 'games': games}]})
+    return [game['gamePk'] for game in games]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('directory', help='Fixture directory to write to')
+    parser.add_argument('--date', required=True, help='Slate date, YYYY-MM-DD')
+    parser.add_argument('--games', type=int, default=15)
+    parser.add_argument('--first-game-pk', type=int, default=800000)
+    args = parser.parse_args()
+
+    game_pks = build_slate(args.directory, args.date, args.games, args.first_game_pk)
+    print(f"Wrote a {len(game_pks)} game slate for {args.date} to {args.directory}")
+
+if __name__ == '__main__':
+    main()
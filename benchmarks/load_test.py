@@ -0,0 +1,213 @@
+"""
+Load test the data and stats layers with many concurrent dashboard sessions
+
+Each simulated session is a thread doing what a Streamlit session does on
+every rerun of main.py: pick a date and a status filter the way the
+selectboxes do, load the games with get_live_games, and render every
+game's tabs (create_box_score, calculate_team_stats, and now and then
+generate_game_summary with a canned model). Sessions wait a random think
+time between reruns.
+
+Upstream is the stub server replaying synthetic slates for yesterday
+(finished), today (mixed) and tomorrow (scheduled). Reported at the end:
+  - page view latency p50/p99, split into data load and rendering
+  - upstream requests, per page view and as amplification: requests over
+    the distinct URLs requested (1.0 means every URL was fetched once)
+  - memory growth: resident set size and cache size, start to end
+
+Usage:
+    python -m benchmarks.load_test --sessions 200 --duration 60
+    python -m benchmarks.load_test --sessions 50 --latency 0.1 --poller
+"""
+import argparse
+import os
+import random
+import resource
+import statistics
+import tempfile
+import threading
+import time
+from datetime import date, timedelta
+
+# Weights for the selectbox choices, most viewers stay on the defaults
+DATE_WEIGHTS = {'Yesterday': 0.2, 'Today': 0.7, 'Tomorrow': 0.1}
+STATUS_WEIGHTS = {'All': 0.6, 'Live': 0.2, 'Upcoming': 0.1, 'Finished': 0.1}
+
+def rss_mb() -> float:
+    """Get the current resident set size in MB, or the peak where /proc isn't available"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2 ** 20
+    except (OSError, ValueError):
+        # ru_maxrss is in KB on Linux, bytes on macOS
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def percentiles(values):
+    """Get the p50 and p99 of values in ms"""
+    if len(values) < 2:
+        value = values[0] if values else 0.0
+        return value, value
+    quantiles = statistics.quantiles(values, n=100, method='inclusive')
+    return quantiles[49], quantiles[98]
+
+class Session(threading.Thread):
+    """One simulated viewer rerunning the dashboard until stop is set"""
+
+    def __init__(self, index: int, args, stop: threading.Event, results: dict, results_lock: threading.Lock,
+                 render):
+        super().__init__(name=f'session-{index}', daemon=True)
+        self.rng = random.Random(args.seed + index)
+        self.args = args
+        self.stop = stop
+        self.results = results
+        self.results_lock = results_lock
+        self.render = render
+
+    def run(self):
+        from utils.sports_data import get_live_games
+
+        today = date.today()
+        dates = {'Yesterday': today - timedelta(days=1), 'Today': today, 'Tomorrow': today + timedelta(days=1)}
+        date_choice = 'Today'
+        status_choice = 'All'
+        while not self.stop.is_set():
+            # Most reruns come from a widget change, some from expanding or clicking within a game
+            if self.rng.random() < self.args.change_rate:
+                date_choice = self.rng.choices(list(DATE_WEIGHTS), weights=list(DATE_WEIGHTS.values()))[0]
+                status_choice = self.rng.choices(list(STATUS_WEIGHTS), weights=list(STATUS_WEIGHTS.values()))[0]
+
+            start = time.perf_counter()
+            games = get_live_games(status_choice, dates[date_choice])
+            loaded = time.perf_counter()
+            self.render(games, self.rng)
+            end = time.perf_counter()
+
+            with self.results_lock:
+                self.results['load'].append((loaded - start) * 1000)
+                self.results['render'].append((end - loaded) * 1000)
+                self.results['total'].append((end - start) * 1000)
+                self.results['games'] += len(games)
+
+            self.stop.wait(self.rng.expovariate(1 / self.args.think) if self.args.think else 0)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sessions', type=int, default=50, help='Concurrent sessions')
+    parser.add_argument('--duration', type=float, default=30, help='Seconds to run for')
+    parser.add_argument('--ramp', type=float, default=5, help='Seconds over which sessions start')
+    parser.add_argument('--think', type=float, default=2.0, help='Mean seconds between a session\'s reruns')
+    parser.add_argument('--change-rate', type=float, default=0.3,
+                        help='Fraction of reruns that change the date or status filter')
+    parser.add_argument('--summary-rate', type=float, default=0.05,
+                        help='Chance per rerun of generating one game\'s summary')
+    parser.add_argument('--games', type=int, default=15, help='Games per slate')
+    parser.add_argument('--latency', type=float, default=0.05, help='Simulated upstream latency in seconds')
+    parser.add_argument('--poller', action='store_true', help='Run the background poller like the app does')
+    parser.add_argument('--rate-limit', action='store_true', help='Keep the shared rate limiter on')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    from benchmarks.stub_server import start_stub_server
+
+    # The clients and team registry read their settings on import
+    directory = tempfile.mkdtemp(prefix='mlb-fixtures-')
+    server = start_stub_server(directory, latency=args.latency)
+    os.environ['MLB_API_BASE'] = server.url
+    state_dir = tempfile.mkdtemp(prefix='mlb-state-')
+    os.environ['MLB_TEAM_REGISTRY_PATH'] = os.path.join(state_dir, 'teams.json')
+    os.environ['MLB_ARCHIVE_PATH'] = os.path.join(state_dir, 'archive.sqlite3')
+
+    from benchmarks.fixtures import build_slate
+
+    today = date.today()
+    for i, (offset, states) in enumerate(((-1, ('Final',)), (0, ('Final', 'In Progress', 'Scheduled')),
+                                          (1, ('Scheduled',)))):
+        build_slate(directory, (today + timedelta(days=offset)).isoformat(), args.games,
+                    first_game_pk=800000 + i * 1000, states=states)
+
+    from utils.cache import cache
+    from utils.mlb_client import async_mlb_client, mlb_client
+    from utils.stats import calculate_team_stats, create_box_score
+
+    if not args.rate_limit:
+        mlb_client.rate_limiter = async_mlb_client.rate_limiter = None
+
+    try:
+        from unittest import mock
+        from utils import ai_summary
+
+        class CannedModel:
+            def __init__(self, *args, **kwargs):
+                pass
+
+            def generate_content(self, prompt):
+                return mock.Mock(text='A canned summary.')
+
+        # Patched for the whole run, sessions share the module
+        mock.patch.object(ai_summary.genai, 'configure').start()
+        mock.patch.object(ai_summary.genai, 'GenerativeModel', CannedModel).start()
+        summarize = ai_summary.generate_game_summary
+    except ImportError:
+        summarize = None
+
+    def render(games, rng):
+        # Streamlit runs every tab's body on each rerun, not just the visible one
+        for game in games:
+            if game['status'] in ("Finished", "Live"):
+                create_box_score(game)
+            if game.get('team_stats'):
+                calculate_team_stats(game)
+        if summarize is not None and games and rng.random() < args.summary_rate:
+            summarize(rng.choice(games))
+
+    if args.poller:
+        from utils.poller import start_background_poller
+
+        start_background_poller()
+
+    results = {'load': [], 'render': [], 'total': [], 'games': 0}
+    results_lock = threading.Lock()
+    stop = threading.Event()
+    start_rss = rss_mb()
+    start_cache = cache.stats()
+    samples = [start_rss]
+
+    sessions = [Session(i, args, stop, results, results_lock, render) for i in range(args.sessions)]
+    start = time.perf_counter()
+    for session in sessions:
+        session.start()
+        if args.ramp:
+            time.sleep(args.ramp / args.sessions)
+    while time.perf_counter() - start < args.duration:
+        time.sleep(1)
+        samples.append(rss_mb())
+    stop.set()
+    for session in sessions:
+        session.join()
+    elapsed = time.perf_counter() - start
+
+    end_cache = cache.stats()
+    views = len(results['total'])
+    requests = sum(server.counts.values())
+    distinct = len(server.paths)
+
+    print(f"\n{args.sessions} sessions for {elapsed:.0f}s, think {args.think}s, upstream latency {args.latency}s, "
+          f"rate limit {'on' if args.rate_limit else 'off'}, poller {'on' if args.poller else 'off'}")
+    print(f"{views} page views ({views / elapsed:.1f}/s), {results['games']} game cards rendered")
+    if summarize is None:
+        print("generate_game_summary skipped, google-generativeai is not installed")
+    print(f"\n{'latency ms':<12} {'p50':>8} {'p99':>8} {'max':>8}")
+    for name in ('total', 'load', 'render'):
+        p50, p99 = percentiles(results[name])
+        print(f"{name:<12} {p50:>8.1f} {p99:>8.1f} {max(results[name], default=0):>8.1f}")
+    print(f"\nupstream requests {requests} by status {server.counts}, {requests / max(views, 1):.3f} per page view")
+    print(f"amplification {requests / max(distinct, 1):.2f} ({distinct} distinct URLs)")
+    print(f"\nRSS {start_rss:.0f} MB -> {samples[-1]:.0f} MB (peak {max(samples):.0f} MB, "
+          f"growth {samples[-1] - start_rss:+.0f} MB)")
+    print(f"cache {start_cache['entries']} -> {end_cache['entries']} entries, "
+          f"{start_cache['bytes'] / 2 ** 20:.1f} -> {end_cache['bytes'] / 2 ** 20:.1f} MB, "
+          f"hit ratio {end_cache['hit_ratio']:.3f}")
+    server.shutdown()
+
+if __name__ == '__main__':
+    main()
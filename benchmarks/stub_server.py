@@ -0,0 +1,84 @@
+"""
+Local stub of the MLB Stats API serving recorded or synthetic fixtures
+
+Answers GETs from a fixture directory (see utils.replay), with ETags and
+304s like upstream, so the app or a load test can run against it over real
+HTTP with no network access. Point the app at it with MLB_API_BASE.
+
+Usage:
+    python -m benchmarks.stub_server benchmarks/data/fixtures --port 8765 --latency 0.05
+    MLB_API_BASE=http://127.0.0.1:8765 streamlit run main.py
+"""
+import argparse
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from utils.log import get_logger
+from utils.replay import replay_response
+
+logger = get_logger(__name__)
+
+class StubServer(ThreadingHTTPServer):
+    """HTTP server answering from a fixture directory, counting requests by status and path"""
+    daemon_threads = True
+
+    def __init__(self, address, directory: str, latency: float = 0.0):
+        super().__init__(address, _StubHandler)
+        self.directory = directory
+        self.latency = latency
+        self.counts = {}
+        self.paths = {}
+        self._lock = threading.Lock()
+
+    def count(self, status: int, path: str):
+        with self._lock:
+            self.counts[status] = self.counts.get(status, 0) + 1
+            self.paths[path] = self.paths.get(path, 0) + 1
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        if self.server.latency:
+            time.sleep(self.server.latency)
+        status, headers, body = replay_response(self.server.directory, self.path, self.headers.get('If-None-Match'))
+        self.server.count(status, self.path)
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logger.debug(format, *args)
+
+def start_stub_server(directory: str, port: int = 0, latency: float = 0.0) -> StubServer:
+    """Serve directory on a background thread, port 0 picks a free port"""
+    server = StubServer(('127.0.0.1', port), directory, latency)
+    threading.Thread(target=server.serve_forever, name='mlb-stub-server', daemon=True).start()
+    return server
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('directory', help='Fixture directory to serve')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', type=float, default=0.0, help='Seconds to wait before each response')
+    args = parser.parse_args()
+
+    server = StubServer(('127.0.0.1', args.port), args.directory, args.latency)
+    print(f"Serving {args.directory} on {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print(f"Requests by status: {server.counts}")
+
+if __name__ == '__main__':
+    main()
@@ -7,7 +7,9 @@ from dotenv import load_dotenv
 import json
 
 # Load local modules
-from utils.sports_data import get_live_games, pre_cache_games, get_mlb_games
+from utils.sports_data import get_live_games, get_mlb_games, clear_caches
+from utils.poller import start_background_poller
+from utils.metrics import start_metrics_export
 from utils.stats import create_box_score, calculate_team_stats
 from utils.ai_summary import generate_game_summary
 
@@ -23,8 +25,13 @@ st.set_page_config(
     initial_sidebar_state="expanded",
 )
 
-# Pre-cache games for faster loading
-pre_cache_games()
+# Keep games warm in the background instead of blocking the first render.
+# Skip this when a separate poller process (python -m utils.poller) feeds Redis.
+if not os.getenv('MLB_EXTERNAL_POLLER'):
+    start_background_poller()
+
+# Expose metrics on METRICS_PORT and/or METRICS_FILE, if configured
+start_metrics_export()
 
 def display_game_details(game):
     # Create columns for team names and scores
@@ -41,6 +48,8 @@ def display_game_details(game):
         elif game['status'] == "Upcoming":
             st.markdown(f"<h3 style='color:blue; text-align:center'>UPCOMING</h3>", unsafe_allow_html=True)
             st.markdown(f"<p style='text-align:center'>Today {game['time']}</p>", unsafe_allow_html=True)
+        elif game['status'] in ["Postponed", "Cancelled"]:
+            st.markdown(f"<h3 style='text-align:center'>{game['status'].upper()}</h3>", unsafe_allow_html=True)
         else:
             st.markdown(f"<h3 style='text-align:center'>FINAL</h3>", unsafe_allow_html=True)
     
@@ -162,17 +171,23 @@ def main():
         date_options = {
             "Yesterday": yesterday,
             "Today": today,
-            "Tomorrow": tomorrow
+            "Tomorrow": tomorrow,
+            "Other date": None
         }
         
         selected_date_str = st.selectbox("Date", list(date_options.keys()))
         selected_date = date_options[selected_date_str]
+        if selected_date is None:
+            # Finished games are archived locally, so past dates only cost upstream requests once
+            selected_date = st.date_input("Pick a date", value=yesterday - timedelta(days=1))
+            selected_date_str = selected_date.strftime('%B %d, %Y')
     
     with col3:
         # Add a refresh button
         st.write("&nbsp;")  # Add some spacing
         if st.button("Refresh Data"):
             st.cache_data.clear()
+            clear_caches()
             st.experimental_rerun()
     
     # Get live games based on selections
@@ -0,0 +1,10 @@
+import os
+import tempfile
+
+# Answer every MLB Stats API request from fixtures written by the tests, and
+# keep the archive and team registry out of the working tree. Set before
+# anything imports utils, which reads these once.
+_data_dir = tempfile.mkdtemp(prefix='mlb-tests-')
+os.environ.setdefault('MLB_REPLAY_DIR', _data_dir)
+os.environ.setdefault('MLB_ARCHIVE_PATH', os.path.join(_data_dir, 'archive.sqlite3'))
+os.environ.setdefault('MLB_TEAM_REGISTRY_PATH', os.path.join(_data_dir, 'teams.json'))
@@ -0,0 +1,21 @@
+from utils.archive import GameArchive
+
+def _game(game_pk, date_str, status):
+    return {'id': game_pk, 'date': date_str, 'status': status, 'home_team_id': '1', 'away_team_id': '2'}
+
+def test_slate_keeps_unplayed_games_by_date(tmp_path):
+    archive = GameArchive(str(tmp_path / 'archive.sqlite3'))
+    archive.put_games([_game(1, '2025-06-01', 'Finished')])
+    archive.put_slate('2025-06-01', [1, 2], [_game(2, '2025-06-01', 'Postponed')])
+    # The postponed game is made up later under the same gamePk
+    archive.put_games([_game(2, '2025-06-03', 'Finished')])
+    archive.put_slate('2025-06-03', [2])
+    assert [g['status'] for g in archive.slate('2025-06-01')] == ['Finished', 'Postponed']
+    assert [g['status'] for g in archive.slate('2025-06-03')] == ['Finished']
+    assert archive.games_on('2025-06-01') == [_game(1, '2025-06-01', 'Finished')]
+
+def test_slate_missing_a_game_is_not_served(tmp_path):
+    archive = GameArchive(str(tmp_path / 'archive.sqlite3'))
+    archive.put_games([_game(1, '2025-06-01', 'Finished')])
+    archive.put_slate('2025-06-01', [1, 2])
+    assert archive.slate('2025-06-01') is None
@@ -0,0 +1,11 @@
+from utils.boxscore import build_box_score
+from utils.models import BattingLine, PitcherLine, PlayerLine
+
+def test_two_way_player_keeps_batting_and_pitching_apart():
+    line = PlayerLine('Two Way', BattingLine(4, 1, 1, 0, 0, walks=1, strikeouts=2),
+                      PitcherLine(strikeouts=9, walks=3, innings_pitched='6.0', pitches=95))
+    player = line.to_dict()
+    assert PlayerLine.from_dict(player) == line
+    box = build_box_score({'home_team': 'Home', 'away_team': 'Away', 'player_stats': {'Home': [player]}})
+    assert box.team_rows('batting', 'Home')[0]['BB'] == 1 and box.team_rows('batting', 'Home')[0]['K'] == 2
+    assert box.team_rows('pitching', 'Home')[0]['BB'] == 3 and box.team_rows('pitching', 'Home')[0]['K'] == 9
@@ -0,0 +1,124 @@
+import asyncio
+import copy
+import pytest
+from utils.live_feed import LiveGameTracker, PatchError, apply_json_patch
+
+def test_add_replace_remove():
+    doc = {'a': {'b': 1}, 'list': [1, 2]}
+    doc, touched = apply_json_patch(doc, [
+        {'op': 'add', 'path': '/a/c', 'value': 2},
+        {'op': 'replace', 'path': '/a/b', 'value': 3},
+        {'op': 'add', 'path': '/list/-', 'value': 3},
+        {'op': 'add', 'path': '/list/0', 'value': 0},
+        {'op': 'remove', 'path': '/list/1'},
+    ])
+    assert doc == {'a': {'b': 3, 'c': 2}, 'list': [0, 2, 3]}
+    assert touched == [['a', 'c'], ['a', 'b'], ['list', '-'], ['list', '0'], ['list', '1']]
+
+def test_move_copy_test():
+    doc = {'a': 1, 'b': {}}
+    doc, touched = apply_json_patch(doc, [
+        {'op': 'test', 'path': '/a', 'value': 1},
+        {'op': 'copy', 'from': '/a', 'path': '/b/copied'},
+        {'op': 'move', 'from': '/a', 'path': '/b/moved'},
+    ])
+    assert doc == {'b': {'copied': 1, 'moved': 1}}
+    assert ['a'] in touched
+
+def test_copy_is_independent():
+    doc, _ = apply_json_patch({'a': {'x': 1}, 'b': {}}, [
+        {'op': 'copy', 'from': '/a', 'path': '/b/c'},
+        {'op': 'replace', 'path': '/a/x', 'value': 2},
+    ])
+    assert doc == {'a': {'x': 2}, 'b': {'c': {'x': 1}}}
+
+def test_add_at_end_index():
+    doc, _ = apply_json_patch({'a': [1]}, [{'op': 'add', 'path': '/a/1', 'value': 2}])
+    assert doc == {'a': [1, 2]}
+
+def test_escaped_pointer():
+    doc, _ = apply_json_patch({'a/b': 1, 'c~d': 2}, [
+        {'op': 'replace', 'path': '/a~1b', 'value': 3},
+        {'op': 'remove', 'path': '/c~0d'},
+    ])
+    assert doc == {'a/b': 3}
+
+def test_replace_root():
+    doc, _ = apply_json_patch({'a': 1}, [{'op': 'replace', 'path': '', 'value': {'b': 2}}])
+    assert doc == {'b': 2}
+
+@pytest.mark.parametrize('operation', [
+    {'op': 'replace', 'path': '/missing', 'value': 1},
+    {'op': 'remove', 'path': '/missing'},
+    {'op': 'remove', 'path': ''},
+    {'op': 'test', 'path': '/a', 'value': 2},
+    {'op': 'add', 'path': 'a', 'value': 1},
+    {'op': 'add', 'path': '/a/b', 'value': 1},
+    {'op': 'bogus', 'path': '/a'},
+    {'op': 'add', 'path': '/list/5', 'value': 9},
+    {'op': 'add', 'path': '/list/-1', 'value': 9},
+    {'op': 'replace', 'path': '/list/1', 'value': 9},
+    {'op': 'remove', 'path': '/list/-1'},
+])
+def test_invalid_operations(operation):
+    with pytest.raises(PatchError):
+        apply_json_patch({'a': 1, 'list': [1]}, [operation])
+
+def _feed(timestamp, plays):
+    return {'metaData': {'timeStamp': timestamp},
+            'liveData': {'plays': {'allPlays': plays}, 'boxscore': {'teams': {}}}}
+
+class StubClient:
+    """Answers feed/live and diffPatch requests from canned responses, raising any that are exceptions"""
+
+    def __init__(self, feeds, diffs):
+        self.feeds = list(feeds)
+        self.diffs = list(diffs)
+        self.requests = []
+
+    async def get_json(self, endpoint, path, params=None):
+        self.requests.append(path)
+        response = self.diffs.pop(0) if path.endswith('diffPatch') else self.feeds.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return copy.deepcopy(response)
+
+def test_tracker_applies_diff():
+    client = StubClient([_feed('t0', [1])], [[{'diff': [
+        {'op': 'add', 'path': '/liveData/plays/allPlays/-', 'value': 2},
+        {'op': 'replace', 'path': '/metaData/timeStamp', 'value': 't1'},
+    ]}]])
+    tracker = LiveGameTracker(client)
+    asyncio.run(tracker.update(1))
+    _, _, changed, timestamp = asyncio.run(tracker.update(1))
+    assert changed and timestamp == 't1'
+    assert tracker._games[1]['feed']['liveData']['plays']['allPlays'] == [1, 2]
+
+def test_tracker_reloads_after_failed_patch():
+    # The first operation applies, the second fails, leaving the feed half-patched
+    bad_diff = [{'diff': [
+        {'op': 'add', 'path': '/liveData/plays/allPlays/-', 'value': 2},
+        {'op': 'replace', 'path': '/missing/path', 'value': 1},
+    ]}]
+    client = StubClient([_feed('t0', [1]), _feed('t1', [1, 2])], [bad_diff])
+    tracker = LiveGameTracker(client)
+    asyncio.run(tracker.update(1))
+    _, _, changed, timestamp = asyncio.run(tracker.update(1))
+    assert changed and timestamp == 't1'
+    assert tracker._games[1]['feed']['liveData']['plays']['allPlays'] == [1, 2]
+
+def test_tracker_forgets_feed_when_reload_fails():
+    bad_diff = [{'diff': [
+        {'op': 'add', 'path': '/liveData/plays/allPlays/-', 'value': 2},
+        {'op': 'replace', 'path': '/missing/path', 'value': 1},
+    ]}]
+    client = StubClient([_feed('t0', [1]), ConnectionError('down'), _feed('t1', [1, 2])], [bad_diff])
+    tracker = LiveGameTracker(client)
+    asyncio.run(tracker.update(1))
+    with pytest.raises(ConnectionError):
+        asyncio.run(tracker.update(1))
+    # Nothing half-patched is left behind, the next poll downloads the full feed again
+    assert tracker.tracked() == []
+    asyncio.run(tracker.update(1))
+    assert client.requests[-1].endswith('/feed/live')
+    assert tracker._games[1]['feed']['liveData']['plays']['allPlays'] == [1, 2]
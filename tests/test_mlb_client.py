@@ -0,0 +1,51 @@
+import asyncio
+import httpx
+import pytest
+import requests
+from utils.mlb_client import RETRY, AsyncMLBStatsClient, MLBStatsClient
+
+class FailingGet:
+    """Stands in for a session's or httpx client's get, raising error on every call"""
+
+    def __init__(self, error):
+        self.error = error
+        self.calls = 0
+
+    def __call__(self, *args, **kwargs):
+        self.calls += 1
+        raise self.error
+
+@pytest.fixture
+def client(monkeypatch):
+    client = MLBStatsClient(replay_dir=None, record_dir=None)
+    monkeypatch.setattr(client, '_backoff', lambda attempt, response=None: 0)
+    return client
+
+@pytest.mark.parametrize('error, calls', [
+    (requests.ReadTimeout('read timed out'), 1),
+    (requests.ConnectTimeout('connect timed out'), RETRY['total'] + 1),
+    (requests.ConnectionError('refused'), RETRY['total'] + 1),
+])
+def test_sync_retries(client, error, calls):
+    client.session.get = FailingGet(error)
+    with pytest.raises(type(error)):
+        client.get('feed', '/api/v1/schedule')
+    assert client.session.get.calls == calls
+
+@pytest.mark.parametrize('error, calls', [
+    (httpx.ReadTimeout('read timed out'), 1),
+    (httpx.ConnectTimeout('connect timed out'), RETRY['total'] + 1),
+    (httpx.ConnectError('refused'), RETRY['total'] + 1),
+])
+def test_async_retries(client, error, calls):
+    async_client = AsyncMLBStatsClient(client)
+    http_client = httpx.AsyncClient()
+    http_client.get = FailingGet(error)
+    async_client._client = lambda: http_client
+
+    async def get():
+        await async_client.get('feed', '/api/v1/schedule')
+
+    with pytest.raises(type(error)):
+        asyncio.run(get())
+    assert http_client.get.calls == calls
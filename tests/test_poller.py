@@ -0,0 +1,16 @@
+import time
+from datetime import date
+from utils.poller import ERROR_INTERVAL, POLL_INTERVALS, GamePoller, _next_interval
+
+def test_next_interval():
+    assert _next_interval([]) == POLL_INTERVALS['Upcoming']
+    assert _next_interval([{'status': 'Finished'}, {'status': 'Live'}]) == POLL_INTERVALS['Live']
+    assert _next_interval([{'status': 'Finished'}, {'status': 'Postponed'}]) is None
+
+def test_failed_poll_is_retried_soon():
+    # No schedule fixture for this date, upstream answers 404
+    day = date(2001, 1, 2)
+    poller = GamePoller()
+    poller._window = lambda: [day]
+    poller.poll_once()
+    assert poller._next_refresh[day] - time.monotonic() <= ERROR_INTERVAL
@@ -0,0 +1,75 @@
+import os
+from datetime import date, timedelta
+import pytest
+from benchmarks.fixtures import build_slate
+from utils.archive import game_archive
+from utils.cache import cache
+from utils.mlb_client import UPSTREAM_REQUESTS, async_mlb_client, mlb_client
+from utils.replay import MLB_REPLAY_DIR, fixture_name
+from utils.sports_data import CACHE_TTL, _game_ttl, get_mlb_games
+
+@pytest.fixture(autouse=True)
+def clean_cache(monkeypatch):
+    # Fixtures answer instantly, don't wait on the upstream request budget
+    monkeypatch.setattr(mlb_client, 'rate_limiter', None)
+    monkeypatch.setattr(async_mlb_client, 'rate_limiter', None)
+    cache.clear()
+    game_archive.clear()
+    yield
+    cache.clear()
+    game_archive.clear()
+
+def _boxscore_fixture(game_pk):
+    return os.path.join(MLB_REPLAY_DIR, fixture_name(mlb_client._url(f'/api/v1/game/{game_pk}/boxscore')))
+
+def test_finished_game_ttl():
+    assert _game_ttl("Finished") is None
+    assert _game_ttl("Finished", player_stats=False) == _game_ttl("Live") == CACHE_TTL['live_games']
+
+def test_finished_game_is_reused():
+    today = date.today()
+    build_slate(MLB_REPLAY_DIR, today.isoformat(), 2, first_game_pk=700000, states=('Final',))
+    games = get_mlb_games(today)
+    assert all(game['player_stats'] and game['highlights'] for game in games)
+    before = UPSTREAM_REQUESTS.total()
+    assert get_mlb_games(today, force_refresh=True) == games
+    # Only the schedule is asked for again, the finished games come from the cache
+    assert UPSTREAM_REQUESTS.total() - before == 1
+
+def test_failed_boxscore_is_retried():
+    today = date.today()
+    game_pks = build_slate(MLB_REPLAY_DIR, today.isoformat(), 2, first_game_pk=710000, states=('Final',))
+    path = _boxscore_fixture(game_pks[0])
+    os.rename(path, f'{path}.bak')
+    try:
+        games = get_mlb_games(today)
+    finally:
+        os.rename(f'{path}.bak', path)
+    assert games[0]['status'] == "Finished" and games[0]['player_stats'] == {}
+    assert games[1]['player_stats']
+
+    games = get_mlb_games(today, force_refresh=True)
+    assert games[0]['player_stats']
+
+def test_failed_load():
+    # No schedule fixture for this date, upstream answers 404
+    day = date(2001, 1, 1)
+    assert get_mlb_games(day) == []
+    with pytest.raises(Exception):
+        get_mlb_games(day, force_refresh=True)
+
+def test_viewed_date_stays_cached():
+    day = date.today() + timedelta(days=5)
+    build_slate(MLB_REPLAY_DIR, day.isoformat(), 2, first_game_pk=720000, states=('Scheduled',))
+    games = get_mlb_games(day)
+    before = UPSTREAM_REQUESTS.total()
+    assert get_mlb_games(day) == games
+    assert UPSTREAM_REQUESTS.total() == before
+
+def test_unviewed_date_is_evicted():
+    day = date.today() + timedelta(days=5)
+    build_slate(MLB_REPLAY_DIR, day.isoformat(), 2, first_game_pk=720000, states=('Scheduled',))
+    get_mlb_games(day, force_refresh=True)
+    build_slate(MLB_REPLAY_DIR, date.today().isoformat(), 2, first_game_pk=730000, states=('Scheduled',))
+    get_mlb_games(date.today(), force_refresh=True)
+    assert cache.keys('slate:') == [f'slate:{date.today().isoformat()}']
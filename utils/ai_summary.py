@@ -2,11 +2,19 @@ import os
 import google.generativeai as genai
 from datetime import datetime
 from typing import Dict, Any
+from utils.boxscore import build_box_score
+from utils.log import get_logger
+from utils.metrics import counter, histogram, timed
 
+logger = get_logger(__name__)
+
+SUMMARY_SECONDS = histogram('mlb_summary_seconds', 'Time spent generating game summaries with Gemini')
+SUMMARY_ERRORS = counter('mlb_summary_errors_total', 'Game summaries that failed to generate')
+
+@timed(SUMMARY_SECONDS)
 def generate_game_summary(game):
     """Generate a concise summary of the game using Gemini API"""
-    print("\n=== Raw Game Data ===")
-    print(game)
+    logger.debug("Raw game data: %s", game)
     
     genai.configure(api_key=os.getenv('GEMINI_API_KEY'))
     model = genai.GenerativeModel('gemini-2.0-flash')
@@ -23,42 +31,28 @@ def generate_game_summary(game):
     # Format player statistics
     player_stats_text = ""
     if 'player_stats' in game:
-        print("\n=== Player Stats ===")
-        print(game['player_stats'])
-        for team_type in ['home', 'away']:
-            team_name = home_team if team_type == 'home' else away_team
+        logger.debug("Player stats: %s", game['player_stats'])
+        box = build_box_score(game)
+        for team_name in (home_team, away_team):
             if team_name in game['player_stats']:
                 player_stats_text += f"\n{team_name} Players:\n"
-                for player in game['player_stats'][team_name]:
-                    stats = []
-                    # Add batting stats
-                    if player.get('hits', 0) > 0:
-                        stats.append(f"{player['hits']} hits")
-                    if player.get('runs', 0) > 0:
-                        stats.append(f"{player['runs']} runs")
-                    if player.get('rbi', 0) > 0:
-                        stats.append(f"{player['rbi']} RBI")
-                    if player.get('homeRuns', 0) > 0:
-                        stats.append(f"{player['homeRuns']} HR")
-                    
-                    # Add pitching stats
-                    if player.get('strikeouts', 0) > 0:
-                        stats.append(f"{player['strikeouts']} K")
-                    if player.get('innings_pitched', '0.0') != '0.0':
-                        stats.append(f"{player['innings_pitched']} IP")
-                    if player.get('earned_runs', 0) > 0:
-                        stats.append(f"{player['earned_runs']} ER")
-                    if player.get('walks', 0) > 0:
-                        stats.append(f"{player['walks']} BB")
-                    
-                    if stats:
-                        player_stats_text += f"- {player['name']}: {', '.join(stats)}\n"
+                for player in box.team_rows('batting', team_name):
+                    stats = [f"{player['H']}-{player['AB']}"]
+                    for column in ('R', 'RBI', 'HR', 'BB', 'K'):
+                        if player[column] > 0:
+                            stats.append(f"{player[column]} {column}")
+                    player_stats_text += f"- {player['Name']}: {', '.join(stats)}\n"
+                for player in box.team_rows('pitching', team_name):
+                    stats = [f"{player['IP']} IP"]
+                    for column in ('H', 'ER', 'BB', 'K', 'P'):
+                        if player[column] > 0:
+                            stats.append(f"{player[column]} {column}")
+                    player_stats_text += f"- {player['Name']} (pitching): {', '.join(stats)}\n"
     
     # Format highlights
     highlights_text = ""
     if 'highlights' in game and game['highlights']:
-        print("\n=== Highlights ===")
-        print(game['highlights'])
+        logger.debug("Highlights: %s", game['highlights'])
         highlights_text = "\nKey Moments:\n"
         for highlight in game['highlights']:
             highlights_text += f"- {highlight['description']} ({highlight['timestamp']})\n"
@@ -66,8 +60,7 @@ def generate_game_summary(game):
     # Get team season stats for upcoming games
     team_stats_text = ""
     if status == "Upcoming" and 'team_stats' in game:
-        print("\n=== Team Stats ===")
-        print(game['team_stats'])
+        logger.debug("Team stats: %s", game['team_stats'])
         team_stats = game['team_stats']
         team_stats_text = "\n2024 Season Stats:\n"
         
@@ -187,8 +180,7 @@ def generate_game_summary(game):
         Keep the summary concise but informative.
         """
     
-    print("\n=== Formatted Prompt ===")
-    print(prompt)
+    logger.debug("Formatted prompt: %s", prompt)
     
     try:
         response = model.generate_content(prompt)
@@ -200,5 +192,6 @@ def generate_game_summary(game):
         
         return summary
     except Exception as e:
-        print(f"Error generating summary: {str(e)}")
+        SUMMARY_ERRORS.inc()
+        logger.error("Error generating summary: %s", e)
         return f"Error generating summary. Please try again later."
\ No newline at end of file
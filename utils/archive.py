@@ -0,0 +1,206 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Set
+from utils.log import get_logger
+from utils.mlb_client import json_loads
+
+logger = get_logger(__name__)
+
+# Where finished games are archived between runs
+ARCHIVE_PATH = os.getenv('MLB_ARCHIVE_PATH', os.path.join('.cache', 'mlb_archive.sqlite3'))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS games (
+    game_pk INTEGER PRIMARY KEY,
+    date TEXT NOT NULL,
+    home_team_id TEXT,
+    away_team_id TEXT,
+    record TEXT NOT NULL,
+    archived_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS games_date ON games (date);
+CREATE INDEX IF NOT EXISTS games_home_team ON games (home_team_id, date);
+CREATE INDEX IF NOT EXISTS games_away_team ON games (away_team_id, date);
+CREATE TABLE IF NOT EXISTS slates (
+    date TEXT PRIMARY KEY,
+    game_pks TEXT NOT NULL,
+    archived_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS unplayed_games (
+    date TEXT NOT NULL,
+    game_pk INTEGER NOT NULL,
+    record TEXT NOT NULL,
+    PRIMARY KEY (date, game_pk)
+);
+CREATE TABLE IF NOT EXISTS backfilled_dates (
+    date TEXT PRIMARY KEY,
+    games INTEGER NOT NULL,
+    backfilled_at REAL NOT NULL
+);
+"""
+
+class GameArchive:
+    """
+    SQLite archive of finished games
+
+    Each finished game's dict (as get_mlb_games returns it: linescore,
+    decisions, player stats, highlights, and team season stats as of when it
+    was archived) is written once and read back by gamePk, date or team. A
+    date whose games are all final is recorded as a complete slate, which
+    can then be served without asking upstream for its schedule.
+
+    Games a past slate lists but that were never played (postponed,
+    cancelled) are kept with the slate, by date. A postponed game keeps its
+    gamePk when it is made up, so its record on the makeup date must not
+    replace the one on the original date.
+
+    The database is opened on first use. Errors are logged and treated as
+    misses, the archive only ever saves upstream requests.
+    """
+
+    def __init__(self, path: str = ARCHIVE_PATH):
+        self.path = path
+        self._conn = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.executescript(_SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def _query(self, sql: str, params: Iterable = ()) -> List[tuple]:
+        try:
+            with self._lock:
+                return self._connect().execute(sql, tuple(params)).fetchall()
+        except sqlite3.Error as e:
+            logger.warning("Game archive error: %s", e)
+            return []
+
+    def put_games(self, games: List[Dict[str, Any]]):
+        """Archive finished games, replacing any earlier record with the same gamePk"""
+        now = time.time()
+        rows = [
+            (game['id'], game['date'], game.get('home_team_id'), game.get('away_team_id'), json.dumps(game), now)
+            for game in games
+        ]
+        if not rows:
+            return
+        try:
+            with self._lock:
+                conn = self._connect()
+                with conn:
+                    conn.execute('BEGIN')
+                    conn.executemany(
+                        'INSERT INTO games (game_pk, date, home_team_id, away_team_id, record, archived_at) '
+                        'VALUES (?, ?, ?, ?, ?, ?) '
+                        'ON CONFLICT (game_pk) DO UPDATE SET date = excluded.date, '
+                        'home_team_id = excluded.home_team_id, away_team_id = excluded.away_team_id, '
+                        'record = excluded.record, archived_at = excluded.archived_at',
+                        rows
+                    )
+        except sqlite3.Error as e:
+            logger.warning("Error archiving %d games: %s", len(rows), e)
+
+    def put_slate(self, date_str: str, game_pks: List[int], unplayed: List[Dict[str, Any]] = ()):
+        """
+        Record that a date's games, in schedule order, are all archived
+
+        unplayed holds the slate's games that were never played, which are
+        stored with the slate rather than in games (see the class docstring).
+        """
+        rows = [(date_str, game['id'], json.dumps(game)) for game in unplayed]
+        try:
+            with self._lock:
+                conn = self._connect()
+                with conn:
+                    conn.execute('BEGIN')
+                    conn.execute('DELETE FROM unplayed_games WHERE date = ?', (date_str,))
+                    conn.executemany('INSERT INTO unplayed_games (date, game_pk, record) VALUES (?, ?, ?)', rows)
+                    conn.execute(
+                        'INSERT OR REPLACE INTO slates (date, game_pks, archived_at) VALUES (?, ?, ?)',
+                        (date_str, json.dumps(game_pks), time.time())
+                    )
+        except sqlite3.Error as e:
+            logger.warning("Error archiving the slate for %s: %s", date_str, e)
+
+    def get(self, game_pk: int) -> Optional[Dict[str, Any]]:
+        """Get an archived game by gamePk"""
+        rows = self._query('SELECT record FROM games WHERE game_pk = ?', (game_pk,))
+        return json_loads(rows[0][0]) if rows else None
+
+    def get_games(self, game_pks: List[int]) -> Dict[int, Dict[str, Any]]:
+        """Get the archived games among game_pks, keyed by gamePk"""
+        games = {}
+        # Stay under SQLite's bound parameter limit
+        for i in range(0, len(game_pks), 500):
+            chunk = game_pks[i:i + 500]
+            rows = self._query(
+                f"SELECT game_pk, record FROM games WHERE game_pk IN ({','.join('?' * len(chunk))})", chunk
+            )
+            games.update((game_pk, json_loads(record)) for game_pk, record in rows)
+        return games
+
+    def slate(self, date_str: str) -> Optional[List[Dict[str, Any]]]:
+        """Get a complete slate's games in schedule order, or None if the date isn't archived"""
+        rows = self._query('SELECT game_pks FROM slates WHERE date = ?', (date_str,))
+        if not rows:
+            return None
+        game_pks = json_loads(rows[0][0])
+        unplayed = self._query('SELECT game_pk, record FROM unplayed_games WHERE date = ?', (date_str,))
+        games = {game_pk: json_loads(record) for game_pk, record in unplayed}
+        games.update(self.get_games([game_pk for game_pk in game_pks if game_pk not in games]))
+        if any(game_pk not in games for game_pk in game_pks):
+            return None
+        return [games[game_pk] for game_pk in game_pks]
+
+    def games_on(self, date_str: str) -> List[Dict[str, Any]]:
+        """Get every archived game played on a date"""
+        rows = self._query('SELECT record FROM games WHERE date = ? ORDER BY game_pk', (date_str,))
+        return [json_loads(record) for record, in rows]
+
+    def team_games(self, team_id: str, start_date: Optional[str] = None,
+                   end_date: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Get a team's archived games, oldest first, optionally between two dates (inclusive)"""
+        start_date = start_date or '0000-00-00'
+        end_date = end_date or '9999-99-99'
+        rows = self._query(
+            'SELECT record FROM games WHERE home_team_id = ? AND date BETWEEN ? AND ? '
+            'UNION ALL '
+            'SELECT record FROM games WHERE away_team_id = ? AND date BETWEEN ? AND ?',
+            (str(team_id), start_date, end_date, str(team_id), start_date, end_date)
+        )
+        games = [json_loads(record) for record, in rows]
+        games.sort(key=lambda game: (game['date'], game['time'], game['id']))
+        return games
+
+    def dates(self) -> List[str]:
+        """Get every date with a complete archived slate, oldest first"""
+        return [date_str for date_str, in self._query('SELECT date FROM slates ORDER BY date')]
+
+    def mark_backfilled(self, date_str: str, games: int):
+        """Record that a backfill finished a date, see utils/backfill.py"""
+        self._query(
+            'INSERT OR REPLACE INTO backfilled_dates (date, games, backfilled_at) VALUES (?, ?, ?)',
+            (date_str, games, time.time())
+        )
+
+    def backfilled_dates(self) -> Set[str]:
+        """Get every date a backfill has finished"""
+        return {date_str for date_str, in self._query('SELECT date FROM backfilled_dates')}
+
+    def clear(self):
+        """Delete every archived game and slate, and the backfill checkpoints"""
+        self._query('DELETE FROM games')
+        self._query('DELETE FROM slates')
+        self._query('DELETE FROM unplayed_games')
+        self._query('DELETE FROM backfilled_dates')
+
+# Shared archive instance
+game_archive = GameArchive()
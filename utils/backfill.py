@@ -0,0 +1,150 @@
+"""
+Backfill the game archive with a season or a date range
+
+Every date is loaded through get_mlb_games, so games are parsed exactly as
+the app parses them and archived by gamePk (re-running only upserts). Several
+dates are loaded at once, each fanning out its boxscore requests, all under
+the shared rate limiter. Finished dates are checkpointed in the archive, so
+an interrupted run picks up where it stopped.
+
+Usage:
+    python -m utils.backfill --season 2025
+    python -m utils.backfill --start 2025-06-01 --end 2025-06-30 --concurrency 8
+"""
+import argparse
+import asyncio
+import time
+from datetime import date, datetime, timedelta
+from typing import List, Optional, Tuple
+from utils.archive import game_archive
+from utils.log import get_logger
+from utils.mlb_client import async_mlb_client, mlb_client
+from utils.rate_limit import create_rate_limiter
+from utils.sports_data import RATE_LIMIT, get_mlb_games_async
+
+logger = get_logger(__name__)
+
+# Dates loaded at once. Each date also fans out up to MLB_MAX_WORKERS boxscore requests.
+BACKFILL_CONCURRENCY = 4
+
+def season_dates(season: int) -> Tuple[date, date]:
+    """Get the first and last day of a season's regular season"""
+    data = mlb_client.get_json('schedule', f'/api/v1/seasons/{season}', params={'sportId': 1})
+    info = data['seasons'][0]
+    return (datetime.strptime(info['regularSeasonStartDate'], '%Y-%m-%d').date(),
+            datetime.strptime(info['regularSeasonEndDate'], '%Y-%m-%d').date())
+
+async def _has_games(day: date) -> bool:
+    """Ask upstream whether a date has any games, to tell off days from failed loads"""
+    data = await async_mlb_client.get_json(
+        'schedule',
+        '/api/v1/schedule',
+        params={'sportId': 1, 'date': day.strftime('%Y-%m-%d'), 'fields': 'dates,totalGames'}
+    )
+    return any(d.get('totalGames') for d in data.get('dates', []))
+
+async def backfill_date(day: date) -> Optional[int]:
+    """
+    Load and archive one date
+
+    Returns the number of games archived, or None if the date has to be
+    retried: the load failed, or a finished game's boxscore couldn't be loaded.
+    """
+    date_str = day.strftime('%Y-%m-%d')
+    games = await get_mlb_games_async(day)
+    if not games:
+        # get_mlb_games returns no games both for off days and on errors
+        try:
+            if await _has_games(day):
+                return None
+        except Exception as e:
+            logger.error("Error checking the schedule for %s: %s", date_str, e)
+            return None
+        await asyncio.to_thread(game_archive.mark_backfilled, date_str, 0)
+        return 0
+
+    # Games that were never played (postponed, cancelled) are kept with the slate, not as games
+    finished = [g['id'] for g in games if g['status'] == "Finished"]
+    archived = await asyncio.to_thread(game_archive.get_games, finished)
+    if len(archived) != len(finished):
+        return None
+    await asyncio.to_thread(game_archive.mark_backfilled, date_str, len(archived))
+    return len(archived)
+
+async def backfill_async(start: date, end: date, concurrency: int = BACKFILL_CONCURRENCY,
+                         force: bool = False) -> Tuple[int, List[str]]:
+    """
+    Archive every game from start to end (inclusive)
+
+    Dates a previous run finished are skipped unless force is set. Returns
+    the number of games archived and the dates that failed.
+    """
+    end = min(end, date.today() - timedelta(days=1))
+    days = [start + timedelta(days=i) for i in range((end - start).days + 1)]
+    done = set() if force else await asyncio.to_thread(game_archive.backfilled_dates)
+    todo = [day for day in days if day.strftime('%Y-%m-%d') not in done]
+    logger.info("Backfilling %d dates from %s to %s (%d already done)", len(todo), start, end, len(days) - len(todo))
+
+    semaphore = asyncio.Semaphore(concurrency)
+    started = time.perf_counter()
+    progress = {'dates': 0, 'games': 0}
+    failed = []
+
+    async def run(day: date):
+        async with semaphore:
+            try:
+                count = await backfill_date(day)
+            except Exception as e:
+                logger.error("Error backfilling %s: %s", day, e)
+                count = None
+        progress['dates'] += 1
+        if count is None:
+            failed.append(day.strftime('%Y-%m-%d'))
+            logger.warning("Backfill of %s incomplete, it will be retried on the next run", day)
+            return
+        progress['games'] += count
+        elapsed = time.perf_counter() - started
+        logger.info(
+            "Backfilled %s: %d games (%d/%d dates, %d games, %.1f games/s)",
+            day, count, progress['dates'], len(todo), progress['games'], progress['games'] / elapsed if elapsed else 0,
+            extra={'date': day.strftime('%Y-%m-%d'), 'games': count}
+        )
+
+    await asyncio.gather(*(run(day) for day in todo))
+    return progress['games'], sorted(failed)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--season', type=int, help='Backfill this season\'s regular season')
+    parser.add_argument('--start', help='First date, YYYY-MM-DD')
+    parser.add_argument('--end', help='Last date, YYYY-MM-DD (defaults to yesterday)')
+    parser.add_argument('--concurrency', type=int, default=BACKFILL_CONCURRENCY, help='Dates loaded at once')
+    parser.add_argument('--requests-per-minute', type=int, default=RATE_LIMIT['requests_per_minute'],
+                        help='Upstream request budget for this run')
+    parser.add_argument('--force', action='store_true', help='Recheck dates a previous run finished')
+    args = parser.parse_args()
+
+    if args.season:
+        start, end = season_dates(args.season)
+    elif args.start:
+        start, end = None, date.today() - timedelta(days=1)
+    else:
+        parser.error('pass --season or --start')
+    if args.start:
+        start = datetime.strptime(args.start, '%Y-%m-%d').date()
+    if args.end:
+        end = datetime.strptime(args.end, '%Y-%m-%d').date()
+
+    # A budget passed explicitly applies to this process only, even with RATE_LIMIT_REDIS set
+    if args.requests_per_minute != RATE_LIMIT['requests_per_minute']:
+        rate_limiter = create_rate_limiter({**RATE_LIMIT, 'requests_per_minute': args.requests_per_minute})
+        mlb_client.rate_limiter = async_mlb_client.rate_limiter = rate_limiter
+
+    started = time.perf_counter()
+    games, failed = asyncio.run(backfill_async(start, end, args.concurrency, args.force))
+    print(f"Archived {games} games in {time.perf_counter() - started:.0f}s")
+    if failed:
+        print(f"{len(failed)} dates failed and will be retried on the next run: {', '.join(failed)}")
+
+if __name__ == '__main__':
+    main()
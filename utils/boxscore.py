@@ -0,0 +1,83 @@
+from dataclasses import dataclass
+from typing import Any, Dict, List
+
+# (column, player_stats key) in display order, see PlayerLine.to_dict
+BATTING_COLUMNS = (('AB', 'atBats'), ('H', 'hits'), ('R', 'runs'), ('RBI', 'rbi'), ('HR', 'homeRuns'),
+                   ('BB', 'baseOnBalls'), ('K', 'strikeOuts'))
+PITCHING_COLUMNS = (('IP', 'innings_pitched'), ('H', 'hits_allowed'), ('R', 'runs_allowed'), ('ER', 'earned_runs'),
+                    ('BB', 'pitching_walks'), ('K', 'pitching_strikeouts'), ('P', 'pitches'))
+
+def innings_to_outs(innings_pitched: str) -> int:
+    """Convert upstream's innings pitched ('5.2' is five and two thirds) to outs"""
+    whole, _, thirds = str(innings_pitched).partition('.')
+    return int(whole or 0) * 3 + int(thirds or 0)
+
+def outs_to_innings(outs: int) -> str:
+    """Convert outs to innings pitched as upstream writes them"""
+    return f"{outs // 3}.{outs % 3}"
+
+def _empty_table(columns) -> Dict[str, list]:
+    table = {'Team': [], 'Name': []}
+    for column, _ in columns:
+        table[column] = []
+    return table
+
+@dataclass(slots=True)
+class BoxScore:
+    """
+    Both teams' batting and pitching lines for one game, column by column
+
+    batting and pitching map a column name ('Team', 'Name', then
+    BATTING_COLUMNS or PITCHING_COLUMNS) to one value per player line, in
+    the order the lines appear in the game's player_stats. Build one with
+    build_box_score and hand it to everything that reads the lines.
+    """
+    batting: Dict[str, list]
+    pitching: Dict[str, list]
+
+    def team_table(self, table: str, team: str) -> Dict[str, list]:
+        """Get one team's rows of the 'batting' or 'pitching' table, without the Team column"""
+        columns = getattr(self, table)
+        rows = [i for i, row_team in enumerate(columns['Team']) if row_team == team]
+        return {column: [values[i] for i in rows] for column, values in columns.items() if column != 'Team'}
+
+    def team_rows(self, table: str, team: str) -> List[Dict[str, Any]]:
+        """Get one team's rows of the 'batting' or 'pitching' table as dicts"""
+        columns = self.team_table(table, team)
+        return [dict(zip(columns, values)) for values in zip(*columns.values())]
+
+    def totals(self, table: str, team: str) -> Dict[str, Any]:
+        """Get one team's column totals of the 'batting' or 'pitching' table, IP added up in outs"""
+        columns = self.team_table(table, team)
+        totals = {}
+        for column, values in columns.items():
+            if column == 'Name':
+                continue
+            if column == 'IP':
+                totals[column] = outs_to_innings(sum(innings_to_outs(value) for value in values))
+            else:
+                totals[column] = sum(values)
+        return totals
+
+def build_box_score(game: Dict[str, Any]) -> BoxScore:
+    """
+    Lay out a game's player_stats as a BoxScore in one pass over both teams
+
+    Lines without a batting (or pitching) part are left out of that table.
+    """
+    batting = _empty_table(BATTING_COLUMNS)
+    pitching = _empty_table(PITCHING_COLUMNS)
+    player_stats = game.get('player_stats') or {}
+    for team in (game['home_team'], game['away_team']):
+        for player in player_stats.get(team, ()):
+            if 'hits' in player:
+                batting['Team'].append(team)
+                batting['Name'].append(player['name'])
+                for column, key in BATTING_COLUMNS:
+                    batting[column].append(player[key])
+            if 'innings_pitched' in player:
+                pitching['Team'].append(team)
+                pitching['Name'].append(player['name'])
+                for column, key in PITCHING_COLUMNS:
+                    pitching[column].append(player[key])
+    return BoxScore(batting, pitching)
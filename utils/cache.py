@@ -0,0 +1,291 @@
+import functools
+import hashlib
+import inspect
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Optional
+import redis
+from utils.log import get_logger
+from utils.metrics import callback, counter
+
+try:
+    import orjson
+
+    def _canonical_json(value: Any) -> bytes:
+        return orjson.dumps(value, option=orjson.OPT_SORT_KEYS, default=str)
+except ImportError:  # fall back to the standard library encoder
+    def _canonical_json(value: Any) -> bytes:
+        return json.dumps(value, sort_keys=True, separators=(',', ':'), default=str).encode()
+
+logger = get_logger(__name__)
+
+# Initialize Redis connection (if REDIS_URL is set in environment)
+redis_client = None
+if os.getenv('REDIS_URL'):
+    try:
+        redis_client = redis.from_url(os.getenv('REDIS_URL'))
+        logger.info("Successfully connected to Redis")
+    except Exception as e:
+        logger.warning("Failed to connect to Redis, falling back to in-memory caching: %s", e)
+else:
+    logger.info("No REDIS_URL found. Using in-memory caching.")
+
+# In-process cache budget, measured as the JSON-encoded size of the entries
+CACHE_MAX_BYTES = int(os.getenv('CACHE_MAX_BYTES', str(64 * 1024 * 1024)))
+
+# Redis TTL for entries that never expire in memory, so old dates still age out
+REDIS_MAX_TTL = 3 * 86400
+
+# Results kept per function memoized with memoize_render
+RENDER_CACHE_SIZE = int(os.getenv('RENDER_CACHE_SIZE', '256'))
+
+RENDER_CACHE_LOOKUPS = counter('mlb_render_cache_lookups_total', 'Memoized render lookups', ('kind', 'result'))
+
+class TwoTierCache:
+    """
+    Bounded in-process LRU cache with TTLs in front of Redis
+
+    Reads check memory first and only go to Redis on a miss, copying what
+    they find back into memory. Writes go to both tiers. Memory is bounded
+    by the encoded size of its entries, evicting the least recently used
+    ones first. Values must be JSON serializable, or be stored with an encode
+    function that makes them so (and read with the matching decode function).
+    Memory holds the values themselves, only Redis holds the encoding.
+    """
+
+    def __init__(self, redis_client=None, max_bytes: int = CACHE_MAX_BYTES, namespace: str = 'mlb'):
+        self.redis_client = redis_client
+        self.max_bytes = max_bytes
+        self.namespace = namespace
+        self._entries = OrderedDict()  # key -> (value, expires_at, size)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._stats = {'memory_hits': 0, 'redis_hits': 0, 'misses': 0, 'evictions': 0}
+
+    def _redis_key(self, key: str) -> str:
+        return f"{self.namespace}:{key}"
+
+    def _store(self, key: str, value: Any, expires_at: Optional[float], size: int):
+        """Put an entry in memory and evict down to the byte budget"""
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[2]
+            if size > self.max_bytes:
+                return
+            self._entries[key] = (value, expires_at, size)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, (_, _, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self._stats['evictions'] += 1
+
+    def get(self, key: str, allow_stale: bool = False,
+            decode: Optional[Callable[[Any], Any]] = None) -> Optional[Any]:
+        """
+        Get a value, or None if it is missing or expired
+
+        Args:
+            key: Cache key
+            allow_stale: Return an expired in-memory value instead of None
+            decode: Rebuild a value read from Redis from its JSON encoding
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, expires_at, _ = entry
+                if allow_stale or expires_at is None or time.monotonic() < expires_at:
+                    self._entries.move_to_end(key)
+                    self._stats['memory_hits'] += 1
+                    return value
+
+        if self.redis_client is not None:
+            try:
+                pipe = self.redis_client.pipeline()
+                pipe.get(self._redis_key(key))
+                pipe.pttl(self._redis_key(key))
+                data, pttl = pipe.execute()
+                if data is not None:
+                    value = json.loads(data)
+                    if decode is not None:
+                        value = decode(value)
+                    expires_at = time.monotonic() + pttl / 1000 if pttl and pttl > 0 else None
+                    self._store(key, value, expires_at, len(data))
+                    with self._lock:
+                        self._stats['redis_hits'] += 1
+                    return value
+            except Exception as e:
+                logger.warning("Redis cache error: %s", e)
+
+        with self._lock:
+            self._stats['misses'] += 1
+        return None
+
+    def set(self, key: str, value: Any, ttl: Optional[int], encode: Optional[Callable[[Any], Any]] = None):
+        """
+        Store a value in both tiers, a ttl of None meaning it never expires in memory
+
+        encode turns the value into something JSON serializable, for Redis
+        and for measuring its size.
+        """
+        data = json.dumps(encode(value) if encode is not None else value)
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+        self._store(key, value, expires_at, len(data))
+        if self.redis_client is not None:
+            try:
+                self.redis_client.setex(self._redis_key(key), ttl if ttl is not None else REDIS_MAX_TTL, data)
+            except Exception as e:
+                logger.warning("Redis cache error: %s", e)
+
+    def delete(self, key: str):
+        """Remove a value from both tiers"""
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self._bytes -= entry[2]
+        if self.redis_client is not None:
+            try:
+                self.redis_client.delete(self._redis_key(key))
+            except Exception as e:
+                logger.warning("Redis cache error: %s", e)
+
+    def delete_prefix(self, prefix: str):
+        """Remove every value whose key starts with prefix from both tiers"""
+        with self._lock:
+            for key in [key for key in self._entries if key.startswith(prefix)]:
+                self._bytes -= self._entries.pop(key)[2]
+        if self.redis_client is not None:
+            try:
+                keys = list(self.redis_client.scan_iter(match=f"{self._redis_key(prefix)}*"))
+                if keys:
+                    self.redis_client.delete(*keys)
+            except Exception as e:
+                logger.warning("Redis cache error: %s", e)
+
+    def keys(self, prefix: str = '') -> List[str]:
+        """Get the in-memory keys starting with prefix"""
+        with self._lock:
+            return [key for key in self._entries if key.startswith(prefix)]
+
+    def clear(self):
+        """Drop every in-memory entry (Redis entries expire on their own)"""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Get hit/miss counters and memory usage"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['entries'] = len(self._entries)
+            stats['bytes'] = self._bytes
+        lookups = stats['memory_hits'] + stats['redis_hits'] + stats['misses']
+        stats['hit_ratio'] = (stats['memory_hits'] + stats['redis_hits']) / lookups if lookups else 0.0
+        return stats
+
+# Shared cache used by every fetcher
+cache = TwoTierCache(redis_client)
+
+# Export the shared cache's counters, read at scrape time
+for _stat, _type, _doc in (
+    ('memory_hits', 'counter', 'Cache lookups answered from memory'),
+    ('redis_hits', 'counter', 'Cache lookups answered from Redis'),
+    ('misses', 'counter', 'Cache lookups that found nothing'),
+    ('evictions', 'counter', 'In-memory entries evicted to stay under CACHE_MAX_BYTES'),
+    ('entries', 'gauge', 'In-memory cache entries'),
+    ('bytes', 'gauge', 'Encoded size of the in-memory cache entries'),
+    ('hit_ratio', 'gauge', 'Fraction of cache lookups that hit either tier'),
+):
+    _name = f"mlb_cache_{_stat}_total" if _type == 'counter' else f"mlb_cache_{_stat}"
+    callback(_name, _doc, functools.partial(lambda stat: cache.stats()[stat], _stat), _type)
+
+def memoize(kind: str, ttl: int, cache_instance: Optional[TwoTierCache] = None) -> Callable:
+    """
+    Memoize a function in the shared cache, keyed by kind and its arguments
+
+    Falsy results (e.g. {} after a failed request) are not cached. The wrapped
+    function gets invalidate(*args) to drop one result, prime(args, value) to
+    store one fetched elsewhere, and cache_clear() to drop all of them.
+    Coroutine functions are supported and stay awaitable.
+    """
+    def decorator(fn: Callable) -> Callable:
+        def key(*args) -> str:
+            return f"{kind}:{':'.join(str(arg) for arg in args)}"
+
+        def target() -> TwoTierCache:
+            return cache_instance or cache
+
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def wrapper(*args):
+                value = target().get(key(*args))
+                if value is not None:
+                    return value
+                value = await fn(*args)
+                if value:
+                    target().set(key(*args), value, ttl)
+                return value
+        else:
+            @functools.wraps(fn)
+            def wrapper(*args):
+                value = target().get(key(*args))
+                if value is not None:
+                    return value
+                value = fn(*args)
+                if value:
+                    target().set(key(*args), value, ttl)
+                return value
+
+        wrapper.invalidate = lambda *args: target().delete(key(*args))
+        wrapper.prime = lambda args, value: target().set(key(*args), value, ttl)
+        wrapper.cache_clear = lambda: target().delete_prefix(f"{kind}:")
+        return wrapper
+    return decorator
+
+def content_hash(value: Any) -> str:
+    """Hash a JSON-serializable value by content, for memoizing on data that carries no version"""
+    return hashlib.blake2b(_canonical_json(value), digest_size=16).hexdigest()
+
+def memoize_render(kind: str, key: Callable[..., Optional[Hashable]], maxsize: int = RENDER_CACHE_SIZE) -> Callable:
+    """
+    Memoize a rendering function (DataFrames, figures) in a per-process LRU
+
+    key(*args) gets the function's arguments and returns what the result
+    depends on, e.g. a gamePk and feed version, or None to skip the cache.
+    Results are kept as they are rather than in the shared cache, which only
+    holds JSON, and are shared by every caller, so they must not be modified.
+    None results are not cached. The wrapped function gets cache_clear().
+    """
+    def decorator(fn: Callable) -> Callable:
+        entries = OrderedDict()
+        lock = threading.Lock()
+
+        @functools.wraps(fn)
+        def wrapper(*args):
+            version = key(*args)
+            if version is None:
+                return fn(*args)
+            with lock:
+                if version in entries:
+                    entries.move_to_end(version)
+                    RENDER_CACHE_LOOKUPS.inc(kind=kind, result='hit')
+                    return entries[version]
+            RENDER_CACHE_LOOKUPS.inc(kind=kind, result='miss')
+            value = fn(*args)
+            if value is not None:
+                with lock:
+                    entries[version] = value
+                    while len(entries) > maxsize:
+                        entries.popitem(last=False)
+            return value
+
+        def cache_clear():
+            with lock:
+                entries.clear()
+
+        wrapper.cache_clear = cache_clear
+        return wrapper
+    return decorator
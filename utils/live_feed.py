@@ -0,0 +1,342 @@
+import copy
+import threading
+from typing import Any, Dict, List, Optional, Set, Tuple
+from utils.log import get_logger
+from utils.mlb_client import async_mlb_client
+from utils.models import BattingLine, PitcherLine, PlayerLine
+
+logger = get_logger(__name__)
+
+# Boxscore players live under /liveData/boxscore/teams/<side>/players/<ID...>
+_PLAYERS_PATH = ('liveData', 'boxscore', 'teams')
+_HIGHLIGHTS_PATH = ('liveData', 'highlights')
+
+# Upstream stats in BattingLine field order
+_BATTING_STATS = ('atBats', 'hits', 'runs', 'rbi', 'homeRuns', 'baseOnBalls', 'strikeOuts')
+# Upstream stats and defaults in PitcherLine field order
+_PITCHING_STATS = (('strikeOuts', 0), ('hits', 0), ('runs', 0), ('earnedRuns', 0), ('baseOnBalls', 0),
+                   ('inningsPitched', '0.0'), ('numberOfPitches', 0))
+
+class PatchError(Exception):
+    """Raised when a JSON patch cannot be applied to the stored feed"""
+
+def _split_pointer(pointer: str) -> List[str]:
+    """Split a JSON pointer (RFC 6901) into unescaped tokens"""
+    if pointer == '':
+        return []
+    if not pointer.startswith('/'):
+        raise PatchError(f"Invalid JSON pointer: {pointer}")
+    return [token.replace('~1', '/').replace('~0', '~') for token in pointer[1:].split('/')]
+
+def _list_index(token: str, size: int) -> int:
+    """Get the array index a pointer token names, up to size (one past the end, for add)"""
+    if not token.isdigit() or int(token) > size:
+        raise PatchError(f"Array index {token} out of range")
+    return int(token)
+
+def _resolve(doc: Any, tokens: List[str]) -> Any:
+    """Walk a document following pointer tokens"""
+    for token in tokens:
+        if isinstance(doc, list):
+            doc = doc[_list_index(token, len(doc) - 1)]
+        elif isinstance(doc, dict):
+            doc = doc[token]
+        else:
+            raise PatchError(f"Cannot descend into {type(doc).__name__}")
+    return doc
+
+def _add(doc: Any, tokens: List[str], value: Any) -> Any:
+    """Apply an 'add' operation, returning the (possibly new) document root"""
+    if not tokens:
+        return value
+    parent = _resolve(doc, tokens[:-1])
+    key = tokens[-1]
+    if isinstance(parent, list):
+        if key == '-':
+            parent.append(value)
+        else:
+            parent.insert(_list_index(key, len(parent)), value)
+    else:
+        parent[key] = value
+    return doc
+
+def _remove(doc: Any, tokens: List[str]) -> Any:
+    """Apply a 'remove' operation and return the removed value"""
+    if not tokens:
+        raise PatchError("Cannot remove the document root")
+    parent = _resolve(doc, tokens[:-1])
+    key = tokens[-1]
+    if isinstance(parent, list):
+        return parent.pop(_list_index(key, len(parent) - 1))
+    return parent.pop(key)
+
+def apply_json_patch(doc: Any, operations: List[Dict]) -> Tuple[Any, List[List[str]]]:
+    """
+    Apply JSON patch (RFC 6902) operations to a document in place
+
+    Returns a (doc, touched) tuple, where touched holds the pointer tokens of
+    every location the patch modified. Raises PatchError if any operation
+    cannot be applied.
+    """
+    touched = []
+    try:
+        for op in operations:
+            name = op['op']
+            tokens = _split_pointer(op['path'])
+            if name == 'add':
+                doc = _add(doc, tokens, op['value'])
+            elif name == 'remove':
+                _remove(doc, tokens)
+            elif name == 'replace':
+                if not tokens:
+                    doc = op['value']
+                else:
+                    parent = _resolve(doc, tokens[:-1])
+                    key = _list_index(tokens[-1], len(parent) - 1) if isinstance(parent, list) else tokens[-1]
+                    if isinstance(parent, dict) and key not in parent:
+                        raise PatchError(f"Cannot replace missing path {op['path']}")
+                    parent[key] = op['value']
+            elif name == 'move':
+                from_tokens = _split_pointer(op['from'])
+                value = _remove(doc, from_tokens)
+                doc = _add(doc, tokens, value)
+                touched.append(from_tokens)
+            elif name == 'copy':
+                # A copy, so later operations on either location don't change the other
+                value = copy.deepcopy(_resolve(doc, _split_pointer(op['from'])))
+                doc = _add(doc, tokens, value)
+            elif name == 'test':
+                if _resolve(doc, tokens) != op['value']:
+                    raise PatchError(f"Test failed at {op['path']}")
+                continue
+            else:
+                raise PatchError(f"Unknown patch operation: {name}")
+            touched.append(tokens)
+    except (KeyError, IndexError, ValueError, TypeError) as e:
+        raise PatchError(f"Could not apply patch: {e}") from e
+    return doc, touched
+
+def extract_player_line(player: Dict) -> Optional[PlayerLine]:
+    """
+    Extract the batting and pitching lines for a single boxscore player
+
+    Returns None when the player neither batted nor pitched.
+    """
+    stats = player.get('stats') or {}
+    line = PlayerLine(player['person']['fullName'])
+
+    batting = stats.get('batting')
+    if batting:
+        values = [batting.get(stat, 0) for stat in _BATTING_STATS]
+        # Pinch runners have no plate appearance but still show in the box score
+        if batting.get('plateAppearances') or any(values):
+            line.batting = BattingLine(*values)
+
+    pitching = stats.get('pitching')
+    if pitching:
+        values = [pitching.get(stat, default) for stat, default in _PITCHING_STATS]
+        # A pitcher can face batters without getting anyone out
+        if pitching.get('battersFaced') or pitching.get('numberOfPitches') or values[5] != '0.0':
+            line.pitching = PitcherLine(*values)
+
+    if line.batting is not None or line.pitching is not None:
+        return line
+    return None
+
+def extract_boxscore_players(boxscore: Dict) -> Dict[str, Dict[str, PlayerLine]]:
+    """Extract stats lines for every player in a boxscore, keyed by side and player key"""
+    players = {}
+    teams = boxscore.get('teams', {})
+    for side in ('home', 'away'):
+        if side in teams:
+            players[side] = {}
+            for player_key, player in teams[side].get('players', {}).items():
+                line = extract_player_line(player)
+                if line:
+                    players[side][player_key] = line
+    return players
+
+def extract_players(live_feed_data: Dict) -> Dict[str, Dict[str, PlayerLine]]:
+    """Extract stats lines for every player in a live feed's boxscore"""
+    return extract_boxscore_players(live_feed_data.get('liveData', {}).get('boxscore', {}))
+
+def extract_highlights(live_feed_data: Dict) -> List[Dict]:
+    """Extract highlight headlines from a live feed"""
+    highlights = []
+    if 'highlights' in live_feed_data.get('liveData', {}):
+        for highlight in live_feed_data['liveData']['highlights'].get('highlights', []):
+            highlights.append({
+                'description': highlight.get('headline', ''),
+                'timestamp': highlight.get('timestamp', '')
+            })
+    return highlights
+
+def parse_boxscore(boxscore: Dict, home_team: str, away_team: str) -> Dict[str, List[PlayerLine]]:
+    """
+    Extract player statistics from a game's boxscore (/api/v1/game/{gamePk}/boxscore)
+
+    Returns a dict of team name to player stat lines.
+    """
+    players = extract_boxscore_players(boxscore)
+    player_stats = {}
+    if 'home' in players:
+        player_stats[home_team] = list(players['home'].values())
+    if 'away' in players:
+        player_stats[away_team] = list(players['away'].values())
+    return player_stats
+
+class LiveGameTracker:
+    """
+    Keep in-progress game feeds up to date with the feed/live/diffPatch endpoint
+
+    The first poll for a game downloads the full feed. Later polls only ask
+    for the JSON patches since the stored metaData.timeStamp and apply them
+    in memory. Only the boxscore players touched by a patch are re-extracted.
+    Any error while fetching or patching falls back to a full download.
+
+    Requests are awaited without holding any lock. A diff is only applied if
+    the feed is still at the timestamp it was requested from, so concurrent
+    updates (from any thread or event loop) never apply the same patches twice.
+    """
+
+    def __init__(self, client=async_mlb_client):
+        self.client = client
+        self._games = {}
+        self._lock = threading.Lock()
+        self._game_locks = {}
+
+    def _game_lock(self, game_pk: int) -> threading.Lock:
+        with self._lock:
+            if game_pk not in self._game_locks:
+                self._game_locks[game_pk] = threading.Lock()
+            return self._game_locks[game_pk]
+
+    async def _load_full(self, game_pk: int) -> Dict:
+        """Download the full feed and extract everything from it"""
+        feed = await self.client.get_json('feed', f'/api/v1.1/game/{game_pk}/feed/live')
+        state = {
+            'feed': feed,
+            'timestamp': feed.get('metaData', {}).get('timeStamp'),
+            'players': extract_players(feed),
+            'highlights': extract_highlights(feed),
+        }
+        with self._lock:
+            self._games[game_pk] = state
+        return state
+
+    def _apply_diff(self, state: Dict, diff: Any) -> bool:
+        """
+        Apply the patches fetched since the stored timestamp
+
+        Returns True if the feed changed.
+        """
+        # Upstream answers with a full feed when the diff would be too large
+        if isinstance(diff, dict):
+            feed = diff
+            state.update({
+                'feed': feed,
+                'timestamp': feed.get('metaData', {}).get('timeStamp'),
+                'players': extract_players(feed),
+                'highlights': extract_highlights(feed),
+            })
+            return True
+
+        if not diff:
+            return False
+
+        feed = state['feed']
+        changed_players = set()
+        rebuild_sides = set()
+        highlights_changed = False
+        for patch in diff:
+            feed, touched = apply_json_patch(feed, patch.get('diff', []))
+            for tokens in touched:
+                if tuple(tokens[:3]) == _PLAYERS_PATH and len(tokens) > 3:
+                    side = tokens[3]
+                    if len(tokens) > 5 and tokens[4] == 'players':
+                        changed_players.add((side, tokens[5]))
+                    else:
+                        rebuild_sides.add(side)
+                elif len(tokens) < 3 and tuple(tokens) == _PLAYERS_PATH[:len(tokens)]:
+                    # The whole boxscore (or more) was replaced
+                    rebuild_sides.update(('home', 'away'))
+                if tuple(tokens[:2]) == _HIGHLIGHTS_PATH or tuple(tokens) in ((), ('liveData',)):
+                    highlights_changed = True
+
+        state['feed'] = feed
+        state['timestamp'] = feed.get('metaData', {}).get('timeStamp', state['timestamp'])
+        self._update_players(state, changed_players, rebuild_sides)
+        if highlights_changed:
+            state['highlights'] = extract_highlights(feed)
+        return True
+
+    def _update_players(self, state: Dict, changed_players: Set[Tuple[str, str]], rebuild_sides: Set[str]):
+        """Re-extract only the players touched by a patch"""
+        teams = state['feed'].get('liveData', {}).get('boxscore', {}).get('teams', {})
+        if rebuild_sides:
+            rebuilt = extract_players(state['feed'])
+            for side in rebuild_sides:
+                state['players'][side] = rebuilt.get(side, {})
+        for side, player_key in changed_players:
+            if side in rebuild_sides:
+                continue
+            side_players = state['players'].setdefault(side, {})
+            player = teams.get(side, {}).get('players', {}).get(player_key)
+            line = extract_player_line(player) if player else None
+            if line:
+                side_players[player_key] = line
+            else:
+                side_players.pop(player_key, None)
+
+    async def update(self, game_pk: int) -> Tuple[Dict[str, List[PlayerLine]], List[Dict], bool, str]:
+        """
+        Bring a game's feed up to date
+
+        Returns a (players, highlights, changed, timestamp) tuple, where
+        players maps 'home'/'away' to the list of player stat lines and
+        timestamp is the feed's metaData.timeStamp they were extracted at.
+        """
+        with self._lock:
+            state = self._games.get(game_pk)
+
+        changed = True
+        if state is None or not state['timestamp']:
+            state = await self._load_full(game_pk)
+        else:
+            timestamp = state['timestamp']
+            try:
+                diff = await self.client.get_json(
+                    'feed',
+                    f'/api/v1.1/game/{game_pk}/feed/live/diffPatch',
+                    params={'startTimecode': timestamp}
+                )
+                with self._game_lock(game_pk):
+                    # Another update already moved the feed past this diff
+                    changed = state['timestamp'] == timestamp and self._apply_diff(state, diff)
+            except Exception as e:
+                logger.warning("Error applying diff for game %s, fetching full feed: %s", game_pk, e)
+                # Patches are applied in place, a failed diff may have left the feed half-patched.
+                # Forget it so a failed reload can't leave it stored under the old timestamp, and
+                # clear its timestamp so concurrent updates holding it don't patch it again.
+                with self._game_lock(game_pk):
+                    state['timestamp'] = None
+                self.discard(game_pk)
+                state = await self._load_full(game_pk)
+
+        with self._game_lock(game_pk):
+            players = {side: list(lines.values()) for side, lines in state['players'].items()}
+            return players, state['highlights'], changed, state['timestamp'] or ''
+
+    def discard(self, game_pk: int):
+        """Stop tracking a game, e.g. once it is final"""
+        with self._lock:
+            self._games.pop(game_pk, None)
+            self._game_locks.pop(game_pk, None)
+
+    def tracked(self) -> List[int]:
+        """Get the gamePks currently being tracked"""
+        with self._lock:
+            return list(self._games)
+
+# Shared tracker for in-progress games
+live_tracker = LiveGameTracker()
@@ -0,0 +1,92 @@
+import json
+import logging
+import os
+import random
+import sys
+from typing import Optional
+
+# Level for everything under the utils logger, e.g. DEBUG, INFO, WARNING
+LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO').upper()
+
+# 'text' for human readable lines, 'json' for one JSON object per line
+LOG_FORMAT = os.getenv('LOG_FORMAT', 'text').lower()
+
+# Fraction of sampled records (per-game debug lines) that are emitted
+LOG_SAMPLE_RATE = float(os.getenv('LOG_SAMPLE_RATE', '0.1'))
+
+ROOT_LOGGER = 'utils'
+
+# Attributes every LogRecord has, anything else was passed through extra=
+_RECORD_ATTRS = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+class JsonFormatter(logging.Formatter):
+    """Format records as one JSON object per line, including any extra= fields"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'time': self.formatTime(record, '%Y-%m-%dT%H:%M:%S'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS:
+                entry[key] = value
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+class SamplingFilter(logging.Filter):
+    """Let through a random fraction of records"""
+
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return self.rate >= 1 or random.random() < self.rate
+
+def configure_logging(level: str = LOG_LEVEL, fmt: str = LOG_FORMAT):
+    """
+    Set up the utils logger's level and handler
+
+    Runs on import with the LOG_LEVEL/LOG_FORMAT settings, call it again to
+    change them.
+    """
+    logger = logging.getLogger(ROOT_LOGGER)
+    logger.setLevel(level)
+    handler = logging.StreamHandler(sys.stderr)
+    if fmt == 'json':
+        handler.setFormatter(JsonFormatter())
+    else:
+        handler.setFormatter(logging.Formatter('%(asctime)s %(levelname)s %(name)s: %(message)s'))
+    for old in list(logger.handlers):
+        logger.removeHandler(old)
+    logger.addHandler(handler)
+    # Our handler is enough, don't duplicate lines through the host app's root logger
+    logger.propagate = False
+
+def get_logger(name: str) -> logging.Logger:
+    """Get a logger under the utils logger, e.g. get_logger(__name__)"""
+    if name != ROOT_LOGGER and not name.startswith(f"{ROOT_LOGGER}."):
+        # Modules run as scripts are named __main__
+        name = f"{ROOT_LOGGER}.{name}"
+    return logging.getLogger(name)
+
+def get_sampled_logger(name: str, rate: Optional[float] = None) -> logging.Logger:
+    """
+    Get a logger that only emits a fraction of its records
+
+    Meant for per-item debug lines on hot paths. Records below the configured
+    level are dropped before sampling, so disabled lines cost a level check.
+
+    Args:
+        name: Logger name, e.g. __name__
+        rate: Fraction of records to emit, defaults to LOG_SAMPLE_RATE
+    """
+    logger = get_logger(f"{name}.sampled")
+    if not any(isinstance(f, SamplingFilter) for f in logger.filters):
+        logger.addFilter(SamplingFilter(LOG_SAMPLE_RATE if rate is None else rate))
+    return logger
+
+configure_logging()
@@ -0,0 +1,237 @@
+import bisect
+import functools
+import inspect
+import os
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+from utils.log import get_logger
+
+logger = get_logger(__name__)
+
+# Serve /metrics on this port when set
+METRICS_PORT = os.getenv('METRICS_PORT')
+
+# Write the metrics to this file every METRICS_FILE_INTERVAL seconds when set,
+# e.g. for node_exporter's textfile collector
+METRICS_FILE = os.getenv('METRICS_FILE')
+METRICS_FILE_INTERVAL = float(os.getenv('METRICS_FILE_INTERVAL', '15'))
+
+# Latency buckets in seconds, from cache hits to slow upstream calls
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = '') -> str:
+    pairs = [f'{name}="{value}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+class _Metric:
+    type = 'untyped'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, '')) for name in self.labelnames)
+
+    def samples(self) -> List[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type}"]
+        lines.extend(self.samples())
+        return '\n'.join(lines)
+
+class Counter(_Metric):
+    """Monotonically increasing count, e.g. upstream requests"""
+    type = 'counter'
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def total(self) -> float:
+        """Get the sum over every label combination"""
+        with self._lock:
+            return sum(self._values.values())
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            values = dict(self._values)
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {value}" for key, value in values.items()]
+
+class Histogram(_Metric):
+    """Distribution of observed values, e.g. request latency in seconds"""
+    type = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                # Per-bucket counts (the last one is +Inf), sum, count
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """Observe the duration of a with block"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            values = {key: ([*state[0]], state[1], state[2]) for key, state in self._values.items()}
+        lines = []
+        for key, (counts, total, count) in values.items():
+            cumulative = 0
+            for bound, bucket_count in zip((*self.buckets, '+Inf'), counts):
+                cumulative += bucket_count
+                labels = _format_labels(self.labelnames, key, f'le="{bound}"')
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {total}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {count}")
+        return lines
+
+class CallbackMetric(_Metric):
+    """Metric whose values are read from a function at scrape time"""
+
+    def __init__(self, name: str, documentation: str, fn: Callable[[], float], metric_type: str = 'gauge'):
+        super().__init__(name, documentation)
+        self.fn = fn
+        self.type = metric_type
+
+    def samples(self) -> List[str]:
+        try:
+            return [f"{self.name} {self.fn()}"]
+        except Exception as e:
+            logger.warning("Error reading metric %s: %s", self.name, e)
+            return []
+
+class Registry:
+    """Collection of metrics rendered together in the Prometheus text format"""
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: _Metric) -> _Metric:
+        """Add a metric, returning the one already registered under its name if any"""
+        with self._lock:
+            return self._metrics.setdefault(metric.name, metric)
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return '\n'.join(metric.render() for metric in metrics) + '\n'
+
+# Shared registry every module registers its metrics in
+REGISTRY = Registry()
+
+def counter(name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+    return REGISTRY.register(Counter(name, documentation, labelnames))
+
+def histogram(name: str, documentation: str, labelnames: Sequence[str] = (),
+              buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+    return REGISTRY.register(Histogram(name, documentation, labelnames, buckets))
+
+def callback(name: str, documentation: str, fn: Callable[[], float], metric_type: str = 'gauge') -> CallbackMetric:
+    return REGISTRY.register(CallbackMetric(name, documentation, fn, metric_type))
+
+def timed(metric: Histogram, **labels) -> Callable:
+    """Decorator observing a function's duration, works on coroutine functions too"""
+    def decorator(fn: Callable) -> Callable:
+        # Time inline rather than through metric.time(), this runs on hot paths
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return await fn(*args, **kwargs)
+                finally:
+                    metric.observe(time.perf_counter() - start, **labels)
+        else:
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return fn(*args, **kwargs)
+                finally:
+                    metric.observe(time.perf_counter() - start, **labels)
+        return wrapper
+    return decorator
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split('?', 1)[0] != '/metrics':
+            self.send_error(404)
+            return
+        body = REGISTRY.render().encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logger.debug(format, *args)
+
+def write_metrics_file(path: str):
+    """Write the current metrics to path atomically"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        f.write(REGISTRY.render())
+    os.replace(tmp_path, path)
+
+_exporting = False
+_export_lock = threading.Lock()
+
+def start_metrics_export(port: Optional[str] = METRICS_PORT, path: Optional[str] = METRICS_FILE):
+    """
+    Serve /metrics on port and/or write them to path periodically, once per process
+
+    Does nothing when neither is configured. Safe to call on every Streamlit rerun.
+    """
+    global _exporting
+    with _export_lock:
+        if _exporting:
+            return
+        _exporting = True
+
+    if port:
+        try:
+            server = ThreadingHTTPServer(('0.0.0.0', int(port)), _MetricsHandler)
+            threading.Thread(target=server.serve_forever, name='mlb-metrics-server', daemon=True).start()
+            logger.info("Serving metrics on port %s", port)
+        except OSError as e:
+            logger.warning("Could not serve metrics on port %s: %s", port, e)
+
+    if path:
+        def write_forever():
+            while True:
+                try:
+                    write_metrics_file(path)
+                except OSError as e:
+                    logger.warning("Error writing metrics to %s: %s", path, e)
+                time.sleep(METRICS_FILE_INTERVAL)
+
+        threading.Thread(target=write_forever, name='mlb-metrics-file', daemon=True).start()
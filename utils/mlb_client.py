@@ -0,0 +1,377 @@
+import asyncio
+import json
+import os
+import random
+import threading
+import time
+import weakref
+from typing import Any, Dict, Optional, Tuple
+import requests
+from requests.adapters import HTTPAdapter
+from utils.log import get_logger
+from utils.metrics import counter, histogram
+from utils.replay import MLB_RECORD_DIR, MLB_REPLAY_DIR, ReplayAdapter, record_response
+from utils.singleflight import AsyncSingleFlight, SingleFlight
+
+try:
+    import httpx
+    from utils.replay import ReplayTransport
+except ImportError:  # the async client then runs the sync one in worker threads
+    httpx = None
+
+try:
+    import orjson
+    json_loads = orjson.loads
+except ImportError:  # fall back to the standard library decoder
+    json_loads = json.loads
+
+logger = get_logger(__name__)
+
+UPSTREAM_REQUESTS = counter(
+    'mlb_upstream_requests_total', 'Requests made to the MLB Stats API, by status code', ('endpoint', 'status')
+)
+UPSTREAM_SECONDS = histogram('mlb_upstream_request_seconds', 'MLB Stats API request latency', ('endpoint',))
+RATE_LIMIT_WAIT = histogram(
+    'mlb_rate_limit_wait_seconds', 'Time requests spent waiting for the rate limiter', ('endpoint',)
+)
+
+# Base URL for the MLB Stats API
+MLB_API_BASE = os.getenv('MLB_API_BASE', 'https://statsapi.mlb.com')
+
+# (connect, read) timeouts in seconds per endpoint
+TIMEOUTS = {
+    'teams': (3.05, 10),
+    'team_stats': (3.05, 10),
+    'schedule': (3.05, 10),
+    'feed': (3.05, 20),  # live feeds are large, give them longer to stream
+    'default': (3.05, 10),
+}
+
+# Retry configuration for transient upstream failures
+RETRY = {
+    'total': 3,  # retries after the first attempt
+    'backoff_factor': 0.5,  # base delay in seconds, doubled on every attempt
+    'max_backoff': 8,  # cap on a single backoff delay
+    'status_forcelist': (429, 500, 502, 503, 504),
+}
+
+# Connection pool configuration
+POOL = {
+    'connections': 4,  # number of host pools to keep
+    'maxsize': 32,  # keep-alive connections per host, should cover CONCURRENCY['max_workers']
+}
+
+class MLBStatsClient:
+    """
+    Pooled HTTP client for the MLB Stats API
+
+    All requests share one keep-alive session, so repeated calls reuse the
+    TCP+TLS connection. Every endpoint has its own timeout, and 429/5xx
+    responses and connection errors are retried with jittered exponential
+    backoff (honoring Retry-After when upstream sends it). Read timeouts are
+    not retried, so a hung upstream costs a caller one read timeout rather
+    than one per attempt.
+
+    If a rate limiter is set, every attempt (including retries) waits for a
+    slot from it first.
+
+    get_json_conditional() additionally keeps the ETag/Last-Modified
+    validators and decoded body per URL, so unchanged resources come back
+    as a cheap 304 instead of a full download.
+
+    Concurrent get_json/get_json_conditional calls for the same endpoint and
+    URL are coalesced by the single_flight layer into one upstream request.
+
+    Bodies are decoded with orjson when it is installed, which is several
+    times faster than the standard library on large payloads like live feeds.
+
+    With record_dir set, every 200 response is also saved as a fixture
+    (see utils/replay.py). With replay_dir set, requests are answered from
+    those fixtures and never reach the network.
+    """
+
+    def __init__(self, base_url: str = MLB_API_BASE, rate_limiter=None, single_flight=None,
+                 record_dir: Optional[str] = MLB_RECORD_DIR, replay_dir: Optional[str] = MLB_REPLAY_DIR):
+        self.base_url = base_url.rstrip('/')
+        self.rate_limiter = rate_limiter
+        self.single_flight = single_flight or SingleFlight()
+        self.record_dir = record_dir
+        self.replay_dir = replay_dir
+        self.session = requests.Session()
+        if replay_dir:
+            adapter = ReplayAdapter(replay_dir)
+        else:
+            adapter = HTTPAdapter(
+                pool_connections=POOL['connections'],
+                pool_maxsize=POOL['maxsize'],
+                max_retries=0  # retries are handled in get() so we can add jitter
+            )
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.session.headers.update({
+            'Accept': 'application/json',
+            'Accept-Encoding': 'gzip, deflate',
+        })
+        # Validators and decoded bodies for conditional requests, keyed by URL
+        self._validators = {}
+        self._validators_lock = threading.Lock()
+
+    def _url(self, path: str, params: Optional[Dict] = None) -> str:
+        """Build the full request URL, used as the key for validators and coalescing"""
+        return requests.Request('GET', f"{self.base_url}{path}", params=params).prepare().url
+
+    def _backoff(self, attempt: int, response: Optional[requests.Response] = None) -> float:
+        """Get the delay before the next retry attempt"""
+        if response is not None and response.headers.get('Retry-After'):
+            try:
+                return min(float(response.headers['Retry-After']), RETRY['max_backoff'])
+            except ValueError:
+                pass
+        # Full jitter: a random delay up to the exponential ceiling
+        ceiling = min(RETRY['max_backoff'], RETRY['backoff_factor'] * (2 ** attempt))
+        return random.uniform(0, ceiling)
+
+    def get(self, endpoint: str, path: str, params: Optional[Dict] = None,
+            headers: Optional[Dict] = None) -> requests.Response:
+        """
+        Make a GET request with the endpoint's timeout and retry policy
+
+        Args:
+            endpoint: Endpoint name used to pick the timeout (see TIMEOUTS)
+            path: Path relative to the API base URL, e.g. '/api/v1/teams'
+            params: Optional query parameters
+            headers: Optional extra request headers
+        """
+        url = f"{self.base_url}{path}"
+        timeout = TIMEOUTS.get(endpoint, TIMEOUTS['default'])
+
+        for attempt in range(RETRY['total'] + 1):
+            if self.rate_limiter is not None:
+                RATE_LIMIT_WAIT.observe(self.rate_limiter.acquire(), endpoint=endpoint)
+            try:
+                with UPSTREAM_SECONDS.time(endpoint=endpoint):
+                    response = self.session.get(url, params=params, headers=headers, timeout=timeout)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                UPSTREAM_REQUESTS.inc(endpoint=endpoint, status='error')
+                if attempt == RETRY['total'] or isinstance(e, requests.ReadTimeout):
+                    raise
+                delay = self._backoff(attempt)
+                logger.warning("Request to %s failed (%s), retrying in %.2fs", path, e, delay)
+                time.sleep(delay)
+                continue
+
+            UPSTREAM_REQUESTS.inc(endpoint=endpoint, status=response.status_code)
+            if response.status_code in RETRY['status_forcelist'] and attempt < RETRY['total']:
+                delay = self._backoff(attempt, response)
+                logger.warning("Request to %s returned %s, retrying in %.2fs", path, response.status_code, delay)
+                time.sleep(delay)
+                continue
+
+            response.raise_for_status()
+            if self.record_dir and response.status_code == 200:
+                record_response(self.record_dir, response.url, response.content)
+            return response
+
+    def get_json(self, endpoint: str, path: str, params: Optional[Dict] = None) -> Any:
+        """Make a GET request and decode the JSON body"""
+        return self.single_flight.do(
+            f"{endpoint}:{self._url(path, params)}",
+            lambda: json_loads(self.get(endpoint, path, params).content)
+        )
+
+    def get_json_conditional(self, endpoint: str, path: str, params: Optional[Dict] = None) -> Tuple[Any, bool]:
+        """
+        Make a conditional GET request using the validators from the last response
+
+        Returns a (data, changed) tuple. On a 304 the previously decoded body is
+        returned with changed=False, so callers can skip re-processing it.
+        """
+        key = self._url(path, params)
+        data, changed = self.single_flight.do(
+            f"{endpoint}:conditional:{key}",
+            lambda: self._get_json_conditional(endpoint, path, params, key)
+        )
+        return data, changed
+
+    def _get_json_conditional(self, endpoint: str, path: str, params: Optional[Dict], key: str):
+        """Make the conditional request for get_json_conditional"""
+        with self._validators_lock:
+            cached = self._validators.get(key)
+
+        headers = {}
+        if cached:
+            if cached['etag']:
+                headers['If-None-Match'] = cached['etag']
+            if cached['last_modified']:
+                headers['If-Modified-Since'] = cached['last_modified']
+
+        response = self.get(endpoint, path, params, headers=headers)
+        if response.status_code == 304 and cached:
+            return cached['data'], False
+
+        data = json_loads(response.content)
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        with self._validators_lock:
+            if etag or last_modified:
+                self._validators[key] = {'etag': etag, 'last_modified': last_modified, 'data': data}
+            else:
+                self._validators.pop(key, None)
+        return data, True
+
+    def forget(self, path: str, params: Optional[Dict] = None):
+        """Drop the stored validators and body for a URL"""
+        key = self._url(path, params)
+        with self._validators_lock:
+            self._validators.pop(key, None)
+
+    def forget_all(self):
+        """Drop the stored validators and bodies for every URL"""
+        with self._validators_lock:
+            self._validators.clear()
+
+# Shared client instance used by every fetcher
+mlb_client = MLBStatsClient()
+
+class AsyncMLBStatsClient:
+    """
+    asyncio client for the MLB Stats API, built on httpx
+
+    Mirrors MLBStatsClient: same timeouts, retry policy and rate limiter,
+    conditional requests and coalescing of identical concurrent requests.
+    Validators and the record/replay directories are shared with the sync
+    client, so forget() on either one drops them for both. Each event loop
+    gets its own pooled httpx client.
+
+    Without httpx installed, every call runs the sync client in a worker
+    thread instead.
+    """
+
+    def __init__(self, sync_client: MLBStatsClient = mlb_client, rate_limiter=None, single_flight=None):
+        self.sync_client = sync_client
+        self.rate_limiter = rate_limiter
+        self.single_flight = single_flight or AsyncSingleFlight()
+        self._clients = weakref.WeakKeyDictionary()  # event loop -> httpx.AsyncClient
+
+    def _client(self):
+        """Get the pooled httpx client for the running event loop"""
+        loop = asyncio.get_running_loop()
+        client = self._clients.get(loop)
+        if client is None:
+            client = httpx.AsyncClient(
+                limits=httpx.Limits(max_connections=POOL['maxsize'], max_keepalive_connections=POOL['maxsize']),
+                headers={'Accept': 'application/json', 'Accept-Encoding': 'gzip, deflate'},
+                transport=ReplayTransport(self.sync_client.replay_dir) if self.sync_client.replay_dir else None,
+            )
+            self._clients[loop] = client
+        return client
+
+    async def get(self, endpoint: str, path: str, params: Optional[Dict] = None,
+                  headers: Optional[Dict] = None):
+        """
+        Make a GET request with the endpoint's timeout and retry policy
+
+        Takes the same arguments as MLBStatsClient.get() and returns an
+        httpx.Response. Requires httpx.
+        """
+        if httpx is None:
+            raise RuntimeError("httpx is required for raw async requests")
+        url = f"{self.sync_client.base_url}{path}"
+        connect_timeout, read_timeout = TIMEOUTS.get(endpoint, TIMEOUTS['default'])
+        timeout = httpx.Timeout(read_timeout, connect=connect_timeout)
+        client = self._client()
+
+        for attempt in range(RETRY['total'] + 1):
+            if self.rate_limiter is not None:
+                RATE_LIMIT_WAIT.observe(await self.rate_limiter.acquire_async(), endpoint=endpoint)
+            try:
+                with UPSTREAM_SECONDS.time(endpoint=endpoint):
+                    response = await client.get(url, params=params, headers=headers, timeout=timeout)
+            except httpx.TransportError as e:
+                UPSTREAM_REQUESTS.inc(endpoint=endpoint, status='error')
+                # Read timeouts aren't retried, see MLBStatsClient
+                if attempt == RETRY['total'] or isinstance(e, httpx.ReadTimeout):
+                    raise
+                delay = self.sync_client._backoff(attempt)
+                logger.warning("Request to %s failed (%s), retrying in %.2fs", path, e, delay)
+                await asyncio.sleep(delay)
+                continue
+
+            UPSTREAM_REQUESTS.inc(endpoint=endpoint, status=response.status_code)
+            if response.status_code in RETRY['status_forcelist'] and attempt < RETRY['total']:
+                delay = self.sync_client._backoff(attempt, response)
+                logger.warning("Request to %s returned %s, retrying in %.2fs", path, response.status_code, delay)
+                await asyncio.sleep(delay)
+                continue
+
+            # httpx also raises for 3xx, but a 304 is an answer for conditional requests
+            if response.status_code >= 400:
+                response.raise_for_status()
+            if self.sync_client.record_dir and response.status_code == 200:
+                record_response(self.sync_client.record_dir, str(response.url), response.content)
+            return response
+
+    async def get_json(self, endpoint: str, path: str, params: Optional[Dict] = None) -> Any:
+        """Make a GET request and decode the JSON body"""
+        if httpx is None:
+            return await asyncio.to_thread(self.sync_client.get_json, endpoint, path, params)
+
+        async def fetch():
+            response = await self.get(endpoint, path, params)
+            return json_loads(response.content)
+
+        return await self.single_flight.do(f"{endpoint}:{self.sync_client._url(path, params)}", fetch)
+
+    async def get_json_conditional(self, endpoint: str, path: str,
+                                   params: Optional[Dict] = None) -> Tuple[Any, bool]:
+        """Make a conditional GET request, see MLBStatsClient.get_json_conditional()"""
+        if httpx is None:
+            return await asyncio.to_thread(self.sync_client.get_json_conditional, endpoint, path, params)
+
+        key = self.sync_client._url(path, params)
+        data, changed = await self.single_flight.do(
+            f"{endpoint}:conditional:{key}",
+            lambda: self._get_json_conditional(endpoint, path, params, key)
+        )
+        return data, changed
+
+    async def _get_json_conditional(self, endpoint: str, path: str, params: Optional[Dict], key: str):
+        """Make the conditional request for get_json_conditional"""
+        validators = self.sync_client._validators
+        lock = self.sync_client._validators_lock
+        with lock:
+            cached = validators.get(key)
+
+        headers = {}
+        if cached:
+            if cached['etag']:
+                headers['If-None-Match'] = cached['etag']
+            if cached['last_modified']:
+                headers['If-Modified-Since'] = cached['last_modified']
+
+        response = await self.get(endpoint, path, params, headers=headers)
+        if response.status_code == 304 and cached:
+            return cached['data'], False
+
+        data = json_loads(response.content)
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        with lock:
+            if etag or last_modified:
+                validators[key] = {'etag': etag, 'last_modified': last_modified, 'data': data}
+            else:
+                validators.pop(key, None)
+        return data, True
+
+    def forget(self, path: str, params: Optional[Dict] = None):
+        """Drop the stored validators and body for a URL"""
+        self.sync_client.forget(path, params)
+
+    async def aclose(self):
+        """Close the httpx client of the running event loop"""
+        client = self._clients.pop(asyncio.get_running_loop(), None)
+        if client is not None:
+            await client.aclose()
+
+# Shared async client instance used by the async fetchers
+async_mlb_client = AsyncMLBStatsClient()
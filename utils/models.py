@@ -0,0 +1,296 @@
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+@dataclass(slots=True)
+class BattingLine:
+    """A batter's line in one game"""
+    at_bats: int = 0
+    hits: int = 0
+    runs: int = 0
+    rbi: int = 0
+    home_runs: int = 0
+    walks: int = 0
+    strikeouts: int = 0
+
+@dataclass(slots=True)
+class PitcherLine:
+    """A pitcher's line in one game"""
+    strikeouts: int = 0
+    hits_allowed: int = 0
+    runs_allowed: int = 0
+    earned_runs: int = 0
+    walks: int = 0
+    innings_pitched: str = '0.0'
+    pitches: int = 0
+
+    def to_row(self) -> list:
+        return [self.strikeouts, self.hits_allowed, self.runs_allowed, self.earned_runs, self.walks,
+                self.innings_pitched, self.pitches]
+
+@dataclass(slots=True)
+class PlayerLine:
+    """
+    A player's line in one game
+
+    batting is None when the player didn't bat, pitching when they didn't pitch.
+    """
+    name: str
+    batting: Optional[BattingLine] = None
+    pitching: Optional[PitcherLine] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Get the line in the player_stats dict shape main.py and utils/stats.py read
+
+        Batting keys are named after upstream's batting stats (hits,
+        homeRuns, baseOnBalls, strikeOuts...), pitching keys are snake_case
+        (hits_allowed, pitching_walks, pitching_strikeouts...), so no key of
+        one differs from the other's only by case.
+        """
+        player = {'name': self.name}
+        batting = self.batting
+        if batting is not None:
+            player['atBats'] = batting.at_bats
+            player['hits'] = batting.hits
+            player['runs'] = batting.runs
+            player['rbi'] = batting.rbi
+            player['homeRuns'] = batting.home_runs
+            player['baseOnBalls'] = batting.walks
+            player['strikeOuts'] = batting.strikeouts
+        pitching = self.pitching
+        if pitching is not None:
+            player['pitching_strikeouts'] = pitching.strikeouts
+            player['hits_allowed'] = pitching.hits_allowed
+            player['runs_allowed'] = pitching.runs_allowed
+            player['earned_runs'] = pitching.earned_runs
+            player['pitching_walks'] = pitching.walks
+            player['innings_pitched'] = pitching.innings_pitched
+            player['pitches'] = pitching.pitches
+        return player
+
+    @classmethod
+    def from_dict(cls, player: Dict[str, Any]) -> 'PlayerLine':
+        line = cls(player['name'])
+        if 'hits' in player:
+            line.batting = BattingLine(
+                player.get('atBats', 0), player['hits'], player.get('runs', 0), player.get('rbi', 0),
+                player.get('homeRuns', 0), player.get('baseOnBalls', 0), player.get('strikeOuts', 0)
+            )
+        if 'innings_pitched' in player:
+            line.pitching = PitcherLine(
+                player.get('pitching_strikeouts', 0), player.get('hits_allowed', 0), player.get('runs_allowed', 0),
+                player.get('earned_runs', 0), player.get('pitching_walks', 0), player['innings_pitched'],
+                player.get('pitches', 0)
+            )
+        return line
+
+    def to_row(self) -> list:
+        """Get a compact JSON encoding, see from_row"""
+        batting = self.batting
+        return [
+            self.name,
+            [batting.at_bats, batting.hits, batting.runs, batting.rbi, batting.home_runs, batting.walks,
+             batting.strikeouts] if batting is not None else None,
+            self.pitching.to_row() if self.pitching is not None else None,
+        ]
+
+    @classmethod
+    def from_row(cls, row: list) -> 'PlayerLine':
+        name, batting, pitching = row
+        return cls(name, BattingLine(*batting) if batting is not None else None,
+                   PitcherLine(*pitching) if pitching is not None else None)
+
+# (group, stat, label) rows of a team's season summary, in display order
+SEASON_SUMMARY = (
+    ('hitting', 'avg', 'Batting Average'),
+    ('hitting', 'ops', 'OPS'),
+    ('hitting', 'runs', 'Runs'),
+    ('hitting', 'homeRuns', 'Home Runs'),
+    ('hitting', 'rbi', 'RBI'),
+    ('pitching', 'era', 'ERA'),
+    ('pitching', 'whip', 'WHIP'),
+    ('pitching', 'strikeOuts', 'Strikeouts'),
+    ('pitching', 'saves', 'Saves'),
+)
+
+def summarize_season_stats(raw: Dict[str, Any]) -> Tuple[Tuple[str, str], ...]:
+    """
+    Get the (label, value) rows of SEASON_SUMMARY from a team's season stats
+
+    Groups upstream didn't return are left out, stats missing from a group read '0'.
+    """
+    groups = {}
+    for group in raw.get('stats', []):
+        splits = group.get('splits')
+        if splits:
+            groups[group.get('group', {}).get('displayName')] = splits[0].get('stat', {})
+    return tuple((label, str(groups[group].get(stat, '0'))) for group, stat, label in SEASON_SUMMARY
+                 if group in groups)
+
+@dataclass(slots=True)
+class TeamSeasonStats:
+    """
+    A team's season stats as upstream serves them
+
+    One instance is shared by every game the team plays while the stats are
+    current, games hold a reference rather than a copy. summary is computed
+    once per instance, see summarize_season_stats.
+    """
+    team_id: str
+    raw: Dict[str, Any]
+    summary: Tuple[Tuple[str, str], ...] = field(init=False)
+
+    def __post_init__(self):
+        self.summary = summarize_season_stats(self.raw)
+
+def encode_player_stats(player_stats: Dict[str, List[PlayerLine]]) -> Dict[str, list]:
+    """Encode a team name to player lines dict as JSON rows"""
+    return {team: [line.to_row() for line in lines] for team, lines in player_stats.items()}
+
+def decode_player_stats(rows: Dict[str, list]) -> Dict[str, List[PlayerLine]]:
+    return {team: [PlayerLine.from_row(row) for row in lines] for team, lines in rows.items()}
+
+@dataclass(slots=True)
+class Game:
+    """
+    One game as the data layer caches it
+
+    Convert with to_dict() for main.py, which reads the same dict shape
+    get_mlb_games has always returned. to_record()/from_record() are the
+    compact JSON encoding the cache stores: player lines as rows and season
+    stats as a reference to the team.
+
+    feed_version changes whenever the player lines are re-extracted (the
+    live feed's timestamp, or when the boxscore was read), so anything built
+    from them can be cached by (id, feed_version).
+    """
+    id: int
+    home_team: str
+    away_team: str
+    home_team_id: Optional[str]
+    away_team_id: Optional[str]
+    home_score: int
+    away_score: int
+    time: str
+    date: str
+    status: str
+    period: Optional[int] = None
+    game_clock: str = ''
+    highlights: List[Dict[str, str]] = field(default_factory=list)
+    player_stats: Dict[str, List[PlayerLine]] = field(default_factory=dict)
+    winning_pitcher: str = ''
+    losing_pitcher: str = ''
+    save_pitcher: str = ''
+    home_season_stats: Optional[TeamSeasonStats] = None
+    away_season_stats: Optional[TeamSeasonStats] = None
+    linescore: Dict[str, Any] = field(default_factory=dict)
+    league: str = 'MLB'
+    feed_version: str = ''
+
+    def team_stats(self) -> Dict[str, Any]:
+        """Get both teams' season stats keyed by '<team name>_<key>'"""
+        team_stats = {}
+        for team, season_stats in ((self.home_team, self.home_season_stats), (self.away_team, self.away_season_stats)):
+            if season_stats is not None:
+                for key, value in season_stats.raw.items():
+                    team_stats[f"{team}_{key}"] = value
+        return team_stats
+
+    def team_summaries(self) -> Dict[str, Tuple[Tuple[str, str], ...]]:
+        """Get both teams' precomputed season summaries keyed by team ID"""
+        return {season_stats.team_id: season_stats.summary
+                for season_stats in (self.home_season_stats, self.away_season_stats)
+                if season_stats is not None and season_stats.team_id is not None}
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Get the game in the dict shape get_mlb_games returns"""
+        return {
+            "id": self.id,
+            "league": self.league,
+            "home_team": self.home_team,
+            "away_team": self.away_team,
+            "home_team_id": self.home_team_id,
+            "away_team_id": self.away_team_id,
+            "home_score": self.home_score,
+            "away_score": self.away_score,
+            "time": self.time,
+            "date": self.date,
+            "status": self.status,
+            "period": self.period,
+            "game_clock": self.game_clock,
+            "highlights": self.highlights,
+            "player_stats": {team: [line.to_dict() for line in lines] for team, lines in self.player_stats.items()},
+            "winning_pitcher": self.winning_pitcher,
+            "losing_pitcher": self.losing_pitcher,
+            "save_pitcher": self.save_pitcher,
+            "team_stats": self.team_stats(),
+            "team_summaries": self.team_summaries(),
+            "linescore": self.linescore,
+            "feed_version": self.feed_version
+        }
+
+    @classmethod
+    def from_dict(cls, game: Dict[str, Any]) -> 'Game':
+        """Build a game from the dict shape, e.g. an archived one"""
+        season_stats = []
+        for team, team_id in ((game['home_team'], game.get('home_team_id')),
+                              (game['away_team'], game.get('away_team_id'))):
+            prefix = f"{team}_"
+            raw = {key[len(prefix):]: value for key, value in game.get('team_stats', {}).items()
+                   if key.startswith(prefix)}
+            season_stats.append(TeamSeasonStats(team_id, raw) if raw else None)
+        return cls(
+            id=game['id'],
+            home_team=game['home_team'],
+            away_team=game['away_team'],
+            home_team_id=game.get('home_team_id'),
+            away_team_id=game.get('away_team_id'),
+            home_score=game['home_score'],
+            away_score=game['away_score'],
+            time=game['time'],
+            date=game['date'],
+            status=game['status'],
+            period=game.get('period'),
+            game_clock=game.get('game_clock', ''),
+            highlights=game.get('highlights', []),
+            player_stats={team: [PlayerLine.from_dict(player) for player in players]
+                          for team, players in game.get('player_stats', {}).items()},
+            winning_pitcher=game.get('winning_pitcher', ''),
+            losing_pitcher=game.get('losing_pitcher', ''),
+            save_pitcher=game.get('save_pitcher', ''),
+            home_season_stats=season_stats[0],
+            away_season_stats=season_stats[1],
+            linescore=game.get('linescore', {}),
+            league=game.get('league', 'MLB'),
+            feed_version=game.get('feed_version', ''),
+        )
+
+    def to_record(self) -> list:
+        """Get the compact JSON encoding, see from_record"""
+        return [
+            self.id, self.home_team, self.away_team, self.home_team_id, self.away_team_id,
+            self.home_score, self.away_score, self.time, self.date, self.status, self.period, self.game_clock,
+            self.highlights, encode_player_stats(self.player_stats),
+            self.winning_pitcher, self.losing_pitcher, self.save_pitcher,
+            self.home_season_stats is not None, self.away_season_stats is not None,
+            self.linescore, self.league, self.feed_version,
+        ]
+
+    @classmethod
+    def from_record(cls, record, season_stats: Callable[[str], Optional[TeamSeasonStats]]) -> 'Game':
+        """
+        Decode to_record() output
+
+        season_stats looks up the shared stats for a team ID.
+        """
+        (game_pk, home_team, away_team, home_team_id, away_team_id, home_score, away_score, time, date, status,
+         period, game_clock, highlights, player_stats, winning_pitcher, losing_pitcher, save_pitcher,
+         has_home_stats, has_away_stats, linescore, league, feed_version) = record
+        return cls(
+            game_pk, home_team, away_team, home_team_id, away_team_id, home_score, away_score, time, date, status,
+            period, game_clock, highlights, decode_player_stats(player_stats),
+            winning_pitcher, losing_pitcher, save_pitcher,
+            season_stats(home_team_id) if has_home_stats and home_team_id else None,
+            season_stats(away_team_id) if has_away_stats and away_team_id else None,
+            linescore, league, feed_version,
+        )
@@ -1,5 +1,8 @@
 import os
 from datetime import datetime
+from utils.log import get_logger
+
+logger = get_logger(__name__)
 
 # Twilio configuration (These lines remain, but are unused in the modified code)
 TWILIO_ACCOUNT_SID = os.environ.get("TWILIO_ACCOUNT_SID")
@@ -19,9 +22,9 @@ def subscribe_to_updates(phone_number, game_id, frequency):
             'subscribed_at': datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         }
 
-        print(f"New subscription: {subscription_info}")
+        logger.info("New subscription: %s", subscription_info)
         return True
 
     except Exception as e:
-        print(f"Error in subscription: {str(e)}")
+        logger.error("Error in subscription: %s", e)
         return False
\ No newline at end of file
@@ -0,0 +1,122 @@
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+from utils.log import get_logger
+from utils.metrics import start_metrics_export
+from utils.sports_data import get_mlb_games, enable_background_refresh, prefetch_team_stats
+
+logger = get_logger(__name__)
+
+# Seconds between refreshes of a date, driven by its most urgent game status.
+# None means the date is fetched once and then left alone.
+POLL_INTERVALS = {
+    'Live': 15,
+    'Delayed': 60,
+    'Upcoming': 300,
+    'Postponed': None,
+    'Cancelled': None,
+    'Finished': None,
+}
+
+# How long to sleep when nothing is due, so the yesterday/today/tomorrow
+# window still rolls over at midnight
+IDLE_INTERVAL = 60
+
+# Retry delay after a failed refresh
+ERROR_INTERVAL = 30
+
+def _next_interval(games: List[Dict[str, Any]]) -> Optional[float]:
+    """Get the refresh interval for a date from its games' statuses"""
+    if not games:
+        # Schedule not published yet (or empty), check back like an upcoming slate
+        return POLL_INTERVALS['Upcoming']
+    intervals = [POLL_INTERVALS.get(g['status'], POLL_INTERVALS['Upcoming']) for g in games]
+    intervals = [interval for interval in intervals if interval]
+    return min(intervals) if intervals else None
+
+class GamePoller:
+    """
+    Keep yesterday's, today's and tomorrow's games warm in the shared cache
+
+    Each date is refreshed on its own schedule: dates with live games every
+    few seconds, upcoming slates every few minutes and fully finished dates
+    only once. The UI then only reads from the cache.
+    """
+
+    def __init__(self):
+        self._next_refresh = {}
+        self._stop = threading.Event()
+
+    def _window(self) -> List:
+        today = datetime.now().date()
+        return [today - timedelta(days=1), today, today + timedelta(days=1)]
+
+    def poll_once(self) -> float:
+        """
+        Refresh every date that is due
+
+        Returns the number of seconds until the next date is due.
+        """
+        dates = self._window()
+        for date in list(self._next_refresh):
+            if date not in dates:
+                del self._next_refresh[date]
+
+        for date in dates:
+            due = self._next_refresh.get(date, 0)
+            if due is None or due > time.monotonic():
+                continue
+            try:
+                games = get_mlb_games(date, force_refresh=True)
+                interval = _next_interval(games)
+            except Exception as e:
+                logger.error("Error polling games for %s: %s", date, e)
+                interval = ERROR_INTERVAL
+            self._next_refresh[date] = None if interval is None else time.monotonic() + interval
+
+        pending = [due for due in self._next_refresh.values() if due is not None]
+        if not pending:
+            return IDLE_INTERVAL
+        return min(IDLE_INTERVAL, max(1.0, min(pending) - time.monotonic()))
+
+    def run(self):
+        """Poll until stop() is called"""
+        enable_background_refresh()
+        try:
+            # Warm every team's season stats up front so slates don't wait on them
+            prefetch_team_stats()
+        except Exception as e:
+            logger.error("Error prefetching team stats: %s", e)
+        while not self._stop.is_set():
+            try:
+                wait = self.poll_once()
+            except Exception as e:
+                logger.error("Error in game poller: %s", e)
+                wait = ERROR_INTERVAL
+            self._stop.wait(wait)
+
+    def stop(self):
+        self._stop.set()
+
+_poller = None
+_poller_lock = threading.Lock()
+
+def start_background_poller() -> GamePoller:
+    """
+    Start the poller in a daemon thread, once per process
+
+    Safe to call on every Streamlit rerun.
+    """
+    global _poller
+    with _poller_lock:
+        if _poller is None:
+            _poller = GamePoller()
+            threading.Thread(target=_poller.run, name='mlb-game-poller', daemon=True).start()
+        return _poller
+
+if __name__ == "__main__":
+    # Standalone mode: run as a separate process that publishes to the Redis cache,
+    # e.g. `python -m utils.poller` with REDIS_URL set
+    start_metrics_export()
+    GamePoller().run()
@@ -0,0 +1,113 @@
+import asyncio
+import threading
+import time
+from typing import Dict, Optional
+from utils.log import get_logger
+
+logger = get_logger(__name__)
+
+# Atomic token-bucket reservation, run inside Redis so every replica shares one budget.
+# Returns the number of seconds the caller has to wait before its request may go out.
+_REDIS_RESERVE_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local min_interval = tonumber(ARGV[3])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'updated', 'last_slot')
+local tokens = tonumber(state[1]) or capacity
+local updated = tonumber(state[2]) or now
+local last_slot = tonumber(state[3]) or 0
+tokens = math.min(capacity, tokens + (now - updated) * rate) - 1
+local ready = now
+if tokens < 0 then
+    ready = now + (-tokens) / rate
+end
+if ready < last_slot + min_interval then
+    ready = last_slot + min_interval
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'updated', now, 'last_slot', ready)
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 60)
+return tostring(ready - now)
+"""
+
+class TokenBucket:
+    """
+    Thread-safe token bucket enforcing a per-minute budget and a minimum spacing
+
+    Each acquire() reserves the next free slot under a lock and then sleeps
+    outside of it, so concurrent callers queue up fairly without holding the
+    lock while they wait. Threads and coroutines (acquire_async) can share
+    one bucket.
+    """
+
+    def __init__(self, requests_per_minute: int, min_interval: float = 0, burst: Optional[int] = None):
+        self.rate = requests_per_minute / 60.0
+        self.capacity = burst or requests_per_minute
+        self.min_interval = min_interval
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._last_slot = 0.0
+        self._lock = threading.Lock()
+
+    def _reserve(self) -> float:
+        """Reserve a slot and return how long to wait for it"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate) - 1
+            self._updated = now
+            ready = now
+            if self._tokens < 0:
+                ready = now + (-self._tokens) / self.rate
+            ready = max(ready, self._last_slot + self.min_interval)
+            self._last_slot = ready
+            return ready - now
+
+    def acquire(self) -> float:
+        """Block until a request may be made, returning the time spent waiting"""
+        wait = self._reserve()
+        if wait > 0:
+            time.sleep(wait)
+        return max(wait, 0.0)
+
+    async def acquire_async(self) -> float:
+        """Like acquire(), but waits without blocking the event loop"""
+        wait = self._reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return max(wait, 0.0)
+
+class RedisTokenBucket(TokenBucket):
+    """
+    Token bucket whose state lives in Redis, shared by every process using the same key
+
+    Falls back to the in-process bucket if Redis is unreachable.
+    """
+
+    def __init__(self, redis_client, key: str, requests_per_minute: int,
+                 min_interval: float = 0, burst: Optional[int] = None):
+        super().__init__(requests_per_minute, min_interval, burst)
+        self.key = key
+        self._script = redis_client.register_script(_REDIS_RESERVE_SCRIPT)
+
+    def _reserve(self) -> float:
+        try:
+            return float(self._script(keys=[self.key], args=[self.rate, self.capacity, self.min_interval]))
+        except Exception as e:
+            logger.warning("Redis rate limiter error, using local limiter: %s", e)
+            return super()._reserve()
+
+def create_rate_limiter(config: Dict, redis_client=None, key: str = 'mlb_rate_limit') -> TokenBucket:
+    """
+    Create a rate limiter from a RATE_LIMIT style config dict
+
+    Uses a Redis-backed bucket shared across processes when a Redis client is
+    given, otherwise an in-process one.
+    """
+    args = (config['requests_per_minute'], config.get('min_interval', 0), config.get('burst'))
+    if redis_client is not None:
+        try:
+            return RedisTokenBucket(redis_client, key, *args)
+        except Exception as e:
+            logger.warning("Failed to create Redis rate limiter: %s", e)
+    return TokenBucket(*args)
@@ -0,0 +1,110 @@
+import asyncio
+import hashlib
+import os
+import re
+import time
+from typing import Dict, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit
+import requests
+from requests.adapters import HTTPAdapter
+from utils.log import get_logger
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+logger = get_logger(__name__)
+
+# Save every successful MLB Stats API response to this directory
+MLB_RECORD_DIR = os.getenv('MLB_RECORD_DIR')
+
+# Serve MLB Stats API requests from fixtures in this directory instead of the network
+MLB_REPLAY_DIR = os.getenv('MLB_REPLAY_DIR')
+
+# Simulated upstream latency in seconds for replayed requests
+MLB_REPLAY_LATENCY = float(os.getenv('MLB_REPLAY_LATENCY', '0'))
+
+def fixture_name(url: str) -> str:
+    """
+    Get the fixture file name for a request URL
+
+    Only the path and query count, so fixtures work against any base URL.
+    Query parameters are sorted and hashed to keep names short and stable.
+    """
+    parts = urlsplit(url)
+    name = re.sub(r'[^A-Za-z0-9]+', '_', parts.path).strip('_')
+    query = sorted(parse_qsl(parts.query, keep_blank_values=True))
+    if query:
+        name += '-' + hashlib.sha1(urlencode(query).encode()).hexdigest()[:12]
+    return f"{name}.json"
+
+def record_response(directory: str, url: str, body: bytes):
+    """Save a response body as the fixture for url"""
+    try:
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, fixture_name(url))
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(body)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        logger.warning("Error recording %s: %s", url, e)
+
+def replay_response(directory: str, url: str, if_none_match: Optional[str] = None) -> Tuple[int, Dict[str, str], bytes]:
+    """
+    Look up the fixture for url
+
+    Returns a (status, headers, body) tuple: 200 with an ETag derived from
+    the fixture, 304 when if_none_match matches that ETag, or 404 when there
+    is no fixture for url.
+    """
+    path = os.path.join(directory, fixture_name(url))
+    try:
+        with open(path, 'rb') as f:
+            body = f.read()
+    except FileNotFoundError:
+        logger.warning("No fixture for %s (%s)", url, path)
+        return 404, {'Content-Type': 'application/json'}, b'{"message": "No fixture recorded"}'
+
+    etag = f'"{hashlib.sha1(body).hexdigest()[:16]}"'
+    if if_none_match == etag:
+        return 304, {'ETag': etag}, b''
+    return 200, {'Content-Type': 'application/json', 'ETag': etag}, body
+
+class ReplayAdapter(HTTPAdapter):
+    """requests transport adapter answering from a fixture directory"""
+
+    def __init__(self, directory: str, latency: float = MLB_REPLAY_LATENCY):
+        super().__init__()
+        self.directory = directory
+        self.latency = latency
+
+    def send(self, request, **kwargs):
+        if self.latency:
+            time.sleep(self.latency)
+        status, headers, body = replay_response(self.directory, request.url, request.headers.get('If-None-Match'))
+        response = requests.Response()
+        response.status_code = status
+        response.headers.update(headers)
+        response._content = body
+        response.encoding = 'utf-8'
+        response.url = request.url
+        response.request = request
+        return response
+
+if httpx is not None:
+    class ReplayTransport(httpx.AsyncBaseTransport):
+        """httpx transport answering from a fixture directory"""
+
+        def __init__(self, directory: str, latency: float = MLB_REPLAY_LATENCY):
+            self.directory = directory
+            self.latency = latency
+
+        async def handle_async_request(self, request):
+            if self.latency:
+                await asyncio.sleep(self.latency)
+            status, headers, body = replay_response(
+                self.directory, str(request.url), request.headers.get('If-None-Match')
+            )
+            return httpx.Response(status, headers=headers, content=body, request=request)
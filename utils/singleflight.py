@@ -0,0 +1,159 @@
+import asyncio
+import json
+import threading
+from typing import Any, Awaitable, Callable
+from utils.log import get_logger
+
+logger = get_logger(__name__)
+
+class _Call:
+    """An in-flight call that other callers can wait on"""
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls for the same key into a single execution
+
+    Callers that arrive while a call for their key is running wait for it
+    and share its result (or exception). With a Redis client, a Redis lock
+    also coalesces calls across processes: the process holding the lock
+    publishes its result under a short-lived key that the waiting processes
+    read instead of making the call themselves. Results shared through
+    Redis must be JSON serializable.
+    """
+
+    def __init__(self, redis_client=None, lock_timeout: int = 30, result_ttl: int = 2,
+                 prefix: str = 'singleflight'):
+        self.redis_client = redis_client
+        self.lock_timeout = lock_timeout
+        self.result_ttl = result_ttl
+        self.prefix = prefix
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: str, fn: Callable[[], Any], shared: bool = True) -> Any:
+        """
+        Run fn for key, or wait for the call already in flight for it
+
+        Args:
+            key: Key identifying the call, e.g. endpoint plus URL
+            fn: Function to run if no call for key is in flight
+            shared: Whether to also coalesce across processes through Redis
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            if shared and self.redis_client is not None:
+                call.result = self._do_shared(key, fn)
+            else:
+                call.result = fn()
+            return call.result
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.event.set()
+
+    def _do_shared(self, key: str, fn: Callable[[], Any]) -> Any:
+        """Coalesce a call across processes with a Redis lock"""
+        result_key = f"{self.prefix}:result:{key}"
+        try:
+            cached = self.redis_client.get(result_key)
+            if cached is not None:
+                return json.loads(cached)
+
+            lock = self.redis_client.lock(
+                f"{self.prefix}:lock:{key}",
+                timeout=self.lock_timeout,
+                blocking_timeout=self.lock_timeout
+            )
+            acquired = lock.acquire()
+        except Exception as e:
+            logger.warning("Redis single-flight error: %s", e)
+            return fn()
+
+        if not acquired:
+            # The other process is taking too long, make the call ourselves
+            return fn()
+
+        try:
+            # Another process may have finished the call while we waited for the lock
+            cached = self.redis_client.get(result_key)
+            if cached is not None:
+                return json.loads(cached)
+
+            result = fn()
+            try:
+                self.redis_client.setex(result_key, self.result_ttl, json.dumps(result))
+            except Exception as e:
+                logger.warning("Redis single-flight error: %s", e)
+            return result
+        finally:
+            try:
+                lock.release()
+            except Exception:
+                pass
+
+class AsyncSingleFlight:
+    """
+    asyncio counterpart of SingleFlight
+
+    Coroutines that ask for a key while a call for it is running on the same
+    event loop await that call instead of starting their own. A caller that
+    is cancelled or times out stops waiting without cancelling the call for
+    the others. With a Redis client, calls are also coalesced across
+    processes through SingleFlight's Redis lock, held from a worker thread
+    so the event loop never blocks on it.
+    """
+
+    def __init__(self, redis_client=None, **kwargs):
+        self._shared = SingleFlight(redis_client, **kwargs)
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]], shared: bool = True) -> Any:
+        """
+        Await fn() for key, or the call already in flight for it
+
+        Args:
+            key: Key identifying the call, e.g. endpoint plus URL
+            fn: Coroutine function to run if no call for key is in flight
+            shared: Whether to also coalesce across processes through Redis
+        """
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            task = self._calls.get((loop, key))
+            if task is None:
+                task = loop.create_task(self._run(loop, key, fn, shared))
+                self._calls[(loop, key)] = task
+        return await asyncio.shield(task)
+
+    async def _run(self, loop, key: str, fn: Callable[[], Awaitable[Any]], shared: bool) -> Any:
+        try:
+            if shared and self._shared.redis_client is not None:
+                return await asyncio.to_thread(
+                    self._shared._do_shared,
+                    key,
+                    lambda: asyncio.run_coroutine_threadsafe(fn(), loop).result()
+                )
+            return await fn()
+        finally:
+            with self._lock:
+                self._calls.pop((loop, key), None)
@@ -1,28 +1,36 @@
+import asyncio
 import random
-from datetime import datetime, timedelta
+from datetime import datetime
 import json
 import os
-import requests
-from typing import List, Dict, Any, Optional
-from functools import lru_cache
-import redis
+import threading
+from typing import List, Dict, Any, Optional, Tuple
 import time
+from utils.archive import game_archive
+from utils.cache import cache, memoize, redis_client
+from utils.mlb_client import async_mlb_client, mlb_client
+from utils.rate_limit import create_rate_limiter
+from utils.singleflight import AsyncSingleFlight, SingleFlight
+from utils.live_feed import extract_highlights, live_tracker, parse_boxscore
+from utils.log import get_logger, get_sampled_logger
+from utils.metrics import histogram, timed
+from utils.models import Game, TeamSeasonStats, decode_player_stats, encode_player_stats
+from utils.teams import team_registry
+
+logger = get_logger(__name__)
+
+# Per-game debug lines, only a sample of which are emitted even at DEBUG
+game_logger = get_sampled_logger(__name__)
+
+FETCH_SECONDS = histogram('mlb_fetch_seconds', 'Time spent in data fetchers, including cache hits', ('fetcher',))
+CACHE_SECONDS = histogram(
+    'mlb_cache_op_seconds', 'Time spent in cache lookups and stores', ('op',),
+    buckets=(0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.05, 0.1)
+)
 
 # API Keys and endpoints
 MLB_API_KEY = os.getenv('MLB_API_KEY', '')  # Make API key optional with empty default
 
-# Initialize Redis connection (if REDIS_URL is set in environment)
-redis_client = None
-if os.getenv('REDIS_URL'):
-    try:
-        redis_client = redis.from_url(os.getenv('REDIS_URL'))
-        print("Successfully connected to Redis")
-    except Exception as e:
-        print(f"Failed to connect to Redis: {e}")
-        print("Falling back to in-memory caching")
-else:
-    print("No REDIS_URL found. Using in-memory caching.")
-
 # Cache configuration
 CACHE_TTL = {
     'live_games': 60,  # 1 minute for live games
@@ -30,172 +38,521 @@ CACHE_TTL = {
     'finished_games': 3600,  # 1 hour for finished games
     'team_stats': 86400,  # 24 hours for team stats
     'player_stats': 3600,  # 1 hour for player stats
+    'viewed_dates': 1800,  # 30 minutes for dates outside yesterday/today/tomorrow since their last view
 }
 
-# Rate limiting configuration
+# Rate limiting configuration (applies to every upstream request)
 RATE_LIMIT = {
-    'requests_per_minute': 30,
-    'min_interval': 2  # minimum seconds between requests
+    'requests_per_minute': 120,
+    'burst': 20,  # requests that may go out back to back after an idle period
+    'min_interval': 0.05  # minimum seconds between requests
 }
 
-# Initialize cache variables
-_mlb_teams_cache = None
-_mlb_teams_cache_time = None
-_mlb_schedule_cache = {}  # Dictionary to store multiple days
-_mlb_schedule_cache_time = None
-_team_stats_cache = {}
-_last_request_time = 0
-
-def _rate_limit():
-    """Implement rate limiting"""
-    global _last_request_time
-    current_time = time.time()
-    time_since_last = current_time - _last_request_time
-    if time_since_last < RATE_LIMIT['min_interval']:
-        time.sleep(RATE_LIMIT['min_interval'] - time_since_last)
-    _last_request_time = time.time()
-
-def _get_cached_data(key: str) -> Optional[Dict]:
-    """Get data from Redis cache"""
-    if redis_client:
-        try:
-            data = redis_client.get(key)
-            if data:
-                return json.loads(data)
-        except Exception as e:
-            print(f"Redis cache error: {e}")
-    return None
-
-def _set_cached_data(key: str, data: Dict, ttl: int):
-    """Set data in Redis cache with TTL"""
-    if redis_client:
-        try:
-            redis_client.setex(key, ttl, json.dumps(data))
-        except Exception as e:
-            print(f"Redis cache error: {e}")
-
-def _is_cache_valid(cache_time: datetime) -> bool:
-    """Check if cache is still valid"""
-    if not cache_time:
-        return False
-    
-    # Use shorter TTL in production environment
-    if os.getenv('STREAMLIT_DEPLOYMENT'):
-        return (datetime.now() - cache_time).total_seconds() < 30  # 30 seconds for deployed app
-    
-    return (datetime.now() - cache_time).total_seconds() < CACHE_TTL['live_games']
+# Query parameters for the MLB Stats API requests
+SCHEDULE_FIELDS = 'dates,games,gamePk,teams,home,away,team,id,name,score,status,detailedState,currentInning,gameDate,linescore,decisions'
+# Only a finished game's highlights from its live feed, the boxscore has the rest
+HIGHLIGHTS_FIELDS = 'liveData,highlights,headline,timestamp'
+TEAM_STATS_PARAMS = {'stats': 'regularSeason', 'group': 'hitting,pitching', 'season': 2025}
+LEAGUE_TEAM_STATS_PARAMS = {'stats': 'season', 'group': 'hitting,pitching', 'season': 2025, 'sportIds': 1}
 
-def _get_mlb_teams() -> Dict[str, str]:
-    """Get MLB team IDs with caching"""
-    global _mlb_teams_cache, _mlb_teams_cache_time
-    
-    # Check Redis cache first
-    redis_key = 'mlb_teams'
-    cached_data = _get_cached_data(redis_key)
-    if cached_data:
-        return cached_data
-    
-    # Check memory cache
-    if _mlb_teams_cache and _is_cache_valid(_mlb_teams_cache_time):
-        return _mlb_teams_cache
-    
+# Concurrency configuration for fanning out per-game requests
+CONCURRENCY = {
+    'max_workers': int(os.getenv('MLB_MAX_WORKERS', '8'))  # cap on in-flight requests per slate or prefetch
+}
+
+# Statuses of games that were never played, final once their date has passed
+UNPLAYED_STATUSES = ("Postponed", "Cancelled")
+
+_background_refresh = False  # True while a poller in this process keeps the cache warm
+
+# Token bucket shared by every request the client makes. Set RATE_LIMIT_REDIS to
+# share one upstream budget across all app replicas through Redis.
+_rate_limiter = create_rate_limiter(RATE_LIMIT, redis_client if os.getenv('RATE_LIMIT_REDIS') else None)
+mlb_client.rate_limiter = _rate_limiter
+async_mlb_client.rate_limiter = _rate_limiter
+
+# Coalesce concurrent identical requests. Set SINGLE_FLIGHT_REDIS to also coalesce
+# across processes through a Redis lock.
+_single_flight_redis = redis_client if os.getenv('SINGLE_FLIGHT_REDIS') else None
+mlb_client.single_flight = SingleFlight(_single_flight_redis)
+async_mlb_client.single_flight = AsyncSingleFlight(_single_flight_redis)
+
+# Coalesces concurrent sessions building the same date's slate on an event loop
+_slate_flight = AsyncSingleFlight()
+
+# Event loop the sync API runs the async data layer on, started on first use
+_loop = None
+_loop_lock = threading.Lock()
+
+def _run(coro):
+    """Run a coroutine on the shared background event loop and wait for its result"""
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name='mlb-data-loop', daemon=True).start()
     try:
-        response = requests.get('https://statsapi.mlb.com/api/v1/teams', params={'sportId': 1})
-        response.raise_for_status()
-        data = response.json()
-        
-        # Create team ID mapping
-        team_map = {team['name']: str(team['id']) for team in data['teams']}
-        
-        # Update both caches
-        _mlb_teams_cache = team_map
-        _mlb_teams_cache_time = datetime.now()
-        _set_cached_data(redis_key, team_map, CACHE_TTL['team_stats'])
-        
-        return team_map
+        running = asyncio.get_running_loop()
+    except RuntimeError:
+        running = None
+    if running is _loop:
+        coro.close()
+        raise RuntimeError("Sync data API called from its own event loop, await the async API instead")
+    return asyncio.run_coroutine_threadsafe(coro, _loop).result()
+
+async def _bounded(semaphore: asyncio.Semaphore, coro):
+    """Await coro once the semaphore has a free slot"""
+    async with semaphore:
+        return await coro
+
+# Cache entries are keyed by kind and key in the shared two-tier cache:
+# 'slate' maps a date to its gamePks, 'game' maps a gamePk to its Game,
+# 'feed' maps a gamePk to (player_stats, highlights, feed_version) and 'team_stats' maps a
+# team ID to its season stats. Team IDs and names live in utils/teams.py,
+# finished games are also archived on disk by utils/archive.py.
+@timed(CACHE_SECONDS, op='get')
+def _cache_get(kind: str, key, allow_stale: bool = False):
+    """Get a cache entry's value, or None if it is missing or expired"""
+    return cache.get(f"{kind}:{key}", allow_stale=allow_stale, decode=_CODECS.get(kind, (None, None))[1])
+
+@timed(CACHE_SECONDS, op='set')
+def _cache_set(kind: str, key, value, ttl: Optional[int]):
+    """Store a cache entry, a ttl of None meaning it never expires"""
+    cache.set(f"{kind}:{key}", value, ttl, encode=_CODECS.get(kind, (None, None))[0])
+
+def _cache_delete(kind: str, key):
+    cache.delete(f"{kind}:{key}")
+
+# Season stats objects shared by every game referencing them, keyed by team ID
+_season_stats = {}
+_season_stats_lock = threading.Lock()
+
+def _shared_season_stats(team_id: Optional[str], raw: Optional[Dict]) -> Optional[TeamSeasonStats]:
+    """Get the shared TeamSeasonStats for a team's raw season stats, one per refresh"""
+    if not raw or team_id is None:
+        return None
+    with _season_stats_lock:
+        season_stats = _season_stats.get(team_id)
+        if season_stats is None or season_stats.raw is not raw:
+            season_stats = _season_stats[team_id] = TeamSeasonStats(team_id, raw)
+        return season_stats
+
+def _cached_season_stats(team_id: str) -> Optional[TeamSeasonStats]:
+    """Get a team's season stats for a game read back from Redis"""
+    with _season_stats_lock:
+        season_stats = _season_stats.get(team_id)
+    if season_stats is not None:
+        return season_stats
+    # Written by another process, read the stats it cached alongside
+    league_stats = cache.get('league_team_stats:', allow_stale=True) or {}
+    raw = league_stats.get(team_id) or cache.get(f'team_stats:{team_id}', allow_stale=True)
+    return _shared_season_stats(team_id, raw)
+
+def _encode_feed(value):
+    player_stats, highlights, feed_version = value
+    return [encode_player_stats(player_stats), highlights, feed_version]
+
+def _decode_feed(value):
+    player_stats, highlights, feed_version = value
+    return decode_player_stats(player_stats), highlights, feed_version
+
+# Compact JSON encodings for the entries holding model objects, as (encode, decode)
+_CODECS = {
+    'game': (Game.to_record, lambda record: Game.from_record(record, _cached_season_stats)),
+    'feed': (_encode_feed, _decode_feed),
+}
+
+def _game_ttl(status: str, player_stats: bool = True) -> Optional[int]:
+    """
+    Get the cache TTL for a game's entries based on its status
+
+    A finished game whose player stats failed to load expires like a live
+    one, so the next refresh retries its boxscore.
+    """
+    if status == "Finished" and player_stats:
+        return None  # final games don't change anymore
+    if status in ("Live", "Delayed", "Finished"):
+        # Use shorter TTL in production environment
+        if os.getenv('STREAMLIT_DEPLOYMENT'):
+            return 30  # 30 seconds for deployed app
+        return CACHE_TTL['live_games']
+    return CACHE_TTL['upcoming_games']
+
+def _slate_ttl(games: List[Game]) -> int:
+    """Get the cache TTL for a date's games, driven by its most volatile game"""
+    ttls = [_game_ttl(g.status, bool(g.player_stats)) for g in games]
+    ttls = [ttl for ttl in ttls if ttl is not None]
+    if not games:
+        return CACHE_TTL['upcoming_games']
+    # A fully finished slate can still be amended (e.g. a suspended game resumes)
+    return min(ttls) if ttls else CACHE_TTL['finished_games']
+
+def _cached_slate(date_str: str, allow_stale: bool = False) -> Optional[List[Game]]:
+    """Assemble a date's games from the cache, or None if any entry is missing"""
+    game_pks = _cache_get('slate', date_str, allow_stale=allow_stale)
+    if game_pks is None:
+        return None
+    # Game entries were stored with the slate and live at least as long as it
+    games = [_cache_get('game', game_pk, allow_stale=True) for game_pk in game_pks]
+    if any(game is None for game in games):
+        return None
+    return games
+
+def enable_background_refresh():
+    """
+    Serve cached dates regardless of age
+
+    Called by the background poller (utils/poller.py), which keeps the cache
+    fresh on its own schedule so page loads only read from it.
+    """
+    global _background_refresh
+    _background_refresh = True
+
+@memoize('team_stats', CACHE_TTL['team_stats'])
+@timed(FETCH_SECONDS, fetcher='team_stats')
+async def _get_team_stats(team_id: str) -> Dict:
+    """Get team stats, cached for CACHE_TTL['team_stats']"""
+    try:
+        # Get 2025 season stats
+        return await async_mlb_client.get_json(
+            'team_stats',
+            f'/api/v1/teams/{team_id}/stats',
+            params=TEAM_STATS_PARAMS
+        )
     except Exception as e:
-        print(f"Error fetching MLB teams: {e}")
+        logger.error("Error fetching team stats for %s: %s", team_id, e)
         return {}
 
-@lru_cache(maxsize=100)
-def _get_team_stats(team_id: str) -> Dict:
-    """Get team stats with LRU caching"""
-    _rate_limit()
+@memoize('league_team_stats', CACHE_TTL['team_stats'])
+@timed(FETCH_SECONDS, fetcher='league_team_stats')
+async def _get_league_team_stats() -> Dict[str, Dict]:
+    """
+    Get season hitting and pitching stats for every MLB team in one request
+
+    Returns an index of team ID to stats, in the same shape the per-team
+    stats endpoint returns, cached for CACHE_TTL['team_stats'].
+    """
     try:
-        # Get 2025 season stats
-        response = requests.get(
-            f'https://statsapi.mlb.com/api/v1/teams/{team_id}/stats',
-            params={
-                'stats': 'regularSeason',
-                'group': 'hitting,pitching',
-                'season': 2025
-            }
+        data = await async_mlb_client.get_json(
+            'team_stats',
+            '/api/v1/teams/stats',
+            params=LEAGUE_TEAM_STATS_PARAMS
         )
-        response.raise_for_status()
-        return response.json()
     except Exception as e:
-        print(f"Error fetching team stats: {e}")
+        logger.error("Error fetching league team stats: %s", e)
         return {}
+    
+    index = {}
+    for group in data.get('stats', []):
+        for split in group.get('splits', []):
+            team_id = split.get('team', {}).get('id')
+            if team_id is None:
+                continue
+            index.setdefault(str(team_id), {'stats': []})['stats'].append({
+                'type': group.get('type', {}),
+                'group': group.get('group', {}),
+                'splits': [split]
+            })
+    return index
+
+async def prefetch_team_stats_async(team_ids: Optional[List[str]] = None,
+                                    semaphore: Optional[asyncio.Semaphore] = None) -> Dict[str, Dict]:
+    """
+    Load season stats for many teams in one pass
 
-def get_mlb_games(selected_date=None) -> List[Dict[str, Any]]:
+    Uses the league-wide stats endpoint, falling back to concurrent per-team
+    requests for any team it didn't cover.
+
+    Args:
+        team_ids: Team IDs to load. If None, loads every MLB team.
+        semaphore: Bounds the per-team requests, e.g. shared with a slate's
+                   other requests. Defaults to CONCURRENCY['max_workers'].
+
+    Returns a dict of team ID to season stats.
+    """
+    league_stats = await _get_league_team_stats()
+    if team_ids is None:
+        team_ids = await asyncio.to_thread(team_registry.team_ids) or list(league_stats)
+
+    stats = {team_id: league_stats[team_id] for team_id in team_ids if team_id in league_stats}
+    missing = [team_id for team_id in team_ids if team_id not in stats]
+    if missing:
+        semaphore = semaphore or asyncio.Semaphore(CONCURRENCY['max_workers'])
+        results = await asyncio.gather(*(_bounded(semaphore, _get_team_stats(team_id)) for team_id in missing))
+        stats.update(zip(missing, results))
+    return stats
+
+def prefetch_team_stats(team_ids: Optional[List[str]] = None) -> Dict[str, Dict]:
+    """Load season stats for many teams in one pass, see prefetch_team_stats_async"""
+    return _run(prefetch_team_stats_async(team_ids))
+
+def invalidate_team_stats(team_id: Optional[str] = None):
+    """Drop cached season stats for one team, or for every team if team_id is None"""
+    if team_id is None:
+        _get_league_team_stats.cache_clear()
+        _get_team_stats.cache_clear()
+    else:
+        _get_league_team_stats.cache_clear()
+        _get_team_stats.invalidate(team_id)
+
+def clear_caches():
+    """
+    Drop cached slates and team season stats
+
+    Finished games stay cached since they can't change anymore.
+    """
+    cache.delete_prefix('slate:')
+    invalidate_team_stats()
+
+def _schedule_team(team: Dict) -> Tuple[Optional[str], str]:
+    """
+    Get a schedule entry's team ID and display name
+
+    The ID comes straight from the payload. Older payloads without one are
+    matched on name through the registry's aliases.
+    """
+    name = team.get('name', '')
+    team_id = team.get('id')
+    registered = team_registry.get(team_id) if team_id is not None else team_registry.find(name)
+    if registered:
+        return registered['id'], registered['name']
+    return (str(team_id) if team_id is not None else None), name
+
+async def _get_highlights(game_pk: int):
+    """Get a game's highlights from its live feed, filtered down to them, see _get_boxscore"""
+    return await async_mlb_client.get_json_conditional(
+        'feed', f'/api/v1.1/game/{game_pk}/feed/live', params={'fields': HIGHLIGHTS_FIELDS}
+    )
+
+@timed(FETCH_SECONDS, fetcher='boxscore')
+async def _get_boxscore(game_pk: int):
+    """
+    Get the boxscore and highlights for a single game
+    
+    Finished games only need player lines, which the boxscore endpoint
+    serves at a fraction of the size of the full live feed, and highlights,
+    which come from the live feed filtered down to them. Both are requested
+    at once. Highlights that fail to load are left out rather than failing
+    the player lines.
+
+    Returns a (data, highlights, changed) tuple, where changed is False when
+    upstream answered 304 Not Modified to both requests.
+    """
+    boxscore_result, highlights_result = await asyncio.gather(
+        async_mlb_client.get_json_conditional('feed', f'/api/v1/game/{game_pk}/boxscore'),
+        _get_highlights(game_pk),
+        return_exceptions=True
+    )
+    if isinstance(boxscore_result, BaseException):
+        raise boxscore_result
+    data, changed = boxscore_result
+    if isinstance(highlights_result, BaseException):
+        logger.warning("Error fetching highlights for game %s: %s", game_pk, highlights_result)
+        return data, [], True
+    feed, highlights_changed = highlights_result
+    return data, extract_highlights(feed), changed or highlights_changed
+
+@timed(FETCH_SECONDS, fetcher='live_feed')
+async def _update_live_game(game_pk: int):
+    """Bring an in-progress game's feed up to date, see LiveGameTracker.update"""
+    return await live_tracker.update(game_pk)
+
+async def _fetch_slate_details(game_pks: List[int], live_game_pks: List[int], team_ids: List[str]):
+    """
+    Fetch live feeds and team stats for a whole slate concurrently
+    
+    Requests are gathered with at most CONCURRENCY['max_workers'] in flight,
+    so cold-load latency tracks the slowest request instead of the sum of all
+    of them. Every request still waits on the client's shared rate limiter.
+    Cancelling the caller only stops it waiting: upstream requests run
+    shielded in the client's single flight (as does the whole slate load, see
+    _slate_flight), so they still finish and fill the cache.
+    
+    Team season stats come from one league-wide request, made alongside the
+    game requests, and only teams it doesn't cover are fetched one by one
+    (see prefetch_team_stats_async).
+    
+    Returns a (feeds, live_updates, team_stats) tuple of dicts keyed by gamePk
+    and team ID. Feeds are (data, highlights, changed) tuples from
+    _get_boxscore and live updates are _update_live_game() results; both are
+    None on failure.
+    """
+    feeds = {}
+    live_updates = {}
+    team_stats = {}
+    if not game_pks and not live_game_pks and not team_ids:
+        return feeds, live_updates, team_stats
+    
+    semaphore = asyncio.Semaphore(CONCURRENCY['max_workers'])
+    
+    async def get_team_stats():
+        # Both team stats fetchers log and swallow their own errors
+        return await prefetch_team_stats_async(team_ids, semaphore) if team_ids else {}
+    
+    feed_results, live_results, team_results = await asyncio.gather(
+        asyncio.gather(*(_bounded(semaphore, _get_boxscore(pk)) for pk in game_pks), return_exceptions=True),
+        asyncio.gather(*(_bounded(semaphore, _update_live_game(pk)) for pk in live_game_pks), return_exceptions=True),
+        get_team_stats()
+    )
+    
+    for game_pk, result in zip(game_pks, feed_results):
+        if isinstance(result, Exception):
+            logger.error("Error fetching player stats for game %s: %s", game_pk, result)
+            result = None
+        feeds[game_pk] = result
+    
+    for game_pk, result in zip(live_game_pks, live_results):
+        if isinstance(result, Exception):
+            logger.error("Error updating live feed for game %s: %s", game_pk, result)
+            result = None
+        live_updates[game_pk] = result
+    
+    for team_id in team_ids:
+        team_stats[team_id] = team_results.get(team_id) or {}
+    
+    return feeds, live_updates, team_stats
+
+def _archive_games(date_str: str, games: List[Game], slate_game_pks: Optional[List[int]],
+                   unplayed: List[Game] = ()):
+    game_archive.put_games([game.to_dict() for game in games])
+    if slate_game_pks is not None:
+        game_archive.put_slate(date_str, slate_game_pks, [game.to_dict() for game in unplayed])
+
+async def _archive_finished(date_str: str, game_pks: List[int], games: List[Game], processed: List[Game]):
+    """
+    Archive newly processed finished games, and the whole slate once a past
+    date is entirely final so it is never requested from upstream again
+
+    On a past date postponed and cancelled games are final too. They have no
+    player stats and are stored with the slate rather than as games (see
+    GameArchive). Finished games whose player stats failed to load are left
+    out, they'll be retried on the next load.
+    """
+    to_archive = [g for g in processed if g.status == "Finished" and g.player_stats]
+    unplayed = [g for g in games if g.status in UNPLAYED_STATUSES]
+    complete = (
+        date_str < datetime.now().strftime('%Y-%m-%d') and games
+        and [g.id for g in games] == game_pks
+        and all(g.status in UNPLAYED_STATUSES or (g.status == "Finished" and g.player_stats) for g in games)
+    )
+    if complete:
+        # Games reused from the cache may predate the archive, write the whole slate
+        to_archive = [g for g in games if g.status == "Finished"]
+    if to_archive or complete:
+        await asyncio.to_thread(_archive_games, date_str, to_archive, game_pks if complete else None, unplayed)
+
+@timed(FETCH_SECONDS, fetcher='games')
+async def get_mlb_games_async(selected_date=None, force_refresh: bool = False,
+                              timeout: Optional[float] = None) -> List[Dict[str, Any]]:
     """
     Fetch MLB games using the MLB Stats API with caching
     
+    Live feeds and team stats for the whole slate are fetched concurrently
+    (see _fetch_slate_details) before the games are assembled. Callers
+    asking for the same date while it is being loaded wait for that load
+    instead of starting their own. Games are cached as compact Game records
+    and returned as dicts (see Game.to_dict).
+    
     Args:
         selected_date: Optional date to fetch games for (datetime object).
                       If None, uses today's date.
+        force_refresh: Skip the caches and reload from upstream (used by the poller).
+                       A failed load raises instead of returning no games.
+        timeout: Optional number of seconds to wait before raising TimeoutError.
+                 The load keeps going for other callers and still fills the cache.
     """
-    global _mlb_schedule_cache, _mlb_schedule_cache_time
+    # Use selected date or today's date
+    date_str = selected_date.strftime('%Y-%m-%d') if selected_date else datetime.now().strftime('%Y-%m-%d')
+    logger.debug("Fetching MLB games for date: %s", date_str)
     
-    try:
-        # Use selected date or today's date
-        date_str = selected_date.strftime('%Y-%m-%d') if selected_date else datetime.now().strftime('%Y-%m-%d')
-        print(f"Fetching MLB games for date: {date_str}")
+    if not force_refresh:
+        # Keep the date cached while it is being viewed, see _load_mlb_games
+        _cache_set('viewed', date_str, True, CACHE_TTL['viewed_dates'])
         
         # Check if we have cached data for this date
-        if date_str in _mlb_schedule_cache and _is_cache_valid(_mlb_schedule_cache_time):
-            print(f"Using cached data for {date_str}")
-            return _mlb_schedule_cache[date_str]
+        cached_games = _cached_slate(date_str, allow_stale=_background_refresh)
+        if cached_games is not None:
+            logger.debug("Using cached data for %s", date_str)
+            return [game.to_dict() for game in cached_games]
+    
+    load = _slate_flight.do(
+        f"games:{date_str}",
+        lambda: _load_mlb_games(selected_date, date_str),
+        shared=False
+    )
+    try:
+        games = await load if timeout is None else await asyncio.wait_for(load, timeout)
+    except asyncio.TimeoutError:
+        raise
+    except Exception:
+        # The poller retries sooner after a failure, page loads just show no games
+        if force_refresh:
+            raise
+        return []
+    return [game.to_dict() for game in games]
+
+def get_mlb_games(selected_date=None, force_refresh: bool = False) -> List[Dict[str, Any]]:
+    """Fetch MLB games, see get_mlb_games_async"""
+    return _run(get_mlb_games_async(selected_date, force_refresh))
+
+@timed(FETCH_SECONDS, fetcher='slate_load')
+async def _load_mlb_games(selected_date, date_str: str) -> List[Game]:
+    """
+    Load a date's games from upstream, see get_mlb_games
+
+    Only games that can have changed are re-processed: finished games are
+    cached for good (and archived on disk), upcoming ones until their TTL
+    runs out, and live games are refreshed every time. Past dates whose
+    games are all archived are served from the archive without any request.
+    """
+    try:
+        today_str = datetime.now().strftime('%Y-%m-%d')
+        if date_str < today_str:
+            archived_games = await asyncio.to_thread(game_archive.slate, date_str)
+            if archived_games is not None:
+                logger.debug("Using archived games for %s", date_str)
+                games = [Game.from_dict(game) for game in archived_games]
+                for game in games:
+                    _cache_set('game', game.id, game, None)
+                _cache_set('slate', date_str, [g.id for g in games], _slate_ttl(games))
+                return games
         
-        # Get team IDs from cache
-        team_id_map = _get_mlb_teams()
-        if not team_id_map:
-            print("Failed to get team mapping")
+        # Loading or refreshing the team registry can hit the network, keep it off the loop
+        await asyncio.to_thread(team_registry.team_ids)
         
         # Get the schedule
-        print(f"Making API request to MLB Stats API for {date_str}")
-        url = 'https://statsapi.mlb.com/api/v1/schedule'
+        path = '/api/v1/schedule'
         params = {
             'sportId': 1,  # MLB
             'date': date_str,
-            'fields': 'dates,games,gamePk,teams,home,away,team,name,score,status,detailedState,currentInning,gameDate,linescore,decisions'
+            'fields': SCHEDULE_FIELDS
         }
-        print(f"Request URL: {url}")
-        print(f"Request params: {params}")
+        logger.debug("Requesting %s%s with params %s", mlb_client.base_url, path, params)
         
-        response = requests.get(url, params=params)
-        response.raise_for_status()
-        data = response.json()
+        data, changed = await async_mlb_client.get_json_conditional('schedule', path, params=params)
         
-        print(f"Response status code: {response.status_code}")
-        print(f"Raw response data preview: {str(data)[:500]}...")
+        # Nothing changed upstream since the last poll, reuse the parsed games
+        # unless a finished game's player stats failed to load
+        cached_games = _cached_slate(date_str, allow_stale=True)
+        if (not changed and cached_games is not None
+                and all(g.player_stats or g.status != "Finished" for g in cached_games)):
+            logger.debug("Schedule for %s not modified, using cached games", date_str)
+            _cache_set('slate', date_str, [g.id for g in cached_games], _slate_ttl(cached_games))
+            await _archive_finished(date_str, [g.id for g in cached_games], cached_games, [])
+            return cached_games
         
-        games = []
+        # First pass: parse the schedule and work out which games need processing
+        game_pks = []
+        reused = {}
+        pending = []
         if 'dates' in data and len(data['dates']) > 0:
-            print(f"Found {len(data['dates'][0]['games'])} games")
+            logger.debug("Found %d games", len(data['dates'][0]['games']))
             for game in data['dates'][0]['games']:
                 try:
-                    # Get team names
-                    home_team = game['teams']['home']['team']['name']
-                    away_team = game['teams']['away']['team']['name']
-                    
-                    # Get team IDs from our mapping
-                    home_team_id = team_id_map.get(home_team)
-                    away_team_id = team_id_map.get(away_team)
-                    
-                    if not home_team_id or not away_team_id:
-                        print(f"Could not find team IDs for {home_team} vs {away_team}")
-                        continue
+                    # Get team IDs and names, using the registry's canonical
+                    # names when it knows the team
+                    home_team_id, home_team = _schedule_team(game['teams']['home']['team'])
+                    away_team_id, away_team = _schedule_team(game['teams']['away']['team'])
                     
                     # Get scores
                     home_score = game['teams']['home'].get('score', 0)
@@ -203,7 +560,7 @@ def get_mlb_games(selected_date=None) -> List[Dict[str, Any]]:
                     
                     # Get game status
                     detailed_state = game['status'].get('detailedState', '')
-                    print(f"Game {home_team} vs {away_team} has status: {detailed_state}")
+                    game_logger.debug("Game %s vs %s has status: %s", home_team, away_team, detailed_state)
                     
                     # Get game time 
                     game_time = datetime.strptime(game['gameDate'], '%Y-%m-%dT%H:%M:%SZ')
@@ -217,6 +574,8 @@ def get_mlb_games(selected_date=None) -> List[Dict[str, Any]]:
                         status = "Delayed"
                     elif detailed_state == "Postponed":
                         status = "Postponed"
+                    elif detailed_state in ("Cancelled", "Canceled"):
+                        status = "Cancelled"
                     elif detailed_state == "Scheduled":
                         status = "Upcoming"
                     else:
@@ -229,189 +588,200 @@ def get_mlb_games(selected_date=None) -> List[Dict[str, Any]]:
                         else:
                             status = "Upcoming"
                     
-                    # Format the time
-                    formatted_time = game_time.strftime('%H:%M')
-                    
-                    # Get inning information
-                    inning = game.get('currentInning', None)
-                    inning_state = game.get('detailedState', '')
+                    game_pks.append(game['gamePk'])
                     
-                    # Initialize player_stats and highlights variables
-                    player_stats = {}
-                    highlights = []
+                    # Reuse the cached game unless it may have changed. Finished
+                    # games never expire once their player stats loaded, live
+                    # ones are always refreshed.
+                    cached_game = _cache_get('game', game['gamePk'])
+                    if (cached_game is not None and cached_game.status == status
+                            and status not in ("Live", "Delayed")
+                            and (status != "Finished" or cached_game.player_stats)):
+                        reused[game['gamePk']] = cached_game
+                        continue
                     
-                    # Get player statistics for completed games
-                    if status == "Finished":
+                    pending.append({
+                        'game': game,
+                        'home_team': home_team,
+                        'away_team': away_team,
+                        'home_team_id': home_team_id,
+                        'away_team_id': away_team_id,
+                        'home_score': home_score,
+                        'away_score': away_score,
+                        'detailed_state': detailed_state,
+                        'game_time': game_time,
+                        'status': status
+                    })
+                except Exception as e:
+                    logger.error("Error processing game %s: %s", game.get('gamePk'), e)
+                    continue
+        
+        # Finished games missing from the cache may have been archived by an earlier run
+        finished_pks = [p['game']['gamePk'] for p in pending if p['status'] == "Finished"]
+        archived = await asyncio.to_thread(game_archive.get_games, finished_pks) if finished_pks else {}
+        if archived:
+            for game_pk, archived_game in archived.items():
+                reused[game_pk] = Game.from_dict(archived_game)
+                _cache_set('game', game_pk, reused[game_pk], None)
+            pending = [p for p in pending if p['game']['gamePk'] not in archived]
+        
+        # Second pass: fetch player stats and team stats in parallel. Finished
+        # games get one (conditional) boxscore, in-progress games are kept
+        # current by the diffPatch tracker on the full live feed.
+        feed_game_pks = [p['game']['gamePk'] for p in pending if p['status'] == "Finished"]
+        live_game_pks = [p['game']['gamePk'] for p in pending if p['status'] == "Live"]
+        team_ids = list(dict.fromkeys(
+            team_id for p in pending for team_id in (p['home_team_id'], p['away_team_id']) if team_id
+        ))
+        
+        feeds, live_updates, season_stats = await _fetch_slate_details(feed_game_pks, live_game_pks, team_ids)
+        
+        # Games that are no longer in progress don't need their feeds tracked
+        for game_pk in live_tracker.tracked():
+            if game_pk in feed_game_pks:
+                live_tracker.discard(game_pk)
+        
+        # Third pass: assemble the game dicts for the games we processed
+        processed = {}
+        for p in pending:
+            try:
+                game = p['game']
+                home_team = p['home_team']
+                away_team = p['away_team']
+                home_score = p['home_score']
+                away_score = p['away_score']
+                detailed_state = p['detailed_state']
+                status = p['status']
+                
+                # Format the time
+                formatted_time = p['game_time'].strftime('%H:%M')
+                
+                # Get inning information
+                inning = game.get('currentInning', None)
+                inning_state = game.get('detailedState', '')
+                
+                # Get player statistics and highlights for completed and live games
+                player_stats = {}
+                highlights = []
+                feed_version = ''
+                feed_result = feeds.get(game['gamePk'])
+                live_update = live_updates.get(game['gamePk'])
+                if live_update:
+                    players, highlights, _, feed_version = live_update
+                    if 'home' in players:
+                        player_stats[home_team] = players['home']
+                    if 'away' in players:
+                        player_stats[away_team] = players['away']
+                elif feed_result:
+                    boxscore, highlights, feed_changed = feed_result
+                    cached_feed = _cache_get('feed', game['gamePk'], allow_stale=True)
+                    if not feed_changed and cached_feed is not None:
+                        # Boxscore and highlights answered 304, reuse what we extracted last time
+                        player_stats, highlights, feed_version = cached_feed
+                    else:
                         try:
-                            # Get live feed data for player stats
-                            live_feed_response = requests.get(
-                                f'https://statsapi.mlb.com/api/v1.1/game/{game["gamePk"]}/feed/live'
-                            )
-                            live_feed_response.raise_for_status()
-                            live_feed_data = live_feed_response.json()
-                            
-                            # Process home team stats
-                            if 'home' in live_feed_data.get('liveData', {}).get('boxscore', {}).get('teams', {}):
-                                home_stats = []
-                                for player in live_feed_data['liveData']['boxscore']['teams']['home']['players'].values():
-                                    player_data = {'name': player['person']['fullName']}
-                                    
-                                    # Get batting stats
-                                    if 'stats' in player and 'batting' in player['stats']:
-                                        batting_stats = player['stats']['batting']
-                                        if any(batting_stats.get(stat, 0) > 0 for stat in ['hits', 'runs', 'rbi', 'homeRuns']):
-                                            player_data.update({
-                                                'hits': batting_stats.get('hits', 0),
-                                                'runs': batting_stats.get('runs', 0),
-                                                'rbi': batting_stats.get('rbi', 0),
-                                                'homeRuns': batting_stats.get('homeRuns', 0)
-                                            })
-                                    
-                                    # Get pitching stats
-                                    if 'stats' in player and 'pitching' in player['stats']:
-                                        pitching_stats = player['stats']['pitching']
-                                        if any(pitching_stats.get(stat, 0) > 0 for stat in ['strikeOuts', 'hits', 'runs', 'earnedRuns', 'walks']):
-                                            player_data.update({
-                                                'strikeouts': pitching_stats.get('strikeOuts', 0),
-                                                'hits_allowed': pitching_stats.get('hits', 0),
-                                                'runs_allowed': pitching_stats.get('runs', 0),
-                                                'earned_runs': pitching_stats.get('earnedRuns', 0),
-                                                'walks': pitching_stats.get('walks', 0),
-                                                'innings_pitched': pitching_stats.get('inningsPitched', '0.0')
-                                            })
-                                    
-                                    if len(player_data) > 1:  # Only add if we have stats
-                                        home_stats.append(player_data)
-                                player_stats[home_team] = home_stats
-                            
-                            # Process away team stats
-                            if 'away' in live_feed_data.get('liveData', {}).get('boxscore', {}).get('teams', {}):
-                                away_stats = []
-                                for player in live_feed_data['liveData']['boxscore']['teams']['away']['players'].values():
-                                    player_data = {'name': player['person']['fullName']}
-                                    
-                                    # Get batting stats
-                                    if 'stats' in player and 'batting' in player['stats']:
-                                        batting_stats = player['stats']['batting']
-                                        if any(batting_stats.get(stat, 0) > 0 for stat in ['hits', 'runs', 'rbi', 'homeRuns']):
-                                            player_data.update({
-                                                'hits': batting_stats.get('hits', 0),
-                                                'runs': batting_stats.get('runs', 0),
-                                                'rbi': batting_stats.get('rbi', 0),
-                                                'homeRuns': batting_stats.get('homeRuns', 0)
-                                            })
-                                    
-                                    # Get pitching stats
-                                    if 'stats' in player and 'pitching' in player['stats']:
-                                        pitching_stats = player['stats']['pitching']
-                                        if any(pitching_stats.get(stat, 0) > 0 for stat in ['strikeOuts', 'hits', 'runs', 'earnedRuns', 'walks']):
-                                            player_data.update({
-                                                'strikeouts': pitching_stats.get('strikeOuts', 0),
-                                                'hits_allowed': pitching_stats.get('hits', 0),
-                                                'runs_allowed': pitching_stats.get('runs', 0),
-                                                'earned_runs': pitching_stats.get('earnedRuns', 0),
-                                                'walks': pitching_stats.get('walks', 0),
-                                                'innings_pitched': pitching_stats.get('inningsPitched', '0.0')
-                                            })
-                                    
-                                    if len(player_data) > 1:  # Only add if we have stats
-                                        away_stats.append(player_data)
-                                player_stats[away_team] = away_stats
-                            
-                            # Get highlights
-                            if 'highlights' in live_feed_data.get('liveData', {}):
-                                for highlight in live_feed_data['liveData']['highlights'].get('highlights', []):
-                                    highlights.append({
-                                        'description': highlight.get('headline', ''),
-                                        'timestamp': highlight.get('timestamp', '')
-                                    })
+                            player_stats = parse_boxscore(boxscore, home_team, away_team)
+                            # The boxscore has no timestamp, version it by when it was read
+                            feed_version = f"boxscore-{time.time():.6f}"
+                            _cache_set('feed', game['gamePk'], (player_stats, highlights, feed_version),
+                                       _game_ttl(status))
                         except Exception as e:
-                            print(f"Error fetching player stats for game {game['gamePk']}: {str(e)}")
+                            logger.error("Error fetching player stats for game %s: %s", game['gamePk'], e)
                             player_stats = {}
                             highlights = []
-                    
-                    # Get winning and losing pitchers
-                    decisions = game.get('decisions', {})
-                    winning_pitcher = decisions.get('winner', {})
-                    losing_pitcher = decisions.get('loser', {})
-                    
-                    # Get save pitcher if available
-                    save_pitcher = decisions.get('save', {})
-                    
-                    # Get team season stats for all games
-                    team_stats = {}
-                    # Get cached stats for both teams
-                    home_stats = _get_team_stats(home_team_id)
-                    away_stats = _get_team_stats(away_team_id)
-                    
-                    # Add home team stats with proper formatting
-                    if home_stats:
-                        for key, value in home_stats.items():
-                            team_stats[f"{home_team}_{key}"] = value
-                    
-                    # Add away team stats with proper formatting
-                    if away_stats:
-                        for key, value in away_stats.items():
-                            team_stats[f"{away_team}_{key}"] = value
-                    
-                    # Get linescore data
-                    linescore = game.get('linescore', {})
-                    
-                    # Print debug information
-                    print(f"\nFound game: {home_team} vs {away_team}")
-                    print(f"Status: {status} (State: {detailed_state})")
-                    print(f"Score: {home_score} - {away_score}")
-                    print(f"Time: {formatted_time}")
-                    print(f"Date: {date_str}")
-                    print(f"Inning: {inning}")
-                    print(f"State: {inning_state}")
-                    print("---")
-                    
-                    games.append({
-                        "id": game['gamePk'],
-                        "league": "MLB",
-                        "home_team": home_team,
-                        "away_team": away_team,
-                        "home_score": home_score,
-                        "away_score": away_score,
-                        "time": formatted_time,
-                        "date": date_str,
-                        "status": status,
-                        "period": inning,
-                        "game_clock": inning_state,
-                        "highlights": highlights,
-                        "player_stats": player_stats,
-                        "winning_pitcher": winning_pitcher.get('fullName', ''),
-                        "losing_pitcher": losing_pitcher.get('fullName', ''),
-                        "save_pitcher": save_pitcher.get('fullName', ''),
-                        "team_stats": team_stats,
-                        "linescore": linescore
-                    })
-                except Exception as e:
-                    print(f"Error processing game: {str(e)}")
-                    continue
+                            feed_version = ''
+                
+                # Get winning and losing pitchers
+                decisions = game.get('decisions', {})
+                winning_pitcher = decisions.get('winner', {})
+                losing_pitcher = decisions.get('loser', {})
+                
+                # Get save pitcher if available
+                save_pitcher = decisions.get('save', {})
+                
+                # Get team season stats for all games, shared with every other game of the teams
+                home_stats = _shared_season_stats(p['home_team_id'], season_stats.get(p['home_team_id']))
+                away_stats = _shared_season_stats(p['away_team_id'], season_stats.get(p['away_team_id']))
+                
+                # Get linescore data
+                linescore = game.get('linescore', {})
+                
+                game_logger.debug(
+                    "Found game: %s vs %s, status %s (state %s), score %s - %s, time %s, date %s, inning %s",
+                    home_team, away_team, status, detailed_state, home_score, away_score,
+                    formatted_time, date_str, inning,
+                    extra={'game_pk': game['gamePk'], 'status': status}
+                )
+                
+                processed[game['gamePk']] = Game(
+                    id=game['gamePk'],
+                    home_team=home_team,
+                    away_team=away_team,
+                    home_team_id=p['home_team_id'],
+                    away_team_id=p['away_team_id'],
+                    home_score=home_score,
+                    away_score=away_score,
+                    time=formatted_time,
+                    date=date_str,
+                    status=status,
+                    period=inning,
+                    game_clock=inning_state,
+                    highlights=highlights,
+                    player_stats=player_stats,
+                    winning_pitcher=winning_pitcher.get('fullName', ''),
+                    losing_pitcher=losing_pitcher.get('fullName', ''),
+                    save_pitcher=save_pitcher.get('fullName', ''),
+                    home_season_stats=home_stats,
+                    away_season_stats=away_stats,
+                    linescore=linescore,
+                    feed_version=feed_version
+                )
+                _cache_set('game', game['gamePk'], processed[game['gamePk']], _game_ttl(status, bool(player_stats)))
+            except Exception as e:
+                logger.error("Error processing game %s: %s", p['game'].get('gamePk'), e)
+                continue
+        
+        # Keep the schedule's order, mixing reused and freshly processed games
+        games = []
+        for game_pk in game_pks:
+            game = processed.get(game_pk) or reused.get(game_pk)
+            if game is not None:
+                games.append(game)
         
-        print(f"Total games found for {date_str}: {len(games)}")
+        logger.debug(
+            "Total games found for %s: %d (%d processed, %d cached)",
+            date_str, len(games), len(processed), len(reused),
+            extra={'date': date_str, 'games': len(games), 'processed': len(processed), 'reused': len(reused)}
+        )
         
         # Cache the games for this date
-        _mlb_schedule_cache[date_str] = games
-        _mlb_schedule_cache_time = datetime.now()
+        _cache_set('slate', date_str, [g.id for g in games], _slate_ttl(games))
         
-        # Clean up old cache entries (keep only yesterday, today, and tomorrow)
+        await _archive_finished(date_str, game_pks, games, list(processed.values()))
+        
+        # Clean up old cache entries (keep yesterday, today, tomorrow and any
+        # date viewed recently, in any process sharing the cache)
         today = datetime.now().date()
-        cache_dates = list(_mlb_schedule_cache.keys())
+        cache_dates = [key.split(':', 1)[1] for key in cache.keys('slate:')]
         for cache_date in cache_dates:
             cache_date_obj = datetime.strptime(cache_date, '%Y-%m-%d').date()
-            if abs((cache_date_obj - today).days) > 1:  # Keep only yesterday, today, and tomorrow
-                del _mlb_schedule_cache[cache_date]
+            if (abs((cache_date_obj - today).days) > 1 and cache_date != date_str
+                    and _cache_get('viewed', cache_date) is None):
+                for old_game_pk in _cache_get('slate', cache_date, allow_stale=True) or []:
+                    _cache_delete('game', old_game_pk)
+                    _cache_delete('feed', old_game_pk)
+                    live_tracker.discard(old_game_pk)
+                    mlb_client.forget(f"/api/v1/game/{old_game_pk}/boxscore")
+                mlb_client.forget(path, params={**params, 'date': cache_date})
+                _cache_delete('slate', cache_date)
         
         return games
     except Exception as e:
-        print(f"Error fetching MLB games: {str(e)}")
-        print(f"Response content: {response.text if 'response' in locals() else 'No response'}")
-        return []
+        logger.error("Error fetching MLB games for %s: %s", date_str, e)
+        raise
 
-def get_live_games(status_filter: str, selected_date=None) -> List[Dict[str, Any]]:
+async def get_live_games_async(status_filter: str, selected_date=None,
+                               timeout: Optional[float] = None) -> List[Dict[str, Any]]:
     """
     Get MLB games with optional filtering
     
@@ -419,9 +789,10 @@ def get_live_games(status_filter: str, selected_date=None) -> List[Dict[str, Any
         status_filter: Filter for game status (All, Live, Upcoming, Finished)
         selected_date: Optional date to fetch games for (datetime object).
                       If None, uses today's date.
+        timeout: Optional number of seconds to wait, see get_mlb_games_async
     """
-    games = get_mlb_games(selected_date)
-    
+    games = await get_mlb_games_async(selected_date, timeout=timeout)
+
     # Filter by status if not "All"
     if status_filter != "All":
         games = [g for g in games if g['status'] == status_filter]
@@ -431,23 +802,6 @@ def get_live_games(status_filter: str, selected_date=None) -> List[Dict[str, Any
     
     return games
 
-def pre_cache_games():
-    """Pre-cache games for yesterday, today, and tomorrow with intelligent timing"""
-    today = datetime.now().date()
-    
-    # Only cache yesterday's games if they're finished
-    yesterday = today - timedelta(days=1)
-    get_live_games("Finished", yesterday)
-    
-    # Cache today's games based on time of day
-    current_hour = datetime.now().hour
-    if current_hour < 12:  # Morning
-        get_live_games("Upcoming", today)
-    elif current_hour < 20:  # Afternoon/Evening
-        get_live_games("All", today)
-    else:  # Night
-        get_live_games("Finished", today)
-    
-    # Cache tomorrow's games
-    tomorrow = today + timedelta(days=1)
-    get_live_games("Upcoming", tomorrow)
\ No newline at end of file
+def get_live_games(status_filter: str, selected_date=None) -> List[Dict[str, Any]]:
+    """Get MLB games with optional filtering, see get_live_games_async"""
+    return _run(get_live_games_async(status_filter, selected_date))
@@ -1,75 +1,68 @@
+import numpy as np
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 import random
 from datetime import datetime, timedelta
+from utils.boxscore import BATTING_COLUMNS, PITCHING_COLUMNS, build_box_score, innings_to_outs
+from utils.cache import content_hash, memoize_render
+from utils.log import get_logger
+from utils.metrics import histogram, timed
 
+logger = get_logger(__name__)
+
+# Builders are memoized per process, a rerun only rebuilds what changed.
+# Their results are shared between sessions, don't modify them.
+RENDER_SECONDS = histogram('mlb_render_seconds', 'Time spent building stats tables and charts', ('builder',))
+
+# Keys for memoize_render: what each builder's output depends on
+def _player_lines_version(game):
+    """A game's gamePk and feed version, or a hash of its player lines when it has no version"""
+    if game.get('id') is not None and game.get('feed_version'):
+        return game['id'], game['feed_version']
+    return content_hash([game.get('home_team'), game.get('away_team'), game.get('player_stats')])
+
+def _score_version(game):
+    return game.get('id'), game.get('home_team'), game.get('away_team'), game.get('home_score'), game.get('away_score')
+
+def _comparison_version(stats, home_team, away_team):
+    return content_hash([stats, home_team, away_team])
+
+@timed(RENDER_SECONDS, builder='generate_team_stats')
+@memoize_render('generate_team_stats', _player_lines_version)
 def generate_team_stats(game):
     """
     Generate advanced statistics for MLB teams using real game data
     """
     try:
-        stats = {
-            'hitting': {
-                game['home_team']: {
-                    'hits': 0,
-                    'runs': 0,
-                    'home_runs': 0,
-                    'strikeouts': 0,
-                    'walks': 0,
-                    'batting_avg': 0.0
-                },
-                game['away_team']: {
-                    'hits': 0,
-                    'runs': 0,
-                    'home_runs': 0,
-                    'strikeouts': 0,
-                    'walks': 0,
-                    'batting_avg': 0.0
-                }
-            },
-            'pitching': {
-                game['home_team']: {
-                    'strikeouts': 0,
-                    'walks': 0,
-                    'hits_allowed': 0,
-                    'earned_runs': 0,
-                    'era': 0.0
-                },
-                game['away_team']: {
-                    'strikeouts': 0,
-                    'walks': 0,
-                    'hits_allowed': 0,
-                    'earned_runs': 0,
-                    'era': 0.0
-                }
+        box = build_box_score(game)
+        stats = {'hitting': {}, 'pitching': {}}
+        for team in (game['home_team'], game['away_team']):
+            hitting = box.totals('batting', team)
+            pitching = box.totals('pitching', team)
+            outs = innings_to_outs(pitching.get('IP', '0.0'))
+            stats['hitting'][team] = {
+                'hits': hitting.get('H', 0),
+                'runs': hitting.get('R', 0),
+                'home_runs': hitting.get('HR', 0),
+                'strikeouts': hitting.get('K', 0),
+                'walks': hitting.get('BB', 0),
+                'batting_avg': round(hitting['H'] / hitting['AB'], 3) if hitting.get('AB') else 0.0
+            }
+            stats['pitching'][team] = {
+                'strikeouts': pitching.get('K', 0),
+                'walks': pitching.get('BB', 0),
+                'hits_allowed': pitching.get('H', 0),
+                'earned_runs': pitching.get('ER', 0),
+                'era': round(pitching['ER'] * 27 / outs, 2) if outs else 0.0
             }
-        }
-
-        # Extract stats from player_stats if available
-        if 'player_stats' in game:
-            for team_type in ['home', 'away']:
-                team_name = game['home_team'] if team_type == 'home' else game['away_team']
-                if team_name in game['player_stats']:
-                    for player in game['player_stats'][team_name]:
-                        # Hitting stats
-                        stats['hitting'][team_name]['hits'] += player.get('hits', 0)
-                        stats['hitting'][team_name]['runs'] += player.get('runs', 0)
-                        stats['hitting'][team_name]['home_runs'] += player.get('homeRuns', 0)
-                        stats['hitting'][team_name]['strikeouts'] += player.get('strikeouts', 0)
-                        stats['hitting'][team_name]['walks'] += player.get('walks', 0)
-                        
-                        # Pitching stats
-                        stats['pitching'][team_name]['strikeouts'] += player.get('strikeouts', 0)
-                        stats['pitching'][team_name]['walks'] += player.get('walks', 0)
-                        stats['pitching'][team_name]['hits_allowed'] += player.get('hits_allowed', 0)
-                        stats['pitching'][team_name]['earned_runs'] += player.get('earned_runs', 0)
-
         return stats
     except Exception as e:
-        print(f"Error generating team stats: {str(e)}")
+        logger.error("Error generating team stats: %s", e)
         return None
 
+@timed(RENDER_SECONDS, builder='create_hitting_comparison')
+@memoize_render('create_hitting_comparison', _comparison_version)
 def create_hitting_comparison(stats, home_team, away_team):
     """
     Create a bar chart comparing hitting statistics
@@ -104,9 +97,11 @@ def create_hitting_comparison(stats, home_team, away_team):
         )
         return fig
     except Exception as e:
-        print(f"Error creating hitting comparison: {str(e)}")
+        logger.error("Error creating hitting comparison: %s", e)
         return None
 
+@timed(RENDER_SECONDS, builder='create_pitching_comparison')
+@memoize_render('create_pitching_comparison', _comparison_version)
 def create_pitching_comparison(stats, home_team, away_team):
     """
     Create a bar chart comparing pitching statistics
@@ -139,9 +134,11 @@ def create_pitching_comparison(stats, home_team, away_team):
         )
         return fig
     except Exception as e:
-        print(f"Error creating pitching comparison: {str(e)}")
+        logger.error("Error creating pitching comparison: %s", e)
         return None
 
+@timed(RENDER_SECONDS, builder='create_score_timeline')
+@memoize_render('create_score_timeline', _score_version)
 def create_score_timeline(game):
     """
     Create a line chart showing score progression by inning
@@ -205,9 +202,43 @@ def create_score_timeline(game):
 
         return fig
     except Exception as e:
-        print(f"Error creating score timeline: {str(e)}")
+        logger.error("Error creating score timeline: %s", e)
         return None
 
+def _build_box_score_tables(game):
+    """Build the four box score tables from the game's BoxScore, one array per column"""
+    box = build_box_score(game)
+    batting_team = np.array(box.batting['Team'], dtype=object)
+    batting_names = np.array(box.batting['Name'], dtype=object)
+    # One block of every batting count, so team totals are a single sum
+    batting = np.array([box.batting[column] for column, _ in BATTING_COLUMNS],
+                       dtype=np.int64).reshape(len(BATTING_COLUMNS), len(batting_names)).T
+    pitching_team = np.array(box.pitching['Team'], dtype=object)
+    # Name and innings pitched are strings, the rest are counts
+    pitching = {column: np.array(box.pitching[column], dtype=object if column in ('Name', 'IP') else np.int64)
+                for column in ['Name'] + [column for column, _ in PITCHING_COLUMNS]}
+
+    tables = []
+    for team in (game['home_team'], game['away_team']):
+        rows = batting_team == team
+        hitting = batting[rows]
+        hitting_names = batting_names[rows]
+        if len(hitting):
+            # Team totals as one more row rather than a concat afterwards
+            hitting = np.vstack([hitting, hitting.sum(axis=0)])
+            hitting_names = np.append(hitting_names, 'TEAM TOTALS')
+        hitting_df = pd.DataFrame({
+            'Name': hitting_names,
+            **{column: hitting[:, j] for j, (column, _) in enumerate(BATTING_COLUMNS)}
+        })
+
+        rows = pitching_team == team
+        pitching_df = pd.DataFrame({column: values[rows] for column, values in pitching.items()})
+        tables.extend((hitting_df, pitching_df))
+    return tuple(tables)
+
+@timed(RENDER_SECONDS, builder='create_box_score')
+@memoize_render('create_box_score', _player_lines_version)
 def create_box_score(game):
     """
     Create separate box score tables for hitting and pitching
@@ -216,196 +247,36 @@ def create_box_score(game):
         if 'player_stats' not in game:
             return None, None, None, None
 
-        # Create DataFrames for each team
-        home_hitting = []
-        home_pitching = []
-        away_hitting = []
-        away_pitching = []
-
-        # Process home team
-        if game['home_team'] in game['player_stats']:
-            for player in game['player_stats'][game['home_team']]:
-                # Hitting stats
-                if any(player.get(stat, 0) > 0 for stat in ['hits', 'runs', 'rbi', 'homeRuns', 'walks']):
-                    home_hitting.append({
-                        'Name': player['name'],
-                        'H': player.get('hits', 0),
-                        'R': player.get('runs', 0),
-                        'RBI': player.get('rbi', 0),
-                        'HR': player.get('homeRuns', 0),
-                        'BB': player.get('walks', 0),
-                        'K': player.get('strikeouts', 0)
-                    })
-                
-                # Pitching stats
-                if any(player.get(stat, 0) > 0 for stat in ['strikeouts', 'walks', 'hits_allowed', 'earned_runs', 'innings_pitched']):
-                    home_pitching.append({
-                        'Name': player['name'],
-                        'IP': player.get('innings_pitched', '0.0'),
-                        'H': player.get('hits_allowed', 0),
-                        'R': player.get('earned_runs', 0),
-                        'ER': player.get('earned_runs', 0),
-                        'BB': player.get('walks', 0),
-                        'K': player.get('strikeouts', 0)
-                    })
-
-        # Process away team
-        if game['away_team'] in game['player_stats']:
-            for player in game['player_stats'][game['away_team']]:
-                # Hitting stats
-                if any(player.get(stat, 0) > 0 for stat in ['hits', 'runs', 'rbi', 'homeRuns', 'walks']):
-                    away_hitting.append({
-                        'Name': player['name'],
-                        'H': player.get('hits', 0),
-                        'R': player.get('runs', 0),
-                        'RBI': player.get('rbi', 0),
-                        'HR': player.get('homeRuns', 0),
-                        'BB': player.get('walks', 0),
-                        'K': player.get('strikeouts', 0)
-                    })
-                
-                # Pitching stats
-                if any(player.get(stat, 0) > 0 for stat in ['strikeouts', 'walks', 'hits_allowed', 'earned_runs', 'innings_pitched']):
-                    away_pitching.append({
-                        'Name': player['name'],
-                        'IP': player.get('innings_pitched', '0.0'),
-                        'H': player.get('hits_allowed', 0),
-                        'R': player.get('earned_runs', 0),
-                        'ER': player.get('earned_runs', 0),
-                        'BB': player.get('walks', 0),
-                        'K': player.get('strikeouts', 0)
-                    })
-
-        # Create DataFrames
-        home_hitting_df = pd.DataFrame(home_hitting)
-        home_pitching_df = pd.DataFrame(home_pitching)
-        away_hitting_df = pd.DataFrame(away_hitting)
-        away_pitching_df = pd.DataFrame(away_pitching)
-
-        # Add team totals for hitting
-        if not home_hitting_df.empty:
-            home_hitting_totals = {
-                'Name': 'TEAM TOTALS',
-                'H': home_hitting_df['H'].sum(),
-                'R': home_hitting_df['R'].sum(),
-                'RBI': home_hitting_df['RBI'].sum(),
-                'HR': home_hitting_df['HR'].sum(),
-                'BB': home_hitting_df['BB'].sum(),
-                'K': home_hitting_df['K'].sum()
-            }
-            home_hitting_df = pd.concat([home_hitting_df, pd.DataFrame([home_hitting_totals])], ignore_index=True)
-
-        if not away_hitting_df.empty:
-            away_hitting_totals = {
-                'Name': 'TEAM TOTALS',
-                'H': away_hitting_df['H'].sum(),
-                'R': away_hitting_df['R'].sum(),
-                'RBI': away_hitting_df['RBI'].sum(),
-                'HR': away_hitting_df['HR'].sum(),
-                'BB': away_hitting_df['BB'].sum(),
-                'K': away_hitting_df['K'].sum()
-            }
-            away_hitting_df = pd.concat([away_hitting_df, pd.DataFrame([away_hitting_totals])], ignore_index=True)
-
-        return home_hitting_df, home_pitching_df, away_hitting_df, away_pitching_df
+        return _build_box_score_tables(game)
     except Exception as e:
-        print(f"Error creating box score: {str(e)}")
+        logger.error("Error creating box score: %s", e)
         return None, None, None, None
 
+# Keyed by the rows themselves, as tuples in case they went through JSON
+@memoize_render('team_summary', lambda summary: tuple(map(tuple, summary)) or None)
+def _team_summary_frame(summary):
+    """Lay out one team's precomputed season summary, built once per distinct summary"""
+    return pd.DataFrame(summary, columns=['Category', 'Value'])
+
+@timed(RENDER_SECONDS, builder='calculate_team_stats')
 def calculate_team_stats(game):
     """
     Calculate and format team statistics from the game data
     Returns two dataframes: home_stats and away_stats
+
+    The summaries are computed once per team per refresh (see
+    TeamSeasonStats.summary), so this is two lookups by team ID.
     """
     try:
-        # Check if we have team stats data
-        if 'team_stats' not in game or not game['team_stats']:
+        summaries = game.get('team_summaries')
+        if not summaries:
             return None, None
-        
-        home_team = game['home_team']
-        away_team = game['away_team']
-        
-        # Initialize dictionaries for team stats
-        home_stats_dict = {}
-        away_stats_dict = {}
-        
-        # Extract stats from game data
-        for key, value in game['team_stats'].items():
-            if key.startswith(f"{home_team}_"):
-                stat_name = key.replace(f"{home_team}_", "")
-                home_stats_dict[stat_name] = value
-            elif key.startswith(f"{away_team}_"):
-                stat_name = key.replace(f"{away_team}_", "")
-                away_stats_dict[stat_name] = value
-        
-        # Process stats into dataframes
-        if home_stats_dict:
-            # Find hitting and pitching stats if they exist
-            hitting_stats = None
-            pitching_stats = None
-            
-            for key in home_stats_dict:
-                if isinstance(home_stats_dict[key], dict) and 'stats' in home_stats_dict[key]:
-                    for group in home_stats_dict[key]['stats']:
-                        if group['type']['displayName'] == 'hitting':
-                            hitting_stats = group['splits'][0]['stat'] if group['splits'] else None
-                        elif group['type']['displayName'] == 'pitching':
-                            pitching_stats = group['splits'][0]['stat'] if group['splits'] else None
-            
-            # Create dataframe for home team
-            home_data = []
-            
-            if hitting_stats:
-                home_data.append({"Category": "Batting Average", "Value": hitting_stats.get('avg', '0')})
-                home_data.append({"Category": "OPS", "Value": hitting_stats.get('ops', '0')})
-                home_data.append({"Category": "Runs", "Value": hitting_stats.get('runs', '0')})
-                home_data.append({"Category": "Home Runs", "Value": hitting_stats.get('homeRuns', '0')})
-                home_data.append({"Category": "RBI", "Value": hitting_stats.get('rbi', '0')})
-            
-            if pitching_stats:
-                home_data.append({"Category": "ERA", "Value": pitching_stats.get('era', '0')})
-                home_data.append({"Category": "WHIP", "Value": pitching_stats.get('whip', '0')})
-                home_data.append({"Category": "Strikeouts", "Value": pitching_stats.get('strikeOuts', '0')})
-                home_data.append({"Category": "Saves", "Value": pitching_stats.get('saves', '0')})
-            
-            home_stats_df = pd.DataFrame(home_data)
-        else:
-            home_stats_df = None
-        
-        if away_stats_dict:
-            # Find hitting and pitching stats if they exist
-            hitting_stats = None
-            pitching_stats = None
-            
-            for key in away_stats_dict:
-                if isinstance(away_stats_dict[key], dict) and 'stats' in away_stats_dict[key]:
-                    for group in away_stats_dict[key]['stats']:
-                        if group['type']['displayName'] == 'hitting':
-                            hitting_stats = group['splits'][0]['stat'] if group['splits'] else None
-                        elif group['type']['displayName'] == 'pitching':
-                            pitching_stats = group['splits'][0]['stat'] if group['splits'] else None
-            
-            # Create dataframe for away team
-            away_data = []
-            
-            if hitting_stats:
-                away_data.append({"Category": "Batting Average", "Value": hitting_stats.get('avg', '0')})
-                away_data.append({"Category": "OPS", "Value": hitting_stats.get('ops', '0')})
-                away_data.append({"Category": "Runs", "Value": hitting_stats.get('runs', '0')})
-                away_data.append({"Category": "Home Runs", "Value": hitting_stats.get('homeRuns', '0')})
-                away_data.append({"Category": "RBI", "Value": hitting_stats.get('rbi', '0')})
-            
-            if pitching_stats:
-                away_data.append({"Category": "ERA", "Value": pitching_stats.get('era', '0')})
-                away_data.append({"Category": "WHIP", "Value": pitching_stats.get('whip', '0')})
-                away_data.append({"Category": "Strikeouts", "Value": pitching_stats.get('strikeOuts', '0')})
-                away_data.append({"Category": "Saves", "Value": pitching_stats.get('saves', '0')})
-            
-            away_stats_df = pd.DataFrame(away_data)
-        else:
-            away_stats_df = None
-        
+
+        home_summary = summaries.get(game.get('home_team_id'))
+        away_summary = summaries.get(game.get('away_team_id'))
+        home_stats_df = _team_summary_frame(home_summary) if home_summary else None
+        away_stats_df = _team_summary_frame(away_summary) if away_summary else None
         return home_stats_df, away_stats_df
     except Exception as e:
-        print(f"Error calculating team stats: {str(e)}")
-        return None, None
\ No newline at end of file
+        logger.error("Error calculating team stats: %s", e)
+        return None, None
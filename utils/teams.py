@@ -0,0 +1,141 @@
+import json
+import os
+import threading
+import time
+from typing import Dict, List, Optional
+from utils.cache import redis_client
+from utils.log import get_logger
+from utils.mlb_client import mlb_client
+
+logger = get_logger(__name__)
+
+# Where the registry is persisted between runs
+TEAM_REGISTRY_PATH = os.getenv('MLB_TEAM_REGISTRY_PATH', os.path.join('.cache', 'mlb_teams.json'))
+TEAM_REGISTRY_REDIS_KEY = 'mlb:team_registry'
+
+# Query parameters for /api/v1/teams
+TEAMS_PARAMS = {'sportId': 1}
+
+# Refresh the registry from upstream once a day
+TEAM_REGISTRY_MAX_AGE = 86400
+
+# Wait this long before retrying a failed refresh
+TEAM_REGISTRY_RETRY = 300
+
+def _build_team(team: Dict) -> Dict:
+    """Build a registry record from an /api/v1/teams entry"""
+    aliases = {
+        team.get(field) for field in ('name', 'teamName', 'shortName', 'clubName', 'franchiseName', 'abbreviation')
+    }
+    aliases.discard(None)
+    return {
+        'id': str(team['id']),
+        'name': team['name'],
+        'abbreviation': team.get('abbreviation', ''),
+        'aliases': sorted(aliases),
+    }
+
+class TeamRegistry:
+    """
+    Persistent MLB team registry: ID, name, abbreviation and aliases
+
+    Loads from Redis or a JSON file on disk, so startup doesn't need the
+    network, and refreshes from /api/v1/teams once the stored copy is a day
+    old. Lookups by ID or alias are plain dict reads.
+    """
+
+    def __init__(self, path: str = TEAM_REGISTRY_PATH, redis_client=redis_client):
+        self.path = path
+        self.redis_client = redis_client
+        self._teams = {}
+        self._aliases = {}
+        self._updated_at = 0.0
+        self._next_attempt = 0.0
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    def _index(self, teams: Dict[str, Dict], updated_at: float):
+        self._teams = teams
+        self._aliases = {alias.lower(): team_id for team_id, team in teams.items() for alias in team['aliases']}
+        self._updated_at = updated_at
+
+    def _load_stored(self):
+        """Load the registry from Redis, falling back to the file on disk"""
+        payload = None
+        if self.redis_client is not None:
+            try:
+                data = self.redis_client.get(TEAM_REGISTRY_REDIS_KEY)
+                if data:
+                    payload = json.loads(data)
+            except Exception as e:
+                logger.warning("Redis team registry error: %s", e)
+        if payload is None and os.path.exists(self.path):
+            try:
+                with open(self.path) as f:
+                    payload = json.load(f)
+            except (OSError, ValueError) as e:
+                logger.error("Error reading team registry %s: %s", self.path, e)
+        if payload:
+            self._index(payload['teams'], payload['updated_at'])
+
+    def _store(self, payload: Dict):
+        """Persist the registry to Redis and disk"""
+        data = json.dumps(payload)
+        if self.redis_client is not None:
+            try:
+                self.redis_client.set(TEAM_REGISTRY_REDIS_KEY, data)
+            except Exception as e:
+                logger.warning("Redis team registry error: %s", e)
+        try:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'w') as f:
+                f.write(data)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logger.error("Error writing team registry %s: %s", self.path, e)
+
+    def refresh(self) -> bool:
+        """Reload the registry from upstream, returning True on success"""
+        try:
+            data = mlb_client.get_json('teams', '/api/v1/teams', params=TEAMS_PARAMS)
+            teams = {str(team['id']): _build_team(team) for team in data['teams']}
+        except Exception as e:
+            logger.error("Error fetching MLB teams: %s", e)
+            self._next_attempt = time.time() + TEAM_REGISTRY_RETRY
+            return False
+        payload = {'updated_at': time.time(), 'teams': teams}
+        self._index(teams, payload['updated_at'])
+        self._store(payload)
+        return True
+
+    def _ensure_fresh(self):
+        """Load the stored registry once and refresh it when it is a day old"""
+        now = time.time()
+        if self._loaded and now - self._updated_at < TEAM_REGISTRY_MAX_AGE:
+            return
+        with self._lock:
+            if not self._loaded:
+                self._load_stored()
+                self._loaded = True
+            if time.time() - self._updated_at >= TEAM_REGISTRY_MAX_AGE and time.time() >= self._next_attempt:
+                self.refresh()
+
+    def get(self, team_id) -> Optional[Dict]:
+        """Get a team by ID"""
+        self._ensure_fresh()
+        return self._teams.get(str(team_id))
+
+    def find(self, name: str) -> Optional[Dict]:
+        """Get a team by name, nickname or abbreviation (case-insensitive)"""
+        self._ensure_fresh()
+        team_id = self._aliases.get(name.lower())
+        return self._teams.get(team_id) if team_id else None
+
+    def team_ids(self) -> List[str]:
+        """Get every team ID in the registry"""
+        self._ensure_fresh()
+        return list(self._teams)
+
+# Shared registry instance
+team_registry = TeamRegistry()